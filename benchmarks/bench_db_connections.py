@@ -0,0 +1,101 @@
+# benchmarks/bench_db_connections.py
+"""
+Compara la latencia por llamada de DatabaseManager abriendo una conexión nueva
+en cada consulta (comportamiento anterior) contra el pool de conexiones persistentes.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_db_connections [--calls 2000]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sqlite3
+import tempfile
+import time
+
+from src.database import DatabaseManager
+
+
+def _legacy_connection(db_path):
+    # Réplica del antiguo _get_connection(): conexión nueva por cada consulta
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _time_calls(label, calls, fn):
+    # Se silencian los print() de DatabaseManager para no medir la salida por consola
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for i in range(calls):
+            fn(i)
+        elapsed = time.perf_counter() - start
+    per_call_us = elapsed / calls * 1e6
+    print(f"{label:<45} {per_call_us:10.1f} µs/llamada")
+    return per_call_us
+
+
+def run(calls):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "bench.db")
+        db_manager = DatabaseManager(db_path=db_path)
+        user_id = db_manager.add_user(12)
+        book_ids = [book["id"] for book in db_manager.get_recommended_books(12)]
+
+        def legacy_get_book_info(i):
+            conn = _legacy_connection(db_path)
+            conn.execute(
+                """SELECT id, title, author, min_age, max_age, content_path, word_count
+                   FROM books WHERE id = ?""",
+                (book_ids[i % len(book_ids)],)
+            ).fetchone()
+            conn.close()
+
+        def legacy_get_recommended_books(i):
+            conn = _legacy_connection(db_path)
+            [dict(row) for row in conn.execute(
+                """SELECT id, title, author, min_age, max_age, content_path, word_count
+                   FROM books WHERE ? BETWEEN min_age AND max_age ORDER BY title""",
+                (6 + i % 20,)
+            ).fetchall()]
+            conn.close()
+
+        def legacy_start_reading_session(i):
+            conn = _legacy_connection(db_path)
+            conn.execute(
+                """INSERT INTO reading_sessions (user_id, book_id, start_time)
+                   VALUES (?, ?, datetime('now'))""",
+                (user_id, book_ids[i % len(book_ids)])
+            )
+            conn.commit()
+            conn.close()
+
+        print(f"\n{calls} llamadas por operación\n")
+        results = [
+            ("get_book_info",
+             _time_calls("get_book_info (conexión por llamada)", calls, legacy_get_book_info),
+             _time_calls("get_book_info (pool)", calls,
+                         lambda i: db_manager.get_book_info(book_ids[i % len(book_ids)]))),
+            ("get_recommended_books",
+             _time_calls("get_recommended_books (conexión por llamada)", calls, legacy_get_recommended_books),
+             _time_calls("get_recommended_books (pool)", calls,
+                         lambda i: db_manager.get_recommended_books(6 + i % 20))),
+            ("start_reading_session",
+             _time_calls("start_reading_session (conexión por llamada)", calls, legacy_start_reading_session),
+             _time_calls("start_reading_session (pool)", calls,
+                         lambda i: db_manager.start_reading_session(user_id, book_ids[i % len(book_ids)]))),
+        ]
+        db_manager.close()
+
+        print()
+        for name, before, after in results:
+            print(f"{name:<25} antes {before:9.1f} µs  después {after:9.1f} µs  ({before / after:5.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del pool de conexiones SQLite.")
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+    run(args.calls)
@@ -0,0 +1,75 @@
+# benchmarks/bench_merge.py
+"""
+Mide la consolidación de muchas bases de kiosco en una central (src/merge.py): la primera vez, que
+copia todo, y una segunda sobre las mismas bases, que no debe agregar nada. Las bases de los kioscos
+son copias de una sintética con su propio database_id.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_merge [--kiosks 120] [--sessions 5000] [--workers 4]
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import tempfile
+import uuid
+
+from benchmarks.synthetic import generate_catalog, generate_sessions
+from src.config import MERGE_MAX_WORKERS
+from src.database import DatabaseManager
+from src.indexer import CatalogIndexer
+from src.merge import merge_databases
+
+
+def _manager(tmp_dir, name, books_dir, catalog_file):
+    db_manager = DatabaseManager(db_path=os.path.join(tmp_dir, name), journal_mode="memory", defer_catalog=True)
+    db_manager.catalog_indexer = CatalogIndexer(db_manager, books_dir, os.path.join(tmp_dir, "quizzes"),
+                                                catalog_file)
+    db_manager.load_catalog()
+    return db_manager
+
+
+def run(kiosks, users, sessions, books, workers):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        books_dir = os.path.join(tmp_dir, "books")
+        kiosks_dir = os.path.join(tmp_dir, "kiosks")
+        os.makedirs(books_dir)
+        os.makedirs(kiosks_dir)
+        catalog_file = generate_catalog(books_dir, books, 50)
+
+        template = _manager(tmp_dir, "template.db", books_dir, catalog_file)
+        try:
+            generate_sessions(template, users, sessions)
+        finally:
+            template.close()
+        paths = []
+        for i in range(kiosks):
+            path = os.path.join(kiosks_dir, f"kiosco_{i:03d}.db")
+            shutil.copyfile(os.path.join(tmp_dir, "template.db"), path)
+            with sqlite3.connect(path) as conn:
+                conn.execute("UPDATE app_metadata SET value = ? WHERE key = 'database_id'", (uuid.uuid4().hex,))
+            conn.close()
+            paths.append(path)
+
+        central = _manager(tmp_dir, "central.db", books_dir, catalog_file)
+        try:
+            print(f"{kiosks} kioscos x {sessions} sesiones ({kiosks * sessions} en total)\n")
+            for label in ("Primera", "Repetida"):
+                result = merge_databases(central, paths, max_workers=workers)
+                added = sum(source.get("sessions_added", 0) for source in result["sources"])
+                errors = sum("error" in source for source in result["sources"])
+                print(f"{label:<10} {result['seconds']:>8.2f} s  {added:>9} sesiones nuevas  {errors} errores")
+        finally:
+            central.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de la consolidación de bases de kiosco")
+    parser.add_argument("--kiosks", type=int, default=120)
+    parser.add_argument("--users", type=int, default=30)
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--books", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=MERGE_MAX_WORKERS)
+    args = parser.parse_args()
+    run(args.kiosks, args.users, args.sessions, args.books, args.workers)
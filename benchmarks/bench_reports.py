@@ -0,0 +1,49 @@
+# benchmarks/bench_reports.py
+"""
+Mide la generación de informes PDF (src/reports.py) para muchos alumnos sobre una base sintética,
+en un solo proceso y con el pool de procesos.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_reports [--students 500] [--sessions 50000] [--workers 4]
+"""
+
+import argparse
+import os
+import tempfile
+
+from benchmarks.synthetic import generate_catalog, generate_sessions
+from src.config import REPORT_MAX_WORKERS
+from src.database import DatabaseManager
+from src.indexer import CatalogIndexer
+from src.reports import generate_reports
+
+
+def run(students, sessions, books, workers):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        books_dir = os.path.join(tmp_dir, "books")
+        os.makedirs(books_dir)
+        catalog_file = generate_catalog(books_dir, books, 50)
+        db_manager = DatabaseManager(db_path=os.path.join(tmp_dir, "reports.db"), journal_mode="memory",
+                                     defer_catalog=True)
+        db_manager.catalog_indexer = CatalogIndexer(db_manager, books_dir, os.path.join(tmp_dir, "quizzes"),
+                                                    catalog_file)
+        try:
+            db_manager.load_catalog()
+            generate_sessions(db_manager, students, sessions)
+            print(f"{students} alumnos, {sessions} sesiones\n")
+            print(f"{'Procesos':<12} {'Segundos':>9} {'Informes/s':>11}")
+            for label, max_workers in (("1", 1), (str(workers or os.cpu_count()), workers)):
+                result = generate_reports(db_manager, os.path.join(tmp_dir, f"out_{label}"), max_workers=max_workers)
+                print(f"{label:<12} {result['seconds']:>9.2f} {result['students'] / result['seconds']:>11.1f}")
+        finally:
+            db_manager.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de los informes PDF de progreso")
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--sessions", type=int, default=50000)
+    parser.add_argument("--books", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=REPORT_MAX_WORKERS)
+    args = parser.parse_args()
+    run(args.students, args.sessions, args.books, args.workers)
@@ -0,0 +1,75 @@
+# benchmarks/bench_scoring.py
+"""
+Mide el rendimiento (sesiones por segundo) de la calificación de velocidad lectora:
+el cálculo anterior con diccionario y ramas, ScoringModel.score() sesión por sesión y
+ScoringModel.score_batch() (vectorizado con NumPy si está instalado).
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_scoring [--sessions 200000]
+"""
+
+import argparse
+import random
+import time
+
+from src.config import WPM_EXPECTED
+from src.scoring_model import ScoringModel, load_numpy
+
+
+def _legacy_calculate_reading_stats(user_age, book_word_count, duration_seconds):
+    # Réplica del antiguo AppLogic.calculate_reading_stats
+    if duration_seconds == 0:
+        actual_wpm = 0
+    else:
+        actual_wpm = (book_word_count / duration_seconds) * 60
+
+    expected_wpm_range = WPM_EXPECTED.get(user_age)
+    if not expected_wpm_range:
+        expected_wpm_range = WPM_EXPECTED.get('default')
+
+    min_wpm, max_wpm = expected_wpm_range
+
+    if actual_wpm >= min_wpm and actual_wpm <= max_wpm:
+        return actual_wpm, 100.0, "Normal"
+    elif actual_wpm < min_wpm:
+        return actual_wpm, max(0, (actual_wpm / min_wpm) * 100), "Necesita mejorar (Lento)"
+    elif actual_wpm > max_wpm * 1.2:
+        return actual_wpm, 100.0 - ((actual_wpm - max_wpm) / max_wpm) * 20, "Rápido"
+    return actual_wpm, 100.0, "Rápido"
+
+
+def _report(label, sessions, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    rate = sessions / elapsed
+    print(f"{label:<40} {rate:14,.0f} sesiones/s")
+    return rate
+
+
+def run(sessions):
+    rng = random.Random(42)
+    ages = [rng.randint(6, 25) for _ in range(sessions)]
+    word_counts = [rng.randint(200, 6000) for _ in range(sessions)]
+    durations = [rng.randint(30, 3600) for _ in range(sessions)]
+    model = ScoringModel()
+    score = model.score
+
+    print(f"{sessions} sesiones aleatorias (edades 6-25)\n")
+    legacy = _report("Diccionario + ramas (anterior)", sessions, lambda: [
+        _legacy_calculate_reading_stats(a, w, d) for a, w, d in zip(ages, word_counts, durations)
+    ])
+    scalar = _report("ScoringModel.score (por sesión)", sessions, lambda: [
+        score(a, w, d) for a, w, d in zip(ages, word_counts, durations)
+    ])
+    batch_label = "ScoringModel.score_batch (NumPy)" if load_numpy() is not None else "ScoringModel.score_batch (sin NumPy)"
+    batch = _report(batch_label, sessions, lambda: model.score_batch(ages, word_counts, durations))
+
+    print(f"\npor sesión: {scalar / legacy:.1f}x  |  por lotes: {batch / legacy:.1f}x respecto al cálculo anterior")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de la calificación de velocidad lectora.")
+    parser.add_argument("--sessions", type=int, default=200000)
+    args = parser.parse_args()
+    run(args.sessions)
@@ -0,0 +1,78 @@
+# benchmarks/bench_search.py
+"""
+Mide la búsqueda de libros por contenido con el índice FTS5 (DatabaseManager.search_books)
+frente a leer y recorrer todos los .txt en cada consulta, sobre un catálogo sintético.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_search [--books 2000] [--words 3000]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.synthetic import generate_catalog
+from src.database import DatabaseManager
+from src.indexer import CatalogIndexer
+from src.widgets import normalize_search_text
+
+QUERIES = ("lobo", "princesa bosque", "camin", "dragón", "zzzz")
+
+
+def _scan_files(directory, query):
+    # Alternativa sin índice: leer todos los textos en cada búsqueda
+    terms = normalize_search_text(query).split()
+    matches = []
+    for filename in os.listdir(directory):
+        if filename.endswith(".txt"):
+            with open(os.path.join(directory, filename), encoding="utf-8") as f:
+                text = normalize_search_text(f.read())
+            if all(term in text for term in terms):
+                matches.append(filename)
+    return matches
+
+
+def _time_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def run(books, words_per_book):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        books_dir = os.path.join(tmp_dir, "books")
+        os.makedirs(books_dir)
+        catalog_file = generate_catalog(books_dir, books, words_per_book)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            db_manager = DatabaseManager(db_path=os.path.join(tmp_dir, "search.db"))
+            indexer = CatalogIndexer(db_manager, books_dir, os.path.join(tmp_dir, "quizzes"), catalog_file)
+            start = time.perf_counter()
+            indexer.refresh(force=True)
+            index_seconds = time.perf_counter() - start
+
+        print(f"{books} libros sintéticos de {words_per_book} palabras "
+              f"(FTS5: {'sí' if db_manager.has_full_text_search() else 'no'})")
+        print(f"Indexación completa: {index_seconds:.2f} s\n")
+        print(f"{'Consulta':<20} {'FTS5 (ms)':>10} {'Resultados':>11} {'Leer .txt (ms)':>15}")
+        for query in QUERIES:
+            fts_ms = _time_ms(lambda: db_manager.search_books(query, age=10), repeat=20)
+            found = len(db_manager.search_books(query, age=10))
+            scan_ms = _time_ms(lambda: _scan_files(books_dir, query), repeat=1)
+            print(f"{query:<20} {fts_ms:>10.2f} {found:>11} {scan_ms:>15.1f}")
+        db_manager.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de la búsqueda de libros por contenido")
+    parser.add_argument("--books", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=3000)
+    args = parser.parse_args()
+    run(args.books, args.words)
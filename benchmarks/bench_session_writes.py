@@ -0,0 +1,55 @@
+# benchmarks/bench_session_writes.py
+"""
+Compara el costo de registrar sesiones de lectura (inicio + fin) con cada modo del diario de
+sesiones: "sync" (un commit por evento), "log" y "memory" (escritura en lote).
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_session_writes [--sessions 500]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from src.database import DatabaseManager
+from src.session_journal import JOURNAL_MODES
+
+
+def _time_mode(mode, sessions, tmp_dir):
+    with contextlib.redirect_stdout(io.StringIO()):
+        db_manager = DatabaseManager(db_path=os.path.join(tmp_dir, f"sessions_{mode}.db"), journal_mode=mode)
+        user_id = db_manager.add_user(12)
+        book_id = db_manager.get_recommended_books(12)[0]["id"]
+
+        start = time.perf_counter()
+        for _ in range(sessions):
+            session_id = db_manager.start_reading_session(user_id, book_id)
+            db_manager.finish_reading_session(session_id, 120, 110.0, 100.0, "Normal", 80.0)
+        db_manager.flush_sessions()  # Incluye la escritura del último lote
+        elapsed = time.perf_counter() - start
+
+        saved = db_manager.get_user_reading_summary(user_id)["session_count"]
+        db_manager.close()
+
+    per_session_us = elapsed / sessions * 1e6
+    print(f"{mode:<8} {per_session_us:10.1f} µs/sesión   ({saved} sesiones guardadas)")
+    return per_session_us
+
+
+def run(sessions):
+    print(f"Registrando {sessions} sesiones (inicio + fin) por modo del diario\n")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results = {mode: _time_mode(mode, sessions, tmp_dir) for mode in JOURNAL_MODES}
+    for mode in ("log", "memory"):
+        print(f"\n{mode} es {results['sync'] / results[mode]:.1f}x más rápido que sync", end="")
+    print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de los modos del diario de sesiones.")
+    parser.add_argument("--sessions", type=int, default=500)
+    args = parser.parse_args()
+    run(args.sessions)
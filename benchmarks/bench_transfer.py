@@ -0,0 +1,84 @@
+# benchmarks/bench_transfer.py
+"""
+Mide la exportación e importación masiva de tablas (src/data_transfer.py) en cada formato, con y sin
+gzip, sobre una base sintética. Con --memory informa además el pico de memoria de Python (tracemalloc),
+que debe mantenerse plano aunque crezca el número de sesiones.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_transfer [--sessions 500000] [--memory]
+"""
+
+import argparse
+import os
+import tempfile
+import tracemalloc
+
+from benchmarks.synthetic import generate_catalog, generate_sessions
+from src.data_transfer import export_tables, import_files
+from src.database import DatabaseManager
+from src.indexer import CatalogIndexer
+
+VARIANTS = (("csv", False), ("csv", True), ("jsonl", False), ("jsonl", True))
+
+
+def _measure(function, memory):
+    if memory:
+        tracemalloc.start()
+    try:
+        results = function()
+        peak = tracemalloc.get_traced_memory()[1] if memory else None
+    finally:
+        if memory:
+            tracemalloc.stop()
+    return results, peak
+
+
+def run(users, sessions, books, memory):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        books_dir = os.path.join(tmp_dir, "books")
+        os.makedirs(books_dir)
+        catalog_file = generate_catalog(books_dir, books, 50)
+        db_manager = DatabaseManager(db_path=os.path.join(tmp_dir, "source.db"), journal_mode="memory",
+                                     defer_catalog=True)
+        db_manager.catalog_indexer = CatalogIndexer(db_manager, books_dir, os.path.join(tmp_dir, "quizzes"),
+                                                    catalog_file)
+        try:
+            db_manager.load_catalog()
+            generate_sessions(db_manager, users, sessions)
+            print(f"{users} usuarios, {sessions} sesiones\n")
+            print(f"{'Formato':<12} {'Exportar filas/s':>17} {'Importar filas/s':>17} {'Tamaño MB':>10}"
+                  + (f" {'Pico MB':>8}" if memory else ""))
+            for fmt, compress in VARIANTS:
+                label = fmt + (".gz" if compress else "")
+                out_dir = os.path.join(tmp_dir, label)
+                exported, export_peak = _measure(
+                    lambda: export_tables(db_manager, out_dir, fmt=fmt, compress=compress), memory)
+                paths = [result["path"] for result in exported]
+
+                target = DatabaseManager(db_path=os.path.join(tmp_dir, label + ".db"), journal_mode="memory",
+                                         defer_catalog=True)
+                try:
+                    imported, import_peak = _measure(lambda: import_files(target, paths), memory)
+                finally:
+                    target.close()
+
+                rows = sum(result["rows"] for result in exported)
+                export_rate = rows / sum(result["seconds"] for result in exported)
+                import_rate = rows / sum(result["seconds"] for result in imported)
+                size = sum(os.path.getsize(path) for path in paths) / 1e6
+                line = f"{label:<12} {export_rate:>17,.0f} {import_rate:>17,.0f} {size:>10.1f}"
+                if memory:
+                    line += f" {max(export_peak, import_peak) / 1e6:>8.1f}"
+                print(line)
+        finally:
+            db_manager.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de la exportación e importación masiva")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--sessions", type=int, default=500000)
+    parser.add_argument("--books", type=int, default=200)
+    parser.add_argument("--memory", action="store_true", help="Mide el pico de memoria (más lento)")
+    args = parser.parse_args()
+    run(args.users, args.sessions, args.books, args.memory)
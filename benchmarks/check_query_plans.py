@@ -0,0 +1,86 @@
+# benchmarks/check_query_plans.py
+"""
+Regresión de planes de consulta: ejecuta las consultas frecuentes de DatabaseManager sobre una
+base temporal, obtiene su EXPLAIN QUERY PLAN y falla (código de salida 1) si alguna recorre
+completa una tabla en lugar de usar un índice.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.check_query_plans
+"""
+
+import contextlib
+import io
+import os
+import re
+import sys
+import tempfile
+
+from src.database import DatabaseManager
+from src.quiz_analytics import QuizAnalytics
+
+# "SCAN <tabla>" sin índice es un recorrido completo; "SCAN ... USING (COVERING) INDEX" no lo es,
+# ni "SCAN ... VIRTUAL TABLE" (la búsqueda FTS5 usa su propio índice).
+FULL_SCAN_PATTERN = re.compile(r"^SCAN (\w+)\b(?! USING (COVERING )?INDEX| VIRTUAL TABLE)")
+
+
+def capture_statements(db_manager, calls):
+    """Ejecuta las llamadas y devuelve las sentencias SQL (con parámetros ya expandidos) que generaron."""
+    statements = []
+    conn = db_manager._get_connection()
+    conn.set_trace_callback(statements.append)
+    try:
+        for call in calls:
+            call()
+    finally:
+        conn.set_trace_callback(None)
+    return [sql for sql in statements if sql.lstrip().upper().startswith(("SELECT", "WITH"))]
+
+
+def find_full_scans(conn, statements):
+    problems = []
+    for sql in statements:
+        for row in conn.execute("EXPLAIN QUERY PLAN " + sql):
+            detail = row[3]
+            if FULL_SCAN_PATTERN.match(detail):
+                problems.append((" ".join(sql.split()), detail))
+    return problems
+
+
+def run():
+    with tempfile.TemporaryDirectory() as tmp_dir, contextlib.redirect_stdout(io.StringIO()):
+        db_manager = DatabaseManager(db_path=os.path.join(tmp_dir, "plans.db"))
+        user_id = db_manager.add_user(12)
+        book_id = db_manager.get_recommended_books(12)[0]["id"]
+        # Un libro con cuestionario, para que el análisis de preguntas tenga respuestas que leer
+        quiz_book_id = db_manager._get_connection().execute("SELECT MIN(book_id) FROM quizzes").fetchone()[0]
+        for session_book_id in (book_id, quiz_book_id, quiz_book_id):
+            session_id = db_manager.start_reading_session(user_id, session_book_id)
+            db_manager.finish_reading_session(session_id, 120, 110.0, 100.0, "Normal", 80.0, [(1, 1), (3, 0)])
+        _, cursor = db_manager.get_user_reading_stats_page(user_id, limit=1)
+
+        statements = capture_statements(db_manager, [
+            lambda: db_manager.get_recommended_books(12),
+            lambda: db_manager.get_book_info(book_id),
+            lambda: db_manager.get_quiz(book_id),
+            lambda: db_manager.get_user_reading_stats(user_id),
+            lambda: db_manager.get_user_reading_stats_page(user_id),
+            lambda: db_manager.get_user_reading_stats_page(user_id, cursor=cursor),
+            lambda: db_manager.get_user_reading_summary(user_id),
+            lambda: db_manager.get_book_stats(book_id),
+            lambda: db_manager.search_books("lobo", age=12),
+            lambda: QuizAnalytics(db_manager).item_analysis(quiz_book_id),
+        ])
+        problems = find_full_scans(db_manager._get_connection(), statements)
+        db_manager.close()
+
+    if problems:
+        print("Consultas con recorrido completo de tabla:")
+        for sql, detail in problems:
+            print(f"  {detail}\n    {sql}")
+        return 1
+    print(f"OK: {len(statements)} consultas revisadas, ninguna recorre una tabla completa.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
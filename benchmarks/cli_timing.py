@@ -0,0 +1,74 @@
+# benchmarks/cli_timing.py
+"""
+Mide el arranque de la línea de comandos de administración (python -m src.cli), cada vez en un
+proceso nuevo y sobre una copia de la base de datos: tiempo de reloj de varios subcomandos frente
+al intérprete vacío, y comprobación de que ninguno carga tkinter ni customtkinter.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.cli_timing [--runs 15]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from src.config import DATABASE_PATH
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMMANDS = (["--help"], ["user-stats", "1"], ["add-user", "--age", "9"], ["check-stats"],
+            ["recommend", "--age", "9", "--limit", "5"])
+GUI_MODULES = ("tkinter", "customtkinter", "PIL")
+# Ejecuta el subcomando en el proceso hijo y reporta los módulos de interfaz que quedaron cargados
+_CHILD = """
+import contextlib, io, json, sys
+from src import cli
+with contextlib.redirect_stdout(io.StringIO()):
+    try:
+        cli.main(sys.argv[1:])
+    except SystemExit:
+        pass
+print(json.dumps(sorted(m for m in sys.modules if m.split(".")[0] in {gui_modules!r})))
+"""
+
+
+def _wall_ms(command, runs):
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times), min(times)
+
+
+def run(runs):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "atlasread.db")
+        shutil.copyfile(DATABASE_PATH, db_path)
+        # Primera ejecución: aplica migraciones y carga el catálogo en la copia
+        subprocess.run([sys.executable, "-m", "src.cli", "--db", db_path, "seed"], cwd=PROJECT_ROOT,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+
+        median, best = _wall_ms([sys.executable, "-c", "pass"], runs)
+        print(f"{'Subcomando':<36} {'Mediana ms':>11} {'Mínimo ms':>10}  Módulos de interfaz")
+        print(f"{'(intérprete vacío)':<36} {median:>11.1f} {best:>10.1f}")
+        child = _CHILD.format(gui_modules=set(GUI_MODULES))
+        for arguments in COMMANDS:
+            full = (["--db", db_path] + arguments) if arguments != ["--help"] else arguments
+            median, best = _wall_ms([sys.executable, "-m", "src.cli"] + full, runs)
+            output = subprocess.run([sys.executable, "-c", child] + full, cwd=PROJECT_ROOT, capture_output=True,
+                                    text=True, check=True).stdout
+            loaded = json.loads(output.strip().splitlines()[-1])
+            print(f"{' '.join(arguments):<36} {median:>11.1f} {best:>10.1f}  {', '.join(loaded) or 'ninguno'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del arranque de la línea de comandos")
+    parser.add_argument("--runs", type=int, default=15)
+    args = parser.parse_args()
+    run(args.runs)
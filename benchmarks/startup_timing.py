@@ -0,0 +1,170 @@
+# benchmarks/startup_timing.py
+"""
+Mide el arranque en frío de la aplicación, cada vez en un proceso nuevo:
+
+  1. Importaciones (python -X importtime -c "import src.gui"): tiempo total y los módulos más costosos.
+  2. Tiempo de reloj hasta el primer dibujado de la ventana, separado en importaciones,
+     DatabaseManager y construcción de AtlasReadApp + primer update(). Se compara el arranque
+     actual (marcos y catálogo diferidos) con el anterior (--eager: todos los marcos y el catálogo
+     antes de mostrar la ventana). Sin pantalla (DISPLAY) solo se miden importaciones y base de datos.
+
+Se trabaja sobre una copia de la base de datos en un directorio temporal.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.startup_timing [--runs 5] [--top 15] [--fresh-db]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from src.config import DATABASE_PATH
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PHASES = ("imports", "database", "window", "first_paint")
+PHASE_LABELS = {
+    "imports": "Importaciones",
+    "database": "DatabaseManager",
+    "window": "AtlasReadApp.__init__",
+    "first_paint": "Primer dibujado (update)",
+    "deferred_catalog": "Catálogo (después del dibujado)",
+    "deferred_frames": "Marcos restantes (bajo demanda)",
+}
+
+
+def _child(db_path, eager):
+    """Proceso hijo: arranca la aplicación como src/main.py y reporta los tiempos en JSON por stdout."""
+    import contextlib
+    import io
+
+    timings = {}
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        import tkinter
+        from src.database import DatabaseManager
+        from src.logic import AppLogic
+        from src.gui import AtlasReadApp
+        timings["imports"] = time.perf_counter() - start
+
+        mark = time.perf_counter()
+        db_manager = DatabaseManager(db_path=db_path, defer_catalog=not eager)
+        timings["database"] = time.perf_counter() - mark
+
+        try:
+            mark = time.perf_counter()
+            app = AtlasReadApp(db_manager, AppLogic(db_manager))
+            if eager:
+                # Arranque anterior: todos los marcos construidos antes de mostrar la ventana
+                for name in app._frame_builders:
+                    app._ensure_frame(name)
+            timings["window"] = time.perf_counter() - mark
+            mark = time.perf_counter()
+            app.update()
+            timings["first_paint"] = time.perf_counter() - mark
+        except tkinter.TclError:
+            app = None  # Sin pantalla
+
+        if not eager:
+            # Lo que ahora ocurre después de que la ventana es visible
+            if not db_manager.catalog_ready():
+                mark = time.perf_counter()
+                db_manager.load_catalog()
+                timings["deferred_catalog"] = time.perf_counter() - mark
+            if app is not None:
+                mark = time.perf_counter()
+                for name in app._frame_builders:
+                    app._ensure_frame(name)
+                timings["deferred_frames"] = time.perf_counter() - mark
+
+        if app is not None:
+            app.quit_application()
+        else:
+            db_manager.close()
+    print(json.dumps(timings))
+
+
+def _run_child(db_path, eager):
+    command = [sys.executable, "-m", "benchmarks.startup_timing", "--child", db_path]
+    if eager:
+        command.append("--eager")
+    output = subprocess.run(command, cwd=PROJECT_ROOT, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _import_times(top):
+    """
+    Parsea la salida de -X importtime: devuelve (total de src.gui en ms, [(ms acumulados, módulo)]) con
+    los módulos que src.gui importa directamente, de más a menos costoso.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import src.gui"],
+                            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # La sangría indica la profundidad: cada módulo aparece después de todo lo que importó
+        modules.append((int(cumulative) / 1000, name.strip(), len(name) - len(name.lstrip())))
+
+    total, _, gui_depth = modules[-1]  # src.gui es lo último que termina de importarse
+    direct = []
+    for ms, name, depth in reversed(modules[:-1]):
+        if depth <= gui_depth:
+            break  # Módulos importados antes (arranque del intérprete)
+        if depth == gui_depth + 2:
+            direct.append((ms, name))
+    return total, sorted(direct, reverse=True)[:top]
+
+
+def _prepare_db(tmp_dir, run, fresh):
+    db_path = os.path.join(tmp_dir, f"startup_{run}.db")
+    if not fresh and os.path.exists(DATABASE_PATH):
+        shutil.copyfile(DATABASE_PATH, db_path)
+    return db_path
+
+
+def run(runs, top, fresh_db):
+    total, modules = _import_times(top)
+    print(f"Importación de src.gui: {total:.1f} ms (python -X importtime)")
+    for ms, name in modules:
+        print(f"  {ms:8.1f} ms  {name}")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for eager in (True, False):
+            samples = [_run_child(_prepare_db(tmp_dir, f"{eager}_{i}", fresh_db), eager) for i in range(runs)]
+            results[eager] = {key: statistics.median(s[key] for s in samples) * 1000
+                              for key in samples[0]}
+
+    print(f"\nMediana de {runs} arranques en frío ({'base de datos nueva' if fresh_db else 'copia de la base de datos'}):")
+    print(f"{'Fase':<34} {'Anterior (ms)':>14} {'Actual (ms)':>12}")
+    for key in PHASES + ("deferred_catalog", "deferred_frames"):
+        if key not in results[True] and key not in results[False]:
+            continue
+        before, after = (f"{results[eager][key]:.1f}" if key in results[eager] else "-" for eager in (True, False))
+        print(f"{PHASE_LABELS[key]:<34} {before:>14} {after:>12}")
+    for eager, label in ((True, "Anterior"), (False, "Actual")):
+        visible = sum(results[eager].get(key, 0) for key in PHASES)
+        print(f"{label}: ventana visible a los {visible:.1f} ms")
+    if "first_paint" not in results[False]:
+        print("Sin pantalla: no se midió la ventana (solo importaciones y base de datos).")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del arranque en frío de la aplicación")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="módulos más lentos a listar")
+    parser.add_argument("--fresh-db", action="store_true", help="arrancar con una base de datos vacía")
+    parser.add_argument("--child", metavar="DB_PATH", help=argparse.SUPPRESS)
+    parser.add_argument("--eager", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _child(args.child, args.eager)
+    else:
+        run(args.runs, args.top, args.fresh_db)
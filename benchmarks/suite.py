@@ -0,0 +1,270 @@
+# benchmarks/suite.py
+"""
+Suite de benchmarks de base de datos, lógica e interfaz sobre un catálogo sintético
+(por defecto 10.000 libros y 1.000.000 de sesiones), sin tocar atlasread.db.
+
+Los tiempos se guardan en JSON (mediana, p95 y mínimo en ms de cada operación) y se pueden comparar
+con una línea base guardada: una operación es una regresión si su mediana supera a la de la línea base
+en más de --threshold (proporción) y en más de --min-delta-ms.
+
+Las mediciones de la interfaz (construcción de widgets de las pantallas de libros y de estadísticas)
+necesitan una pantalla; en Linux sin escritorio se puede usar Xvfb:
+    xvfb-run -a python -m benchmarks.suite
+Sin pantalla se omiten y se indica en el resultado.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.suite [--quick] [--output resultados.json]
+    python -m benchmarks.suite --save-baseline benchmarks/baseline.json
+    python -m benchmarks.suite --compare benchmarks/baseline.json [--threshold 0.25]
+"""
+
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import generate_catalog, generate_quiz_responses, generate_sessions
+from src.config import READER_PREFETCH_PAGES
+from src.content_cache import ContentCache
+from src.database import DatabaseManager
+from src.indexer import CatalogIndexer
+from src.logic import AppLogic
+from src.quiz_analytics import QuizAnalytics
+
+QUICK_SIZES = {"books": 1000, "sessions": 50000, "users": 200}
+QUIZ_STUDENTS = 5000  # Alumnos que respondieron el cuestionario analizado
+
+
+def measure(fn, repeat, warmup=1):
+    """Ejecuta fn warmup + repeat veces y devuelve las estadísticas de las últimas repeat, en ms."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, math.ceil(len(samples) * 0.95) - 1)],
+        "min_ms": samples[0],
+        "runs": repeat,
+    }
+
+
+def _gui_benchmarks(db_manager, app_logic, user_id, age, repeat):
+    """Widgets de las pantallas de selección de libros y de estadísticas. Devuelve (resultados, motivo_omisión)."""
+    try:
+        import tkinter
+        from src.gui import AtlasReadApp
+    except ImportError as e:
+        return {}, f"interfaz no disponible ({e})"
+    try:
+        app = AtlasReadApp(db_manager, app_logic)
+    except tkinter.TclError as e:
+        return {}, f"sin pantalla ({e}); ejecutar con xvfb-run"
+
+    results = {}
+    try:
+        app.user_id, app.user_age = user_id, age
+        books = db_manager.get_recommended_books(age)
+        stats = app._fetch_statistics(user_id, None, True)
+
+        # Parte síncrona de show_book_selection_frame / show_statistics_frame (sin la consulta en segundo plano)
+        def show_book_selection():
+            app._on_recommended_books_loaded(books)
+            app.update_idletasks()
+
+        def show_statistics():
+            app._on_statistics_loaded(stats)
+            app.update_idletasks()
+
+        # La primera vez incluye construir el marco
+        results["gui.show_book_selection_frame.first"] = measure(show_book_selection, repeat=1, warmup=0)
+        results["gui.show_book_selection_frame"] = measure(show_book_selection, repeat)
+        results["gui.show_statistics_frame.first"] = measure(show_statistics, repeat=1, warmup=0)
+        results["gui.show_statistics_frame"] = measure(show_statistics, repeat)
+    finally:
+        app.task_executor.shutdown(wait=True)
+        app.destroy()
+    return results, None
+
+
+def run_suite(books, sessions, users, words_per_book, repeat, include_gui=True):
+    results = {}
+    skipped = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        books_dir = os.path.join(tmp_dir, "books")
+        quizzes_dir = os.path.join(tmp_dir, "quizzes")
+        os.makedirs(books_dir)
+        os.makedirs(quizzes_dir)
+
+        print(f"Generando {books} libros de {words_per_book} palabras...")
+        catalog_file = generate_catalog(books_dir, books, words_per_book, quizzes_dir)
+
+        db_manager = DatabaseManager(db_path=os.path.join(tmp_dir, "suite.db"), journal_mode="memory",
+                                     defer_catalog=True)
+        db_manager.catalog_indexer = CatalogIndexer(db_manager, books_dir, quizzes_dir, catalog_file)
+        try:
+            # Antes _insert_sample_books(): primera carga y arranques posteriores sin cambios
+            results["db.load_catalog.cold"] = measure(db_manager.load_catalog, repeat=1, warmup=0)
+            results["db.load_catalog.unchanged"] = measure(db_manager.load_catalog, repeat)
+
+            print(f"Generando {sessions} sesiones para {users} usuarios...")
+            generate_sessions(db_manager, users, sessions)
+            conn = db_manager._get_connection()
+            user_id, age = conn.execute(
+                """SELECT u.id, u.age FROM user_stats s JOIN users u ON u.id = s.user_id
+                   ORDER BY s.session_count DESC LIMIT 1"""
+            ).fetchone()
+            book = db_manager.get_recommended_books(age)[0]
+
+            print("Midiendo...")
+            results["db.get_recommended_books"] = measure(lambda: db_manager.get_recommended_books(age), repeat)
+            results["db.get_user_reading_stats"] = measure(lambda: db_manager.get_user_reading_stats(user_id), repeat)
+            results["db.get_user_reading_stats_page"] = measure(
+                lambda: db_manager.get_user_reading_stats_page(user_id), repeat)
+            results["db.get_user_reading_summary"] = measure(
+                lambda: db_manager.get_user_reading_summary(user_id), repeat)
+            results["db.search_books"] = measure(lambda: db_manager.search_books("lobo", age), repeat)
+
+            cache = ContentCache()
+            app_logic = AppLogic(db_manager, content_cache=cache, books_directory=books_dir)
+
+            # Orden recomendado para el usuario (legibilidad según su WPM y popularidad) sobre el índice en memoria
+            results["logic.get_recommended_books"] = measure(
+                lambda: app_logic.get_recommended_books(age, user_id), repeat)
+
+            # Abrir el libro y leer las páginas que muestra la pantalla de lectura al entrar
+            def open_book():
+                pager = app_logic.open_book_pager(book["content_path"])
+                for index in range(1 + READER_PREFETCH_PAGES):
+                    pager.get_page(index)
+                pager.close()
+
+            def open_book_cold():
+                cache.invalidate()
+                open_book()
+            results["logic.open_book_pager.cold"] = measure(open_book_cold, repeat)
+            results["logic.open_book_pager.cached"] = measure(open_book, repeat)
+
+            # Cuestionario compilado por el indexador: una consulta, sin caché ni lectura del JSON
+            results["logic.load_quiz_for_book"] = measure(lambda: app_logic.load_quiz_for_book(book["id"]), repeat)
+            quiz = app_logic.load_quiz_for_book(book["id"])
+            answers = [1] * len(quiz["questions"])
+            results["logic.evaluate_quiz"] = measure(lambda: app_logic.evaluate_quiz(quiz, answers), repeat)
+
+            generate_quiz_responses(db_manager, book["id"], QUIZ_STUDENTS)
+            analytics = QuizAnalytics(db_manager)
+
+            def item_analysis_cold():
+                analytics.invalidate()
+                analytics.item_analysis(book["id"])
+            results["analytics.item_analysis.cold"] = measure(item_analysis_cold, repeat)
+            results["analytics.item_analysis.cached"] = measure(lambda: analytics.item_analysis(book["id"]), repeat)
+
+            if include_gui:
+                gui_results, reason = _gui_benchmarks(db_manager, app_logic, user_id, age, repeat)
+                results.update(gui_results)
+                if reason:
+                    skipped["gui"] = reason
+            else:
+                skipped["gui"] = "desactivado con --no-gui"
+        finally:
+            db_manager.close()
+
+    return {
+        "meta": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "books": books, "sessions": sessions, "users": users, "words_per_book": words_per_book,
+            "repeat": repeat,
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def compare(current, baseline, threshold, min_delta_ms):
+    """Imprime la comparación y devuelve los nombres de las operaciones con regresión."""
+    sizes = ("books", "sessions", "users", "words_per_book")
+    if any(current["meta"].get(key) != baseline["meta"].get(key) for key in sizes):
+        print("Advertencia: la línea base se midió con otro tamaño de catálogo; la comparación no es directa.")
+
+    regressions = []
+    print(f"\n{'Operación':<40} {'base ms':>10} {'actual ms':>10} {'cambio':>8}")
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<40} {'-':>10} {result['median_ms']:>10.3f} {'nuevo':>8}")
+            continue
+        before, after = base["median_ms"], result["median_ms"]
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if after > before * (1 + threshold) and after - before > min_delta_ms:
+            regressions.append(name)
+            flag = "  REGRESIÓN"
+        print(f"{name:<40} {before:>10.3f} {after:>10.3f} {change:>+8.0%}{flag}")
+    for name in baseline["results"].keys() - current["results"].keys():
+        print(f"{name:<40} {baseline['results'][name]['median_ms']:>10.3f} {'-':>10} {'omitido':>8}")
+    return regressions
+
+
+def _print_results(report):
+    print(f"\n{'Operación':<40} {'mediana ms':>11} {'p95 ms':>10} {'mín ms':>10}")
+    for name, result in report["results"].items():
+        print(f"{name:<40} {result['median_ms']:>11.3f} {result['p95_ms']:>10.3f} {result['min_ms']:>10.3f}")
+    for group, reason in report["skipped"].items():
+        print(f"Omitido ({group}): {reason}")
+
+
+def _write_json(path, report):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de base de datos, lógica e interfaz")
+    parser.add_argument("--books", type=int, default=10000)
+    parser.add_argument("--sessions", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=300, help="palabras por libro")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--quick", action="store_true",
+                        help=f"catálogo pequeño ({QUICK_SIZES['books']} libros, {QUICK_SIZES['sessions']} sesiones)")
+    parser.add_argument("--no-gui", action="store_true", help="omitir las mediciones de la interfaz")
+    parser.add_argument("--output", default="benchmark_results.json", help="archivo JSON de resultados")
+    parser.add_argument("--save-baseline", metavar="PATH", help="guardar también los resultados como línea base")
+    parser.add_argument("--compare", metavar="PATH", help="comparar con una línea base guardada")
+    parser.add_argument("--threshold", type=float, default=0.25, help="aumento relativo tolerado (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05, help="aumento absoluto mínimo para marcar")
+    args = parser.parse_args()
+
+    if args.quick:
+        args.books, args.sessions, args.users = QUICK_SIZES["books"], QUICK_SIZES["sessions"], QUICK_SIZES["users"]
+    report = run_suite(args.books, args.sessions, args.users, args.words, args.repeat, include_gui=not args.no_gui)
+    _print_results(report)
+    _write_json(args.output, report)
+    print(f"\nResultados guardados en {args.output}")
+    if args.save_baseline:
+        _write_json(args.save_baseline, report)
+        print(f"Línea base guardada en {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} regresiones: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\nSin regresiones.")
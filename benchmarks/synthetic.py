@@ -0,0 +1,118 @@
+# benchmarks/synthetic.py
+"""
+Datos sintéticos para los benchmarks: un catálogo de libros (textos, catalog.json y cuestionarios)
+y usuarios con sesiones de lectura terminadas y respuestas a los cuestionarios. Todo es reproducible a partir de la semilla.
+"""
+
+import json
+import math
+import os
+import random
+
+from src.config import BOOKS_DIRECTORY
+
+SESSION_INSERT_CHUNK = 50000
+
+
+def _vocabulary():
+    """Palabras de los libros reales, para que el texto sintético tenga una distribución parecida."""
+    words = []
+    for filename in sorted(os.listdir(BOOKS_DIRECTORY)):
+        if filename.endswith(".txt"):
+            with open(os.path.join(BOOKS_DIRECTORY, filename), encoding="utf-8") as f:
+                words.extend(f.read().split())
+    return words
+
+
+def generate_catalog(books_directory, books, words_per_book, quizzes_directory=None, seed=42):
+    """
+    Escribe `books` libros de `words_per_book` palabras en books_directory, su catalog.json y, si se
+    indica quizzes_directory, un cuestionario de 5 preguntas por libro. Devuelve la ruta de catalog.json.
+    """
+    rng = random.Random(seed)
+    vocabulary = _vocabulary()
+    catalog = []
+    for i in range(books):
+        name = f"libro_{i:05d}"
+        with open(os.path.join(books_directory, name + ".txt"), "w", encoding="utf-8") as f:
+            f.write(" ".join(rng.choices(vocabulary, k=words_per_book)))
+        if quizzes_directory is not None:
+            questions = [{"id": q, "question": f"Pregunta {q} sobre el libro {i}",
+                          "options": [f"{letter}) Opción {letter}" for letter in "abcd"],
+                          "correct_answer": rng.randint(1, 4)} for q in range(1, 6)]
+            with open(os.path.join(quizzes_directory, name + ".json"), "w", encoding="utf-8") as f:
+                json.dump({"book_title": f"Libro sintético {i}", "questions": questions}, f, ensure_ascii=False)
+        min_age = rng.randint(6, 14)
+        catalog.append({"title": f"Libro sintético {i}", "author": f"Autor {i % 97}",
+                        "min_age": min_age, "max_age": min_age + 3, "content_filename": name + ".txt"})
+
+    catalog_file = os.path.join(books_directory, "catalog.json")
+    with open(catalog_file, "w", encoding="utf-8") as f:
+        json.dump(catalog, f, ensure_ascii=False)
+    return catalog_file
+
+
+def generate_sessions(db_manager, users, sessions, seed=42):
+    """
+    Crea `users` usuarios y reparte entre ellos `sessions` sesiones terminadas sobre los libros ya
+    cargados (los triggers de totales se aplican como en uso normal). Devuelve los IDs de usuario.
+    """
+    rng = random.Random(seed)
+    conn = db_manager._get_connection()
+    book_ids = [row[0] for row in conn.execute("SELECT id FROM books")]
+    with conn:
+        conn.executemany("INSERT INTO users (age) VALUES (?)", [(rng.randint(6, 17),) for _ in range(users)])
+    user_ids = [row[0] for row in conn.execute("SELECT id FROM users ORDER BY id DESC LIMIT ?", (users,))]
+
+    ratings = ("Normal", "Necesita mejorar (Lento)", "Rápido")
+    remaining = sessions
+    while remaining > 0:
+        chunk = min(remaining, SESSION_INSERT_CHUNK)
+        rows = []
+        for _ in range(chunk):
+            day = rng.randint(1, 28)
+            duration = rng.randint(60, 3600)
+            rows.append((rng.choice(user_ids), rng.choice(book_ids),
+                         f"2024-{rng.randint(1, 12):02d}-{day:02d} {rng.randint(8, 20):02d}:00:00",
+                         f"2024-01-{day:02d} 21:00:00", duration, rng.uniform(20, 300),
+                         rng.uniform(0, 100), rng.choice(ratings),
+                         rng.choice((None, 0.0, 20.0, 40.0, 60.0, 80.0, 100.0))))
+        with conn:
+            conn.executemany(
+                """INSERT INTO reading_sessions (user_id, book_id, start_time, end_time, duration_seconds, wpm,
+                                                 age_appropriateness_score, performance_rating, quiz_score)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                rows
+            )
+        remaining -= chunk
+    return user_ids
+
+
+def generate_quiz_responses(db_manager, book_id, students, seed=42):
+    """
+    Respuestas de `students` alumnos al cuestionario ya compilado del libro, con un modelo logístico
+    de dos parámetros (habilidad del alumno, dificultad y discriminación de cada pregunta). Las sesiones
+    son ficticias: solo se escriben filas en quiz_responses.
+    """
+    rng = random.Random(seed)
+    quiz = db_manager.get_quiz(book_id)
+    items = [(rng.uniform(-1.5, 1.5), rng.uniform(0.3, 2.0), len(q["options"]), q["correct_answer"])
+             for q in quiz["questions"]]
+    conn = db_manager._get_connection()
+    first_session = conn.execute("SELECT COALESCE(MAX(id), 0) FROM reading_sessions").fetchone()[0] + 1_000_000
+    rows = []
+    for session_id in range(first_session, first_session + students):
+        ability = rng.gauss(0, 1)
+        for position, (difficulty, discrimination, option_count, correct) in enumerate(items):
+            if rng.random() < 1 / (1 + math.exp(-discrimination * (ability - difficulty))):
+                answer = correct
+            else:
+                answer = rng.choice([option for option in range(option_count + 1) if option != correct])
+            rows.append((book_id, position, session_id, answer, int(answer == correct), quiz["quiz_hash"]))
+    with conn:
+        conn.executemany(
+            """INSERT INTO quiz_responses (book_id, position, session_id, answer, correct, quiz_hash)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            rows
+        )
+    return items
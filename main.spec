@@ -3,10 +3,12 @@ import glob
 
 # Archivos .txt en src/books_content
 txt_files = glob.glob('src/books_content/*.txt')
+# Metadatos del catálogo (catalog.json y <libro>.json) en src/books_content
+meta_files = glob.glob('src/books_content/*.json')
 # Archivos .json en src/quizzes
 json_files = glob.glob('src/quizzes/*.json')
 
-datas = [(f, 'src/books_content') for f in txt_files] + [(f, 'src/quizzes') for f in json_files]
+datas = [(f, 'src/books_content') for f in txt_files + meta_files] + [(f, 'src/quizzes') for f in json_files]
 
 a = Analysis(
     ['src/main.py'],
@@ -0,0 +1,220 @@
+# src/aggregates.py
+
+from src.config import QUIZ_PASS_THRESHOLD
+
+# Totales por usuario y por libro sobre las sesiones terminadas (end_time no nulo). Los mantienen
+# triggers sobre reading_sessions, así que los paneles leen una fila en lugar de recorrer sesiones.
+# Se guardan sumas y conteos (no promedios) para poder sumar y restar cada sesión.
+USER_STATS_COLUMNS = ("session_count", "total_seconds", "wpm_sum", "wpm_count",
+                      "quiz_count", "quiz_sum", "quiz_pass_count")
+BOOK_STATS_COLUMNS = ("started_count", "completed_count", "total_seconds", "wpm_sum", "wpm_count",
+                      "quiz_count", "quiz_sum", "quiz_pass_count")
+
+_TRIGGER_NAMES = (
+    "trg_reading_sessions_ai_started", "trg_reading_sessions_ai_finished",
+    "trg_reading_sessions_au_unfinish", "trg_reading_sessions_au_finish", "trg_reading_sessions_au_book",
+    "trg_reading_sessions_ad_started", "trg_reading_sessions_ad_finished",
+)
+
+
+def create_aggregate_tables(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS user_stats (
+            user_id INTEGER PRIMARY KEY,
+            session_count INTEGER NOT NULL DEFAULT 0,
+            total_seconds INTEGER NOT NULL DEFAULT 0,
+            wpm_sum REAL NOT NULL DEFAULT 0,
+            wpm_count INTEGER NOT NULL DEFAULT 0,
+            quiz_count INTEGER NOT NULL DEFAULT 0,
+            quiz_sum REAL NOT NULL DEFAULT 0,
+            quiz_pass_count INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS book_stats (
+            book_id INTEGER PRIMARY KEY,
+            started_count INTEGER NOT NULL DEFAULT 0,
+            completed_count INTEGER NOT NULL DEFAULT 0,
+            total_seconds INTEGER NOT NULL DEFAULT 0,
+            wpm_sum REAL NOT NULL DEFAULT 0,
+            wpm_count INTEGER NOT NULL DEFAULT 0,
+            quiz_count INTEGER NOT NULL DEFAULT 0,
+            quiz_sum REAL NOT NULL DEFAULT 0,
+            quiz_pass_count INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+
+
+def _session_values(row, threshold):
+    """Aporte de una sesión terminada (row es NEW u OLD): total_seconds ... quiz_pass_count."""
+    return (f"COALESCE({row}.duration_seconds, 0), COALESCE({row}.wpm, 0), {row}.wpm IS NOT NULL, "
+            f"{row}.quiz_score IS NOT NULL, COALESCE({row}.quiz_score, 0), "
+            f"COALESCE({row}.quiz_score >= {threshold}, 0)")
+
+
+def _add_finished_sql(row, threshold):
+    values = _session_values(row, threshold)
+    return f"""
+        INSERT INTO user_stats (user_id, session_count, total_seconds, wpm_sum, wpm_count,
+                                quiz_count, quiz_sum, quiz_pass_count)
+        VALUES ({row}.user_id, 1, {values})
+        ON CONFLICT(user_id) DO UPDATE SET
+            session_count = session_count + 1,
+            total_seconds = total_seconds + excluded.total_seconds,
+            wpm_sum = wpm_sum + excluded.wpm_sum,
+            wpm_count = wpm_count + excluded.wpm_count,
+            quiz_count = quiz_count + excluded.quiz_count,
+            quiz_sum = quiz_sum + excluded.quiz_sum,
+            quiz_pass_count = quiz_pass_count + excluded.quiz_pass_count;
+        INSERT INTO book_stats (book_id, completed_count, total_seconds, wpm_sum, wpm_count,
+                                quiz_count, quiz_sum, quiz_pass_count)
+        VALUES ({row}.book_id, 1, {values})
+        ON CONFLICT(book_id) DO UPDATE SET
+            completed_count = completed_count + 1,
+            total_seconds = total_seconds + excluded.total_seconds,
+            wpm_sum = wpm_sum + excluded.wpm_sum,
+            wpm_count = wpm_count + excluded.wpm_count,
+            quiz_count = quiz_count + excluded.quiz_count,
+            quiz_sum = quiz_sum + excluded.quiz_sum,
+            quiz_pass_count = quiz_pass_count + excluded.quiz_pass_count;"""
+
+
+def _remove_finished_sql(row, threshold):
+    deltas = f"""
+            total_seconds = total_seconds - COALESCE({row}.duration_seconds, 0),
+            wpm_sum = wpm_sum - COALESCE({row}.wpm, 0),
+            wpm_count = wpm_count - ({row}.wpm IS NOT NULL),
+            quiz_count = quiz_count - ({row}.quiz_score IS NOT NULL),
+            quiz_sum = quiz_sum - COALESCE({row}.quiz_score, 0),
+            quiz_pass_count = quiz_pass_count - COALESCE({row}.quiz_score >= {threshold}, 0)"""
+    return f"""
+        UPDATE user_stats SET session_count = session_count - 1, {deltas}
+        WHERE user_id = {row}.user_id;
+        UPDATE book_stats SET completed_count = completed_count - 1, {deltas}
+        WHERE book_id = {row}.book_id;"""
+
+
+def _add_started_sql(row):
+    return f"""
+        INSERT INTO book_stats (book_id, started_count) VALUES ({row}.book_id, 1)
+        ON CONFLICT(book_id) DO UPDATE SET started_count = started_count + 1;"""
+
+
+def _remove_started_sql(row):
+    return f"""
+        UPDATE book_stats SET started_count = started_count - 1 WHERE book_id = {row}.book_id;"""
+
+
+def drop_aggregate_triggers(conn):
+    for name in _TRIGGER_NAMES:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def create_aggregate_triggers(conn, threshold=QUIZ_PASS_THRESHOLD):
+    """(Re)crea los triggers con el umbral de aprobación indicado."""
+    drop_aggregate_triggers(conn)
+    watched_columns = "user_id, book_id, end_time, duration_seconds, wpm, quiz_score"
+    triggers = [
+        ("trg_reading_sessions_ai_started", "AFTER INSERT ON reading_sessions",
+         _add_started_sql("NEW")),
+        ("trg_reading_sessions_ai_finished", "AFTER INSERT ON reading_sessions WHEN NEW.end_time IS NOT NULL",
+         _add_finished_sql("NEW", threshold)),
+        # Una actualización resta el aporte anterior y suma el nuevo (p. ej. al terminar o recalificar)
+        ("trg_reading_sessions_au_unfinish",
+         f"AFTER UPDATE OF {watched_columns} ON reading_sessions WHEN OLD.end_time IS NOT NULL",
+         _remove_finished_sql("OLD", threshold)),
+        ("trg_reading_sessions_au_finish",
+         f"AFTER UPDATE OF {watched_columns} ON reading_sessions WHEN NEW.end_time IS NOT NULL",
+         _add_finished_sql("NEW", threshold)),
+        ("trg_reading_sessions_au_book",
+         "AFTER UPDATE OF book_id ON reading_sessions WHEN OLD.book_id IS NOT NEW.book_id",
+         _remove_started_sql("OLD") + _add_started_sql("NEW")),
+        ("trg_reading_sessions_ad_started", "AFTER DELETE ON reading_sessions",
+         _remove_started_sql("OLD")),
+        ("trg_reading_sessions_ad_finished", "AFTER DELETE ON reading_sessions WHEN OLD.end_time IS NOT NULL",
+         _remove_finished_sql("OLD", threshold)),
+    ]
+    for name, event, body in triggers:
+        conn.execute(f"CREATE TRIGGER {name} {event} BEGIN {body}\n END")
+
+
+def _expected_user_stats_sql(threshold):
+    return f"""SELECT user_id, COUNT(*), COALESCE(SUM(duration_seconds), 0), COALESCE(SUM(wpm), 0), COUNT(wpm),
+                      COUNT(quiz_score), COALESCE(SUM(quiz_score), 0), COALESCE(SUM(quiz_score >= {threshold}), 0)
+               FROM reading_sessions
+               WHERE end_time IS NOT NULL
+               GROUP BY user_id"""
+
+
+def _expected_book_stats_sql(threshold):
+    finished = "CASE WHEN end_time IS NOT NULL THEN {} END"
+    return f"""SELECT book_id, COUNT(*), COUNT(end_time),
+                      COALESCE(SUM({finished.format('duration_seconds')}), 0),
+                      COALESCE(SUM({finished.format('wpm')}), 0),
+                      COUNT({finished.format('wpm')}),
+                      COUNT({finished.format('quiz_score')}),
+                      COALESCE(SUM({finished.format('quiz_score')}), 0),
+                      COALESCE(SUM({finished.format(f'quiz_score >= {threshold}')}), 0)
+               FROM reading_sessions
+               GROUP BY book_id"""
+
+
+def fill_aggregate_tables(conn, threshold=QUIZ_PASS_THRESHOLD):
+    """Recalcula ambas tablas desde reading_sessions (dentro de la transacción del llamador)."""
+    conn.execute("DELETE FROM user_stats")
+    conn.execute("DELETE FROM book_stats")
+    conn.execute(f"INSERT INTO user_stats (user_id, {', '.join(USER_STATS_COLUMNS)}) "
+                 + _expected_user_stats_sql(threshold))
+    conn.execute(f"INSERT INTO book_stats (book_id, {', '.join(BOOK_STATS_COLUMNS)}) "
+                 + _expected_book_stats_sql(threshold))
+
+
+def create_aggregate_schema(conn):
+    """Paso de migración: tablas, triggers y carga inicial desde las sesiones existentes."""
+    create_aggregate_tables(conn)
+    create_aggregate_triggers(conn)
+    fill_aggregate_tables(conn)
+
+
+def _compare(conn, table, key, columns, expected_sql):
+    current = {row[0]: tuple(row[1:]) for row in
+               conn.execute(f"SELECT {key}, {', '.join(columns)} FROM {table}")}
+    expected = {row[0]: tuple(row[1:]) for row in conn.execute(expected_sql)}
+    zero = (0,) * len(columns)
+    problems = []
+    for row_key in sorted(current.keys() | expected.keys()):
+        have = current.get(row_key, zero)
+        want = expected.get(row_key, zero)
+        # Las sumas de REAL acumulan error de redondeo al sumar y restar; se tolera una diferencia mínima
+        if any(abs(h - w) > 1e-6 * max(1.0, abs(w)) for h, w in zip(have, want)):
+            problems.append((table, row_key, dict(zip(columns, have)), dict(zip(columns, want))))
+    return problems
+
+
+def check_aggregates(conn, threshold=QUIZ_PASS_THRESHOLD):
+    """Lista de (tabla, id, valores_actuales, valores_esperados) para las filas que no cuadran."""
+    return (_compare(conn, "user_stats", "user_id", USER_STATS_COLUMNS, _expected_user_stats_sql(threshold))
+            + _compare(conn, "book_stats", "book_id", BOOK_STATS_COLUMNS, _expected_book_stats_sql(threshold)))
+
+
+def rebuild_aggregates(conn, threshold=QUIZ_PASS_THRESHOLD):
+    """Recalcula las tablas y recrea los triggers con el umbral actual, en una sola transacción."""
+    conn.execute("BEGIN")  # Explícito: sqlite3 no abre transacciones implícitas para DDL
+    try:
+        create_aggregate_triggers(conn, threshold)
+        fill_aggregate_tables(conn, threshold)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+if __name__ == "__main__":
+    # python -m src.aggregates [--check] : verifica (y sin --check, recalcula) user_stats y book_stats
+    # (python -m src.cli check-stats [--fix])
+    import sys
+    from src.cli import main
+
+    arguments = sys.argv[1:]
+    sys.exit(main(["check-stats"] + [arg for arg in arguments if arg != "--check"]
+                  + ([] if "--check" in arguments else ["--fix"])))
@@ -0,0 +1,84 @@
+# src/batch_stats.py
+
+from src.config import RESCORE_CHUNK_SIZE
+from src.scoring_model import RATING_LABELS, default_scoring_model
+
+
+def calculate_reading_stats_batch(ages, word_counts, durations, model=None, readabilities=None):
+    """
+    Versión por lotes de AppLogic.calculate_reading_stats: recibe secuencias de edades, palabras y
+    segundos y devuelve (wpm, puntuaciones, códigos de calificación) en arreglos del mismo largo.
+    Con NumPy el cálculo es vectorizado; sin él se recorre una vez con los rangos compilados.
+    """
+    return (model or default_scoring_model).score_batch(ages, word_counts, durations, readabilities)
+
+
+def rating_labels(codes):
+    """Convierte códigos de calificación en el texto que se guarda en reading_sessions."""
+    return [RATING_LABELS[code] for code in codes]
+
+
+def rescore_all_sessions(db_manager, chunk_size=RESCORE_CHUNK_SIZE, model=None):
+    """
+    Recalcula wpm, puntuación y calificación de todas las sesiones terminadas con el modelo actual.
+    Recorre reading_sessions por bloques de chunk_size (por id) y solo reescribe las filas que cambian,
+    un bloque por transacción. Devuelve {"sessions": revisadas, "updated": actualizadas}.
+    """
+    db_manager.flush_sessions()
+    conn = db_manager._get_connection()
+    last_id = 0
+    total = updated = 0
+
+    while True:
+        rows = conn.execute(
+            """SELECT rs.id, u.age, b.word_count, rs.duration_seconds, b.readability_fh,
+                      rs.wpm, rs.age_appropriateness_score, rs.performance_rating
+               FROM reading_sessions rs
+               JOIN users u ON u.id = rs.user_id
+               JOIN books b ON b.id = rs.book_id
+               WHERE rs.id > ? AND rs.duration_seconds IS NOT NULL
+               ORDER BY rs.id
+               LIMIT ?""",
+            (last_id, chunk_size)
+        ).fetchall()
+        if not rows:
+            break
+
+        ids, ages, word_counts, durations, readabilities, old_values = [], [], [], [], [], []
+        for row in rows:
+            ids.append(row[0])
+            ages.append(row[1])
+            word_counts.append(row[2])
+            durations.append(row[3])
+            readabilities.append(row[4])
+            old_values.append((row[5], row[6], row[7]))
+
+        wpm, scores, codes = calculate_reading_stats_batch(ages, word_counts, durations, model, readabilities)
+        changes = [
+            (new_wpm, new_score, RATING_LABELS[code], session_id)
+            for session_id, new_wpm, new_score, code, old in zip(ids, wpm.tolist(), scores.tolist(),
+                                                                 codes.tolist(), old_values)
+            if (new_wpm, new_score, RATING_LABELS[code]) != old
+        ]
+        if changes:
+            with conn:
+                conn.executemany(
+                    """UPDATE reading_sessions
+                       SET wpm = ?, age_appropriateness_score = ?, performance_rating = ?
+                       WHERE id = ?""",
+                    changes
+                )
+
+        total += len(rows)
+        updated += len(changes)
+        last_id = ids[-1]
+
+    return {"sessions": total, "updated": updated}
+
+
+if __name__ == "__main__":
+    # python -m src.batch_stats : recalcula todas las sesiones tras ajustar los rangos de WPM (python -m src.cli rescore)
+    import sys
+    from src.cli import main
+
+    sys.exit(main(["rescore"] + sys.argv[1:]))
@@ -0,0 +1,96 @@
+# src/book_pager.py
+
+import os
+import threading
+
+from src.config import READER_PAGE_CHARS
+
+
+class _PageIndex:
+    """
+    Lo que ya se leyó de un archivo de libro: dónde empieza cada página y el texto de cada una.
+    Se guarda en la caché de contenido, así que volver a abrir el libro no repite la lectura.
+    """
+
+    def __init__(self, page_chars):
+        self.page_chars = page_chars
+        self.lock = threading.Lock()
+        self.offsets = [0]  # Posición (tell()) donde empieza cada página conocida
+        self.pages = {}
+        self.reached_end = False
+
+
+class BookPager:
+    """
+    Lee un libro de disco por páginas, sin cargar el archivo completo.
+    Los desplazamientos de cada página se descubren a medida que se leen, así que
+    abrir la primera página cuesta lo mismo sin importar el tamaño del libro.
+
+    Con content_cache, las páginas ya leídas y sus desplazamientos se comparten entre aperturas del
+    mismo archivo (la caché los descarta si el archivo cambia). Sin ella, o si el libro no cabe en
+    la caché, se guardan como mucho max_cached_pages páginas.
+    """
+
+    def __init__(self, path, page_chars=READER_PAGE_CHARS, max_cached_pages=8, content_cache=None):
+        self.path = path
+        self.page_chars = page_chars
+        self.max_cached_pages = max_cached_pages
+
+        index = None
+        if content_cache is not None and os.path.getsize(path) <= content_cache.max_bytes:
+            # Crear el índice no lee el archivo; la caché solo comprueba que exista y si cambió
+            index = content_cache.get(path, lambda _: _PageIndex(page_chars))
+            if index.page_chars != page_chars:
+                index = None
+            else:
+                self.max_cached_pages = None  # La caché de contenido limita la memoria
+        self._index = index or _PageIndex(page_chars)
+        self._file = open(path, 'r', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def get_page(self, index):
+        """Devuelve el texto de la página `index`, o None si el libro no llega hasta ahí."""
+        with self._lock, self._index.lock:
+            pages, offsets = self._index.pages, self._index.offsets
+            if index in pages:
+                return pages[index]
+
+            # Avanzar secuencialmente hasta descubrir dónde empieza la página pedida
+            while index >= len(offsets) and not self._index.reached_end:
+                self._read_page_at(len(offsets) - 1)
+
+            # Con el final alcanzado, el último desplazamiento marca el fin del archivo, no una página
+            last_page = len(offsets) - (2 if self._index.reached_end else 1)
+            if index > last_page:
+                return None
+            if index in pages:
+                return pages[index]
+            return self._read_page_at(index)
+
+    def is_last_page(self, index):
+        with self._index.lock:
+            return self._index.reached_end and index >= len(self._index.offsets) - 2
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def _read_page_at(self, index):
+        page_index = self._index
+        self._file.seek(page_index.offsets[index])
+        text = self._file.read(self.page_chars)
+
+        # Completar hasta el siguiente salto de línea para no cortar palabras ni párrafos
+        if len(text) == self.page_chars:
+            text += self._file.readline(self.page_chars)
+        next_offset = self._file.tell()
+
+        if not text or not self._file.read(1):
+            page_index.reached_end = True
+        if index == len(page_index.offsets) - 1 and text:
+            page_index.offsets.append(next_offset)
+
+        if self.max_cached_pages is not None and len(page_index.pages) >= self.max_cached_pages:
+            page_index.pages.pop(next(iter(page_index.pages)))
+        page_index.pages[index] = text
+        return text
@@ -0,0 +1,239 @@
+# src/cli.py
+# Línea de comandos de administración, sin interfaz gráfica: nunca importa tkinter ni customtkinter,
+# así que funciona en servidores sin pantalla (p. ej. desde cron). Cada subcomando importa solo los
+# módulos que necesita; la ayuda y el análisis de argumentos no cargan la base de datos.
+#
+#   python -m src.cli [--db RUTA] <subcomando> [opciones]      (python -m src.cli --help para la lista)
+
+import argparse
+import sqlite3
+import sys
+
+from src.config import (LOG_LEVEL, REPORTS_DIRECTORY, REPORT_MAX_WORKERS, MERGE_MAX_WORKERS, TRANSFER_TABLES,
+                        TRANSFER_FORMATS, TRANSFER_CONFLICT_POLICIES)
+
+
+def _open_database(args):
+    from src.database import DatabaseManager
+
+    # Modo "sync": cada sesión se confirma al momento y el registro del diario queda para la aplicación
+    manager = DatabaseManager(db_path=args.db, journal_mode="sync", defer_catalog=True)
+    if args.catalog:
+        # Solo los subcomandos que consultan libros esperan a que el catálogo esté sincronizado
+        manager.load_catalog()
+    return manager
+
+
+def _format_optional(value, pattern):
+    return pattern.format(value) if value is not None else "-"
+
+
+# --- Subcomandos (reciben el DatabaseManager y los argumentos; devuelven el código de salida) ---
+def _cmd_seed(manager, args):
+    conn = manager._get_connection()
+    version = conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+    counts = [conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+              for table in ("books", "users", "reading_sessions")]
+    print(f"Base de datos lista: {manager.db_path} (esquema v{version})")
+    print(f"Libros: {counts[0]}, usuarios: {counts[1]}, sesiones: {counts[2]}")
+    return 0
+
+
+def _cmd_reindex(manager, args):
+    summary = manager.refresh_catalog(force=args.force)
+    if summary["skipped"]:
+        print("Catálogo sin cambios.")
+    else:
+        print(f"Libros insertados/actualizados: {summary['books']}, archivos reprocesados: {summary['reprocessed']}, "
+              f"cuestionarios cambiados: {len(summary['quizzes_changed'])}")
+    return 0
+
+
+def _cmd_rescore(manager, args):
+    from src.batch_stats import rescore_all_sessions
+
+    result = rescore_all_sessions(manager)
+    print(f"Sesiones revisadas: {result['sessions']}, actualizadas: {result['updated']}")
+    return 0
+
+
+def _cmd_check_stats(manager, args):
+    problems = manager.rebuild_aggregate_stats(check_only=not args.fix)
+    for table, key, have, want in problems:
+        print(f"{table} {key}: {have} != {want}")
+    if not problems:
+        print("user_stats y book_stats coinciden con las sesiones.")
+    elif args.fix:
+        print(f"{len(problems)} filas con diferencias; tablas recalculadas.")
+    return 1 if problems and not args.fix else 0
+
+
+def _cmd_add_user(manager, args):
+    print(manager.add_user(args.age))
+    return 0
+
+
+def _cmd_user_stats(manager, args):
+    summary = manager.get_user_reading_summary(args.user_id)
+    print(f"Sesiones terminadas: {summary['session_count']}, tiempo total: {summary['total_seconds']} s")
+    print(f"WPM promedio: {_format_optional(summary['avg_wpm'], '{:.1f}')}, "
+          f"cuestionarios: {summary['quiz_count']} "
+          f"(promedio {_format_optional(summary['avg_quiz_score'], '{:.1f}')}%, "
+          f"aprobados {_format_optional(summary['quiz_pass_rate'], '{:.0f}')}%)")
+    return 0
+
+
+def _cmd_recommend(manager, args):
+    from src.logic import AppLogic
+
+    books = AppLogic(manager).get_recommended_books(args.age, args.user)
+    for book in books[:args.limit]:
+        print(f"{book['id']:>5}  {book['title']} ({book['author']}, {book['min_age']}-{book['max_age']} años)")
+    return 0
+
+
+def _cmd_search(manager, args):
+    for book in manager.search_books(args.query, args.age, args.limit):
+        print(f"{book['id']:>5}  {book['title']} ({book['author']})")
+        if book["snippet"]:
+            print(f"       {book['snippet']}")
+    return 0
+
+
+def _cmd_export(manager, args):
+    from src.data_transfer import export_tables, print_results
+
+    print_results(export_tables(manager, args.directory, args.tables, args.format, args.gzip), "exportadas")
+    return 0
+
+
+def _cmd_import(manager, args):
+    from src.data_transfer import import_files, print_results
+
+    print_results(import_files(manager, args.files, args.on_conflict), "leídas")
+    return 0
+
+
+def _cmd_reports(manager, args):
+    from src.reports import generate_reports
+
+    result = generate_reports(manager, args.output_dir, args.users, args.age, args.since, args.until,
+                              not args.no_class_report, args.workers)
+    print(f"{result['students']} informes de alumnos en {result['seconds']:.1f} s "
+          f"({len(result['files'])} archivos en {args.output_dir})")
+    return 0
+
+
+def _cmd_quiz_analytics(manager, args):
+    from src.quiz_analytics import QuizAnalytics
+
+    analytics = QuizAnalytics(manager)
+    for book_id in args.book_ids or analytics.books_with_responses():
+        book = manager.get_book_info(book_id)
+        print(f"\n{book['title'] if book else book_id}")
+        for item in analytics.item_analysis(book_id):
+            print(f"  P{item.position + 1} ({item.responses} respuestas) dificultad {item.difficulty:.2f} "
+                  f"discriminación {_format_optional(item.discrimination, '{:+.2f}')}  {item.question or ''}")
+            for option in item.options:
+                mark = "*" if option.is_correct else " "
+                print(f"    {mark} {option.answer}: {option.frequency:6.1%} "
+                      f"(resto medio {_format_optional(option.mean_rest_score, '{:.2f}')}) {option.text or ''}")
+    return 0
+
+
+def _cmd_merge(manager, args):
+    from src.merge import merge_databases, source_files
+
+    result = merge_databases(manager, source_files(args.sources), args.workers, args.staging_directory)
+    failed = 0
+    for source in result["sources"]:
+        if "error" in source:
+            failed += 1
+            print(f"ERROR {source['path']}: {source['error']}")
+        else:
+            print(f"{source['path']}: +{source['users_added']} usuarios, +{source['sessions_added']} sesiones, "
+                  f"{source['sessions_updated']} actualizadas, {source['sessions_skipped']} omitidas "
+                  f"({source['seconds']:.2f} s)")
+    print(f"Total: {len(result['sources'])} bases en {result['seconds']:.1f} s")
+    return 1 if failed else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m src.cli",
+                                     description="Tareas de administración de AtlasRead sin interfaz gráfica")
+    parser.add_argument("--db", default=None, help="ruta de la base de datos (por defecto, la configurada)")
+    parser.add_argument("--log-level", default=LOG_LEVEL, help="DEBUG, INFO, WARNING o ERROR")
+    subparsers = parser.add_subparsers(dest="command", required=True, metavar="subcomando")
+
+    def add(name, handler, help_text, catalog=False):
+        subparser = subparsers.add_parser(name, help=help_text, description=help_text)
+        subparser.set_defaults(handler=handler, catalog=catalog)
+        return subparser
+
+    add("seed", _cmd_seed, "Crea o actualiza el esquema de la base y carga el catálogo de libros", catalog=True)
+    add("reindex", _cmd_reindex, "Vuelve a indexar libros y cuestionarios").add_argument(
+        "--force", action="store_true", help="ignora la huella guardada y reprocesa todo")
+    add("rescore", _cmd_rescore, "Recalcula WPM y calificación de todas las sesiones con el modelo actual")
+    add("check-stats", _cmd_check_stats, "Verifica user_stats/book_stats contra las sesiones").add_argument(
+        "--fix", action="store_true", help="además recalcula las tablas")
+    add("add-user", _cmd_add_user, "Crea un usuario e imprime su ID").add_argument("--age", type=int, required=True)
+    add("user-stats", _cmd_user_stats, "Totales de lectura de un usuario").add_argument("user_id", type=int)
+
+    recommend = add("recommend", _cmd_recommend, "Libros recomendados para una edad", catalog=True)
+    recommend.add_argument("--age", type=int, required=True)
+    recommend.add_argument("--user", type=int, default=None, help="ajusta la recomendación a este lector")
+    recommend.add_argument("--limit", type=int, default=None)
+
+    search = add("search", _cmd_search, "Busca libros por título, autor y texto", catalog=True)
+    search.add_argument("query")
+    search.add_argument("--age", type=int, default=None)
+    search.add_argument("--limit", type=int, default=20)
+
+    export = add("export", _cmd_export, "Exporta tablas a <directorio>/<tabla>.<formato>[.gz]")
+    export.add_argument("directory")
+    export.add_argument("--tables", nargs="+", choices=TRANSFER_TABLES, default=list(TRANSFER_TABLES))
+    export.add_argument("--format", choices=TRANSFER_FORMATS, default="csv")
+    export.add_argument("--gzip", action="store_true", help="comprime cada archivo con gzip")
+    import_ = add("import", _cmd_import, "Importa archivos exportados (la tabla sale del nombre del archivo)")
+    import_.add_argument("files", nargs="+")
+    import_.add_argument("--on-conflict", choices=TRANSFER_CONFLICT_POLICIES, default="skip")
+
+    reports = add("reports", _cmd_reports, "Informes PDF de progreso (necesita reportlab)")
+    selection = reports.add_mutually_exclusive_group()
+    selection.add_argument("--age", type=int, help="solo los alumnos de esa edad")
+    selection.add_argument("--users", type=int, nargs="+", help="IDs de los alumnos")
+    reports.add_argument("--since", help="primer día del periodo (AAAA-MM-DD)")
+    reports.add_argument("--until", help="último día del periodo (AAAA-MM-DD)")
+    reports.add_argument("--output-dir", default=REPORTS_DIRECTORY)
+    reports.add_argument("--no-class-report", action="store_true", help="no generar el informe de la clase")
+    reports.add_argument("--workers", type=int, default=REPORT_MAX_WORKERS, help="procesos (por defecto, CPUs)")
+
+    add("quiz-analytics", _cmd_quiz_analytics, "Dificultad y discriminación de las preguntas",
+        catalog=True).add_argument("book_ids", type=int, nargs="*", help="por defecto, todos los libros con respuestas")
+
+    merge = add("merge", _cmd_merge, "Consolida bases de kioscos en esta base", catalog=True)
+    merge.add_argument("sources", nargs="+", help="bases de los kioscos o directorios con archivos .db")
+    merge.add_argument("--workers", type=int, default=MERGE_MAX_WORKERS, help="procesos (por defecto, CPUs)")
+    merge.add_argument("--staging-directory", default=None, help="dónde crear las bases de preparación")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    from src import instrumentation
+    instrumentation.configure("", args.log_level)
+
+    manager = None
+    try:
+        manager = _open_database(args)
+        return args.handler(manager, args)
+    except (ValueError, RuntimeError, OSError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if manager is not None:
+            manager.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -26,6 +26,36 @@ WPM_EXPECTED = {
     # Para cualquier edad por encima de 18, usar el rango de 18
     'default': (150, 250)
 }
+# Ajuste de los rangos de WPM según la dificultad del libro (índice de Fernández-Huerta, 0-100):
+# un texto más difícil que la referencia baja los rangos esperados y uno más fácil los sube
+READABILITY_REFERENCE = 70.0  # Índice con el que los rangos se usan tal cual
+READABILITY_WPM_SLOPE = 0.005  # Ajuste por punto de diferencia (0 desactiva el ajuste)
+READABILITY_FACTOR_LIMITS = (0.85, 1.15)  # Ajuste mínimo y máximo de los rangos
+# Sesiones por bloque al recalcular en lote todas las calificaciones (python -m src.batch_stats)
+RESCORE_CHUNK_SIZE = 5000
+
+# Ajustes de rendimiento de SQLite aplicados a cada conexión del pool
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",        # Lectores y escritor no se bloquean entre sí
+    "synchronous": "NORMAL",      # Seguro con WAL y evita un fsync por cada commit
+    "temp_store": "MEMORY",
+    "mmap_size": 64 * 1024 * 1024,  # 64 MB mapeados en memoria para lecturas
+    "cache_size": -16000,         # Negativo = KiB (aprox. 16 MB de caché de páginas)
+    "busy_timeout": 5000,         # Milisegundos de espera si la base está bloqueada
+}
+# Número de sentencias preparadas que cada conexión mantiene en caché
+SQLITE_STATEMENT_CACHE_SIZE = 128
+
+# Diario de sesiones de lectura: los fines de sesión se escriben en lote en una transacción (los
+# inicios se insertan al momento para que SQLite asigne el ID)
+#   "sync"   -> cada evento se confirma al momento (una escritura a disco por evento)
+#   "log"    -> en lote, anotando cada evento en un archivo junto a la base de datos; si la aplicación
+#               se cierra de forma inesperada, lo pendiente se reaplica al iniciar (solo el proceso
+#               que bloquea el archivo lo usa; otro proceso sobre la misma base escribe en modo sync)
+#   "memory" -> en lote solo en memoria; un cierre inesperado pierde lo pendiente
+SESSION_JOURNAL_MODE = "log"
+SESSION_JOURNAL_MAX_EVENTS = 64      # Eventos pendientes que fuerzan una escritura
+SESSION_JOURNAL_FLUSH_SECONDS = 2.0  # Antigüedad máxima de un evento pendiente
 
 # --- FUNCIÓN CENTRAL PARA DETERMINAR LA RUTA BASE ---
 def get_base_path():
@@ -51,9 +81,80 @@ def get_base_path():
 DATABASE_PATH = os.path.join(get_base_path(), DB_NAME)
 BOOKS_DIRECTORY = os.path.join(get_base_path(), "src", "books_content") # Los libros están en src/books_content
 QUIZZES_DIRECTORY = os.path.join(get_base_path(), "src", "quizzes") # Los quizzes están en src/quizzes
+# Metadatos (título, autor, edades) de los libros; un <libro>.json junto al .txt tiene prioridad
+CATALOG_FILE = os.path.join(BOOKS_DIRECTORY, "catalog.json")
+# Rangos de WPM por edad editables sin recompilar ({"6": [30, 60], ..., "default": [150, 250]});
+# si el archivo no existe se usa WPM_EXPECTED. Los cambios se aplican en caliente.
+SCORING_MODEL_FILE = os.path.join(get_base_path(), "wpm_bands.json")
+SCORING_MODEL_RELOAD_SECONDS = 5.0  # Cada cuánto se comprueba si el archivo cambió
+
+# Indexador del catálogo: a partir de cuántos archivos cambiados se usa un pool de procesos
+INDEXER_PROCESS_POOL_THRESHOLD = 64
+INDEXER_MAX_WORKERS = None  # None = número de CPUs
+# Tamaño de bloque con el que se leen los libros al calcular sus estadísticas de texto
+TEXT_STATS_CHUNK_BYTES = 256 * 1024
+
+# Caché en memoria de las páginas ya leídas de los libros (y dónde empieza cada una)
+CONTENT_CACHE_MAX_BYTES = 32 * 1024 * 1024  # Presupuesto total en bytes
+CONTENT_CACHE_REVALIDATE_SECONDS = 2.0  # Cada cuánto se comprueba si el archivo cambió en disco
+
+# Lector paginado: tamaño de página y cuántas páginas se mantienen cargadas en el widget de texto
+READER_PAGE_CHARS = 4000  # Caracteres aproximados por página (se completa hasta el fin de línea)
+READER_PREFETCH_PAGES = 1  # Páginas extra cargadas antes y después de las visibles
+READER_MAX_LOADED_PAGES = 4  # Máximo de páginas en el widget a la vez
+READER_SCROLL_MARGIN = 0.15  # Fracción del contenido cargado a partir de la cual se carga otra página
+READER_POLL_MS = 150  # Cada cuánto se revisa la posición de desplazamiento
+
+# Búsqueda de libros (texto completo con FTS5)
+SEARCH_RESULTS_LIMIT = 50
+SEARCH_SNIPPET_TOKENS = 12  # Palabras alrededor de la coincidencia en el fragmento mostrado
+SEARCH_DEBOUNCE_MS = 200  # Espera tras la última tecla antes de buscar
+
+# Recomendaciones por edad (src/recommender.py): peso de cada señal en la puntuación de un libro
+RECOMMENDER_READABILITY_WEIGHT = 0.6  # Cercanía de la legibilidad del libro a la adecuada para el lector
+RECOMMENDER_POPULARITY_WEIGHT = 0.4  # Sesiones terminadas del libro (escala logarítmica)
+RECOMMENDER_READABILITY_TOLERANCE = 25.0  # Puntos de Fernández-Huerta de diferencia que dejan la cercanía en 0
+RECOMMENDER_READABILITY_SHIFT = 20.0  # Puntos de legibilidad por cada 100% que el lector supera su WPM esperado
+RECOMMENDER_POPULARITY_REFRESH_SECONDS = 300.0  # Cada cuánto se vuelve a leer la popularidad de book_stats
+
+# Pantalla de estadísticas: sesiones mostradas por página
+STATS_PAGE_SIZE = 15
+# Puntuación mínima (%) para considerar aprobado un cuestionario. Si se cambia, ejecutar
+# DatabaseManager.rebuild_aggregate_stats() para recalcular user_stats/book_stats con el nuevo umbral.
+QUIZ_PASS_THRESHOLD = 70
+
+# Informes PDF de progreso (python -m src.reports; necesita reportlab)
+REPORTS_DIRECTORY = os.path.join(get_base_path(), "reports")
+REPORT_MAX_SESSION_ROWS = 300  # Sesiones (las más recientes) en la tabla de cada alumno; el resto solo suma
+REPORT_USERS_PER_TASK = 20  # Alumnos por tarea enviada a cada proceso
+REPORT_MAX_WORKERS = None  # None = número de CPUs
+REPORT_TASKS_PER_WORKER = 50  # Tareas tras las que se reemplaza un proceso (acota su memoria)
+
+# Exportación/importación masiva de tablas (python -m src.data_transfer)
+# Tablas que se pueden exportar e importar, en el orden en que se importan (las sesiones apuntan a
+# usuarios y libros)
+TRANSFER_TABLES = ("users", "books", "reading_sessions")
+TRANSFER_FORMATS = ("csv", "jsonl")
+TRANSFER_CONFLICT_POLICIES = ("skip", "update", "error")  # Si el id (o content_path, en books) ya existe
+TRANSFER_FETCH_ROWS = 10000  # Filas leídas por fetchmany al exportar
+TRANSFER_BATCH_ROWS = 50000  # Filas por transacción al importar
+TRANSFER_GZIP_LEVEL = 6  # Compresión de los archivos .gz (9 comprime poco más y es bastante más lento)
+
+# Consolidación de las bases de los kioscos en una central (python -m src.merge)
+MERGE_MAX_WORKERS = None  # Procesos que preparan las bases en paralelo (None = número de CPUs)
+
+# Tareas en segundo plano de la interfaz (base de datos y disco fuera del hilo de Tk)
+TASK_MAX_WORKERS = 2
+TASK_POLL_MS = 20  # Cada cuánto el hilo de Tk recoge resultados mientras hay tareas pendientes
+
+# Diagnóstico (también con argumentos de src/main.py: --log-level, --profile, --profile-file)
+LOG_LEVEL = os.environ.get("ATLASREAD_LOG_LEVEL", "WARNING")  # DEBUG, INFO, WARNING, ERROR
+PROFILE_MODE = os.environ.get("ATLASREAD_PROFILE", "")  # "" (desactivado), "report" o "cprofile"
+# Sin extensión: el informe se guarda en <archivo>.txt y las estadísticas de cProfile en <archivo>.prof
+PROFILE_OUTPUT_FILE = os.environ.get("ATLASREAD_PROFILE_FILE", "atlasread_profile")
 
 # (Opcional, para depuración)
 # print(f"DEBUG - Ruta base de la aplicación: {get_base_path()}")
 # print(f"DEBUG - Ruta de la base de datos: {DATABASE_PATH}")
 # print(f"DEBUG - Ruta del directorio de libros: {BOOKS_DIRECTORY}")
-# print(f"DEBUG - Ruta del directorio de cuestionarios: {QUIZZES_DIRECTORY}")
\ No newline at end of file
+# print(f"DEBUG - Ruta del directorio de cuestionarios: {QUIZZES_DIRECTORY}")
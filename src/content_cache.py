@@ -0,0 +1,110 @@
+# src/content_cache.py
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from src.config import CONTENT_CACHE_MAX_BYTES, CONTENT_CACHE_REVALIDATE_SECONDS
+
+
+class ContentCache:
+    """
+    Caché LRU, limitada por bytes, para contenido leído de disco (p. ej. las páginas ya leídas de cada libro).
+    Cada entrada recuerda el tamaño y la fecha de modificación del archivo; si cambian, se vuelve a cargar.
+    """
+
+    def __init__(self, max_bytes=CONTENT_CACHE_MAX_BYTES, revalidate_seconds=CONTENT_CACHE_REVALIDATE_SECONDS):
+        self.max_bytes = max_bytes
+        # Durante este tiempo una entrada se sirve sin volver a consultar el disco (ni siquiera un stat)
+        self.revalidate_seconds = revalidate_seconds
+
+        self._entries = OrderedDict()  # ruta -> [valor, bytes, mtime_ns, tamaño_archivo, última_validación]
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, path, loader):
+        """
+        Devuelve el contenido de `path`, llamando a loader(path) solo si no está en caché
+        o si el archivo cambió. Lanza FileNotFoundError si el archivo no existe.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and now - entry[4] < self.revalidate_seconds:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[0]
+
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self.invalidate(path)
+            raise
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                if entry[2] == stat.st_mtime_ns and entry[3] == stat.st_size:
+                    entry[4] = now
+                    self._entries.move_to_end(path)
+                    self.hits += 1
+                    return entry[0]
+                self._remove(path)
+                self.invalidations += 1
+            self.misses += 1
+
+        value = loader(path)
+        self._store(path, value, stat, now)
+        return value
+
+    def invalidate(self, path=None):
+        """Elimina una entrada, o toda la caché si no se indica ruta."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._current_bytes = 0
+            elif path in self._entries:
+                self._remove(path)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "bytes": self._current_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _store(self, path, value, stat, now):
+        # El costo de una entrada se aproxima con el tamaño del archivo en disco
+        size = stat.st_size
+        if size > self.max_bytes:
+            return  # Más grande que todo el presupuesto: no se guarda
+
+        with self._lock:
+            if path in self._entries:
+                self._remove(path)
+            self._entries[path] = [value, size, stat.st_mtime_ns, stat.st_size, now]
+            self._current_bytes += size
+
+            while self._current_bytes > self.max_bytes:
+                oldest_path = next(iter(self._entries))
+                self._remove(oldest_path)
+                self.evictions += 1
+
+    def _remove(self, path):
+        entry = self._entries.pop(path)
+        self._current_bytes -= entry[1]
+
+
+# Caché compartida por toda la aplicación
+shared_content_cache = ContentCache()
@@ -0,0 +1,271 @@
+# src/data_transfer.py
+
+import csv
+import gzip
+import itertools
+import json
+import logging
+import os
+import time
+
+from src.config import (TRANSFER_TABLES, TRANSFER_FORMATS, TRANSFER_CONFLICT_POLICIES,
+                        TRANSFER_FETCH_ROWS, TRANSFER_BATCH_ROWS, TRANSFER_GZIP_LEVEL)
+
+logger = logging.getLogger(__name__)
+
+
+def _check_table(table):
+    if table not in TRANSFER_TABLES:
+        raise ValueError(f"Tabla no soportada: {table!r} (válidas: {', '.join(TRANSFER_TABLES)})")
+
+
+def file_format(path):
+    """(formato, comprimido) según la extensión: .csv, .jsonl, y opcionalmente .gz al final."""
+    name = os.path.basename(path).lower()
+    compressed = name.endswith(".gz")
+    if compressed:
+        name = name[:-3]
+    for fmt in TRANSFER_FORMATS:
+        if name.endswith("." + fmt):
+            return fmt, compressed
+    raise ValueError(f"Extensión no reconocida: {path} (se espera .csv, .jsonl, .csv.gz o .jsonl.gz)")
+
+
+def table_from_filename(path):
+    """Tabla a la que corresponde un archivo exportado (reading_sessions.csv.gz -> reading_sessions)."""
+    table = os.path.basename(path).split(".", 1)[0]
+    _check_table(table)
+    return table
+
+
+def _open(path, mode):
+    """Archivo de texto UTF-8, comprimido con gzip si la ruta termina en .gz."""
+    if path.lower().endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8", newline="",
+                         **({"compresslevel": TRANSFER_GZIP_LEVEL} if mode == "w" else {}))
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def _table_columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _real_columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})") if row[2].upper() == "REAL"}
+
+
+def _result(table, path, rows, seconds, **extra):
+    return {"table": table, "path": path, "rows": rows, "seconds": seconds,
+            "rows_per_second": rows / seconds if seconds > 0 else 0.0, **extra}
+
+
+# --- Exportación ---
+def _export_rows(conn, table, path, chunk_size):
+    """Escribe la tabla en path por bloques de fetchmany; nunca hay más de un bloque en memoria."""
+    fmt, _ = file_format(path)
+    columns = _table_columns(conn, table)
+    started = time.perf_counter()
+    cursor = conn.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY id")
+    rows = 0
+    with _open(path, "w") as f:
+        if fmt == "csv":
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            write_chunk = writer.writerows
+        else:
+            dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+            def write_chunk(chunk):
+                f.write("".join(dumps(dict(zip(columns, row))) + "\n" for row in chunk))
+
+        while True:
+            chunk = cursor.fetchmany(chunk_size)
+            if not chunk:
+                break
+            write_chunk(chunk)
+            rows += len(chunk)
+    return _result(table, path, rows, time.perf_counter() - started)
+
+
+def export_table(db_manager, table, path, chunk_size=TRANSFER_FETCH_ROWS):
+    """
+    Exporta una tabla completa a path (.csv o .jsonl, con .gz para comprimir). En CSV la primera
+    fila son los nombres de columna y NULL se escribe como celda vacía.
+    Devuelve {"table", "path", "rows", "seconds", "rows_per_second"}.
+    """
+    _check_table(table)
+    db_manager.flush_sessions()
+    return _export_rows(db_manager._get_connection(), table, path, chunk_size)
+
+
+def export_tables(db_manager, directory, tables=None, fmt="csv", compress=False,
+                  chunk_size=TRANSFER_FETCH_ROWS):
+    """
+    Exporta varias tablas (por defecto, TRANSFER_TABLES) a directory/<tabla>.<fmt>[.gz] dentro de una
+    misma transacción de lectura, así los archivos son coherentes entre sí aunque la aplicación siga
+    escribiendo. Lista de resultados.
+    """
+    tables = tables or TRANSFER_TABLES
+    if fmt not in TRANSFER_FORMATS:
+        raise ValueError(f"Formato no soportado: {fmt!r} (válidos: {', '.join(TRANSFER_FORMATS)})")
+    for table in tables:
+        _check_table(table)
+    os.makedirs(directory, exist_ok=True)
+    db_manager.flush_sessions()
+    conn = db_manager._get_connection()
+    results = []
+    conn.execute("BEGIN")  # Instantánea única para todas las tablas (con WAL no bloquea a los escritores)
+    try:
+        for table in tables:
+            path = os.path.join(directory, f"{table}.{fmt}" + (".gz" if compress else ""))
+            results.append(_export_rows(conn, table, path, chunk_size))
+    finally:
+        conn.rollback()
+    return results
+
+
+# --- Importación ---
+def _read_csv(f):
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if header is None:
+        return [], iter(())
+    return header, reader
+
+
+def _read_jsonl(f):
+    lines = (line for line in f if line.strip())
+    first = next(lines, None)
+    if first is None:
+        return [], iter(())
+    first = json.loads(first)
+    columns = list(first)  # Las claves de la primera línea fijan las columnas (export_table escribe todas)
+    loads = json.loads
+
+    def rows():
+        yield tuple(first.get(column) for column in columns)
+        for line in lines:
+            record = loads(line)
+            yield tuple(record.get(column) for column in columns)
+
+    return columns, rows()
+
+
+def _parse_csv_reals(records, indexes):
+    """
+    Convierte en Python las columnas REAL de cada fila CSV: la conversión de texto de SQLite puede
+    diferir en el último dígito, y float() recupera exactamente el valor exportado.
+    """
+    if not indexes:
+        return records
+
+    def rows():
+        for record in records:
+            record = list(record)
+            for i in indexes:
+                record[i] = float(record[i]) if record[i] else None
+            yield record
+
+    return rows()
+
+
+def _insert_sql(table, columns, on_conflict, csv_input):
+    # En CSV toda celda llega como texto: la vacía es NULL y la afinidad de la columna convierte el resto
+    placeholder = "NULLIF(?, '')" if csv_input else "?"
+    sql = (f"INSERT INTO {table} ({', '.join(columns)}) "
+           f"VALUES ({', '.join([placeholder] * len(columns))})")
+    if on_conflict == "update":
+        updates = [column for column in columns if column != "id"]
+        if "id" in columns and updates:
+            sql += (" ON CONFLICT(id) DO UPDATE SET "
+                    + ", ".join(f"{column} = excluded.{column}" for column in updates))
+    if on_conflict != "error":
+        # Otras restricciones únicas (content_path de un libro con otro id) no se pueden actualizar: se omite
+        sql += " ON CONFLICT DO NOTHING"
+    return sql
+
+
+def import_table(db_manager, table, path, on_conflict="skip", batch_size=TRANSFER_BATCH_ROWS):
+    """
+    Importa en table las filas de path (el formato de export_table). Las filas se leen en bloques de
+    batch_size y cada bloque se inserta con executemany en su propia transacción, así la memoria no
+    crece con el tamaño del archivo. Las columnas del archivo que la tabla no tiene se ignoran.
+
+    on_conflict: "skip" deja la fila existente (reimportar el mismo archivo no cambia nada),
+    "update" la reemplaza con la del archivo y "error" aborta (lo ya confirmado se conserva).
+    Los triggers de user_stats/book_stats se aplican a cada sesión importada como en uso normal.
+    Tras importar libros se vuelve a indexar el catálogo (estadísticas de texto y búsqueda), y se
+    advierte de los libros importados cuyo archivo no está en él.
+    Devuelve {"table", "path", "rows", "seconds", "rows_per_second", "imported"}.
+    """
+    _check_table(table)
+    if on_conflict not in TRANSFER_CONFLICT_POLICIES:
+        raise ValueError(f"Política de conflicto desconocida: {on_conflict!r} "
+                         f"(válidas: {', '.join(TRANSFER_CONFLICT_POLICIES)})")
+    fmt, _ = file_format(path)
+    db_manager.flush_sessions()
+    conn = db_manager._get_connection()
+    all_columns = _table_columns(conn, table)
+
+    started = time.perf_counter()
+    rows = imported = 0
+    with _open(path, "r") as f:
+        columns, records = _read_csv(f) if fmt == "csv" else _read_jsonl(f)
+        unknown = [column for column in columns if column not in all_columns]
+        if unknown:
+            logger.warning("%s: columnas ignoradas (no existen en %s): %s", path, table, ", ".join(unknown))
+            keep = [i for i, column in enumerate(columns) if column in all_columns]
+            columns = [columns[i] for i in keep]
+            records = (tuple(record[i] for i in keep) for record in records)
+        if columns and fmt == "csv":
+            records = _parse_csv_reals(records, [i for i, column in enumerate(columns)
+                                                 if column in _real_columns(conn, table)])
+        if columns:
+            sql = _insert_sql(table, columns, on_conflict, fmt == "csv")
+            while True:
+                chunk = list(itertools.islice(records, batch_size))
+                if not chunk:
+                    break
+                with conn:
+                    imported += conn.executemany(sql, chunk).rowcount
+                rows += len(chunk)
+                logger.debug("%s: %d filas importadas en %s", path, rows, table)
+
+    if imported:
+        db_manager.notify_tables_changed((table,))
+    if table == "books":
+        _warn_uncatalogued_books(conn, path)
+    return _result(table, path, rows, time.perf_counter() - started, imported=imported)
+
+
+def _warn_uncatalogued_books(conn, path):
+    """Los libros sin archivo en el catálogo no tienen estadísticas de texto ni aparecen en la búsqueda."""
+    missing = [row[0] for row in conn.execute(
+        "SELECT content_path FROM books WHERE content_path NOT IN (SELECT path FROM catalog_files) "
+        "ORDER BY content_path")]
+    if missing:
+        logger.warning("%s: %d libros no están en el catálogo (sin estadísticas de texto ni búsqueda): %s",
+                       path, len(missing), ", ".join(missing[:10]) + (", ..." if len(missing) > 10 else ""))
+
+
+def import_files(db_manager, paths, on_conflict="skip", batch_size=TRANSFER_BATCH_ROWS):
+    """Importa varios archivos exportados, cada uno en la tabla de su nombre y en orden de dependencias."""
+    tables = {path: table_from_filename(path) for path in paths}
+    ordered = sorted(paths, key=lambda path: TRANSFER_TABLES.index(tables[path]))
+    return [import_table(db_manager, tables[path], path, on_conflict, batch_size) for path in ordered]
+
+
+def print_results(results, verb):
+    """Una línea por archivo exportado o importado (verb: "exportadas", "leídas")."""
+    for result in results:
+        extra = f", {result['imported']} nuevas/actualizadas" if "imported" in result else ""
+        print(f"{result['table']}: {result['rows']} filas {verb} en {result['seconds']:.2f} s "
+              f"({result['rows_per_second']:,.0f} filas/s{extra}) -> {result['path']}")
+
+
+if __name__ == "__main__":
+    # python -m src.data_transfer export|import ... : igual que python -m src.cli export|import
+    import sys
+    from src.cli import main
+
+    sys.exit(main(sys.argv[1:]))
@@ -1,24 +1,54 @@
-import sqlite3
-import os
-# import sys # <--- ¡ELIMINAR O COMENTAR ESTA LÍNEA! Ya no es necesaria aquí.
+import logging
+import re
+import threading
 
 # Importar las rutas ya resueltas desde config.py
-from src.config import DB_NAME, BOOKS_DIRECTORY, DATABASE_PATH
+from src.config import (DB_NAME, DATABASE_PATH, STATS_PAGE_SIZE, SEARCH_RESULTS_LIMIT,
+                        SEARCH_SNIPPET_TOKENS)
+from src.db_pool import ConnectionPool
+from src.indexer import CatalogIndexer
+from src.quiz_bundle import load_quiz
+from src.recommender import BookRecommender
+from src.migrations import apply_migrations
+from src.aggregates import check_aggregates, rebuild_aggregates
+from src.session_journal import SessionJournal
+from src.instrumentation import instrument_methods
 
+logger = logging.getLogger(__name__)
 
+
+@instrument_methods("db")
 class DatabaseManager:
-    def __init__(self):
-        # Ahora, self.db_path simplemente usa la ruta ya resuelta de config.py
-        self.db_path = DATABASE_PATH
+    def __init__(self, db_path=None, journal_mode=None, defer_catalog=False):
+        # Por defecto se usa la ruta ya resuelta de config.py
+        self.db_path = db_path or DATABASE_PATH
+        # Conexiones persistentes (una por hilo) en lugar de abrir/cerrar en cada consulta
+        self._pool = ConnectionPool(self.db_path)
+        self._has_fts = None
+        self._catalog_loaded = threading.Event()
+        # Directorios de libros y quizzes de config.py; se puede reemplazar antes de load_catalog()
+        self.catalog_indexer = CatalogIndexer(self)
+        # Índice en memoria de libros por edad; se invalida cuando el indexador cambia libros
+        self.recommender = BookRecommender(self)
 
-        print(f"Conectado a la base de datos: {self.db_path}")
+        logger.info("Conectado a la base de datos: %s", self.db_path)
         self._create_tables()
-        self._insert_sample_books()  # Esta función crea/inserta libros si no existen
+        if not defer_catalog:
+            # Con defer_catalog=True el llamador ejecuta load_catalog() después (p. ej. tras mostrar la ventana)
+            self.load_catalog()
+
+        # Los fines de sesión se escriben en lote; en modo "log" reaplica lo que quedó de un cierre inesperado
+        journal_kwargs = {"mode": journal_mode} if journal_mode else {}
+        self._session_journal = SessionJournal(self._get_connection, self.db_path + ".sessions.log",
+                                               **journal_kwargs)
 
     def _get_connection(self):
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        return self._pool.get_connection()
+
+    def close(self):
+        """Guarda las sesiones pendientes y cierra todas las conexiones. Llamar una vez al salir."""
+        self._session_journal.close()
+        self._pool.close_all()
 
     def _create_tables(self):
         conn = self._get_connection()
@@ -56,196 +86,171 @@ class DatabaseManager:
                 FOREIGN KEY (book_id) REFERENCES books (id)
             )
         """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS catalog_files (
+                path TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                indexed_at TEXT NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS app_metadata (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        """)
         conn.commit()
-        conn.close()
-        print("Tablas verificadas/creadas exitosamente.")
-
-    def _insert_sample_books(self):
-        # Asegúrate de que los archivos de contenido de los libros existen ANTES de intentar insertarlos.
-        # Esto es especialmente importante para que el _get_word_count_from_file no falle.
-        books_to_insert = [
-            {"title": "El Patito Feo", "author": "Hans Christian Andersen", "min_age": 6, "max_age": 8,
-             "content_filename": "patito_feo.txt"},
-            {"title": "Caperucita Roja", "author": "Hermanos Grimm", "min_age": 6, "max_age": 8,
-             "content_filename": "caperucita_roja.txt"},
-            {"title": "El Gato con Botas", "author": "Charles Perrault", "min_age": 7, "max_age": 9,
-             "content_filename": "gato_botas.txt"},
-            {"title": "Alicia en el País de las Maravillas", "author": "Lewis Carroll", "min_age": 9, "max_age": 12,
-             "content_filename": "alicia_maravillas.txt"},
-            {"title": "El Principito", "author": "Antoine de Saint-Exupéry", "min_age": 10, "max_age": 14,
-             "content_filename": "principito.txt"},
-            {"title": "Veinte Mil Leguas de Viaje Submarino", "author": "Julio Verne", "min_age": 12, "max_age": 99,
-             "content_filename": "veinte_mil_leguas.txt"},
-            {"title": "Don Quijote de la Mancha (Adaptación)", "author": "Miguel de Cervantes", "min_age": 14,
-             "max_age": 99, "content_filename": "don_quijote.txt"},
-            {"title": "Orgullo y Prejuicio", "author": "Jane Austen", "min_age": 16, "max_age": 99,
-             "content_filename": "orgullo_prejuicio.txt"},
-            {"title": "Ciencia Maya", "author": "Fundación Kinal", "min_age": 14, "max_age": 70,
-             "content_filename": "ciencia_maya.txt"},
-            {"title": "El Cambio Climático", "author": "Fundación Kinal", "min_age": 13, "max_age": 80,
-             "content_filename": "el_cambio_climatico.txt"},
-            {"title": "El Renacimiento Fue", "author": "Fundación Kinal", "min_age": 19, "max_age": 98,
-             "content_filename": "el_renacimient_fue.txt"}, # Se asume 'el_renacimiento.txt' se refiere a este
-            {"title": "La Civilización Maya", "author": "Fundación Kinal", "min_age": 12, "max_age": 85,
-             "content_filename": "la_civilizacion_maya.txt"},
-            {"title": "La Lengua Española", "author": "Fundación Kinal", "min_age": 10, "max_age": 70,
-             "content_filename": "la_lengua_espaniola.txt"},
-            {"title": "La Revolución Industrial", "author": "Fundación Kinal", "min_age": 13, "max_age": 90,
-             "content_filename": "la_revolucion_industrial.txt"},
-            {"title": "La Revolución Francesa", "author": "Fundación Kinal", "min_age": 18, "max_age": 70,
-             "content_filename": "la_revolucion_francesa.txt"},
-            {"title": "Machu Picchu", "author": "Fundación Kinal", "min_age": 13, "max_age": 95,
-             "content_filename": "machu_picchu.txt"},
-            {"title": "Nelson Mandela", "author": "Fundación Kinal", "min_age": 18, "max_age": 95,
-             "content_filename": "nelson_mandela.txt"},
-
-            # --- Nuevos libros agregados ---
-            {"title": "El Ciervo y el Manantial", "author": "Fábula Clásica", "min_age": 7, "max_age": 10,
-             "content_filename": "el_ciervo_y_el_manantial.txt"},
-            {"title": "La Leyenda del Maíz", "author": "Leyenda Maya", "min_age": 8, "max_age": 12,
-             "content_filename": "la_leyenda_del_maiz.txt"},
-            {"title": "El Hombre, el Niño y el Burro", "author": "Fábula Clásica", "min_age": 7, "max_age": 10,
-             "content_filename": "el_hombre_el_ninio_y_el_burro.txt"},
-            {"title": "La Llorona", "author": "Leyenda Popular", "min_age": 10, "max_age": 14,
-             "content_filename": "la_llorona.txt"},
-            {"title": "El Joven Rico", "author": "Relato Bíblico", "min_age": 12, "max_age": 99,
-             "content_filename": "el_joven_rico.txt"},
-            {"title": "La Mujer Adúltera", "author": "Relato Bíblico", "min_age": 16, "max_age": 99,
-             "content_filename": "la_mujer_adultera.txt"},
-            {"title": "El León y el Ratón", "author": "Fábula de Esopo", "min_age": 6, "max_age": 9,
-             "content_filename": "el_leon_y_el_raton.txt"},
-            {"title": "La Cruz como Camino", "author": "Fundación Kinal", "min_age": 16, "max_age": 99,
-             "content_filename": "la_cruz_como_camino.txt"},
-            {"title": "Pedro y el Lobo", "author": "Sergei Prokofiev", "min_age": 6, "max_age": 9,
-             "content_filename": "pedro_y_el_lobo.txt"},
-            {"title": "El Buen Samaritano", "author": "Relato Bíblico", "min_age": 10, "max_age": 99,
-             "content_filename": "el_buen_samaritano.txt"},
-            {"title": "El Pan Compartido", "author": "Fábula Clásica", "min_age": 7, "max_age": 10,
-             "content_filename": "el_pan_compartido.txt"},
-            {"title": "La Cultura Japonesa", "author": "Fundación Kinal", "min_age": 14, "max_age": 99,
-             "content_filename": "la_cultura_japonesa.txt"},
-            {"title": "El Cadejo", "author": "Leyenda Guatemalteca", "min_age": 12, "max_age": 99,
-             "content_filename": "el_cadejo.txt"},
-            {"title": "El Traje Nuevo del Emperador", "author": "Hans Christian Andersen", "min_age": 7, "max_age": 11,
-             "content_filename": "el_traje_nuevo_del_emperador.txt"},
-            {"title": "La Gallina de los Huevos de Oro", "author": "Fábula de Esopo", "min_age": 6, "max_age": 9,
-             "content_filename": "la_gallina_de_los_huevos_de_oro.txt"},
-            {"title": "La Zorra y las Uvas", "author": "Fábula de Esopo", "min_age": 7, "max_age": 10,
-             "content_filename": "la_zorra_y_las_uvas.txt"},
-        ]
+        # Cambios posteriores del esquema (índices, columnas nuevas...) se aplican como migraciones versionadas
+        apply_migrations(conn)
+        logger.debug("Tablas verificadas/creadas exitosamente.")
 
-        conn = self._get_connection()
-        cursor = conn.cursor()
+    def load_catalog(self):
+        """
+        Sincroniza la tabla books con los archivos del catálogo (solo procesa lo que cambió).
+        Las consultas de libros esperan a que termine, aunque falle.
+        """
+        try:
+            summary = self.refresh_catalog()
+        finally:
+            self._catalog_loaded.set()
+        if summary["skipped"]:
+            logger.info("Catálogo de libros sin cambios; se omite la carga.")
+        else:
+            logger.info("Catálogo de libros actualizado: %d libros insertados/actualizados, %d archivos reprocesados.",
+                        summary['books'], summary['reprocessed'])
 
-        for book_data in books_to_insert:
-            # content_path_relative es la ruta tal como la quieres almacenar en la BD.
-            # Esta ruta DEBE coincidir con cómo se estructuran los archivos de libros DENTRO del paquete.
-            # Según tu .spec, los copias a 'src/books_content/'.
-            content_path_relative = os.path.join("src", "books_content", book_data["content_filename"])
-
-            cursor.execute("SELECT id FROM books WHERE content_path = ?", (content_path_relative,))
-            existing_book = cursor.fetchone()
-
-            if not existing_book:
-                word_count = self._get_word_count_from_file(
-                    book_data["content_filename"])  # Pasamos solo el nombre del archivo
-                cursor.execute(
-                    """INSERT INTO books (title, author, min_age, max_age, content_path, word_count)
-                       VALUES (?, ?, ?, ?, ?, ?)""",
-                    (book_data["title"], book_data["author"], book_data["min_age"],
-                     book_data["max_age"], content_path_relative, word_count)  # Guarda la ruta relativa
-                )
-                print(f"Libro '{book_data['title']}' insertado.")
-            else:
-                print(f"Libro '{book_data['title']}' ya existe.")
-        conn.commit()
-        conn.close()
+    def catalog_ready(self):
+        return self._catalog_loaded.is_set()
 
-    def _get_word_count_from_file(self, filename):
-        # BOOKS_DIRECTORY ya es la ruta ABSOLUTA correcta definida en config.py
-        full_file_path = os.path.join(BOOKS_DIRECTORY, filename)
+    def refresh_catalog(self, force=False):
+        """Re-indexa los directorios del catálogo. Con force=True se ignora la huella guardada y se reprocesa todo."""
+        summary = self.catalog_indexer.refresh(force=force)
+        if summary["books"]:
+            self.recommender.invalidate()
+        return summary
 
-        if not os.path.exists(full_file_path):
-            print(f"Advertencia: Archivo de contenido no encontrado para conteo de palabras: {full_file_path}")
-            return 0  # Si el archivo no existe, el conteo de palabras es 0
-        try:
-            with open(full_file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                return len(content.split())
-        except Exception as e:
-            print(f"Error al leer el archivo para conteo de palabras {full_file_path}: {e}")
-            return 0
+    def notify_tables_changed(self, tables):
+        """
+        Avisa de filas escritas por fuera de esta clase (importación, consolidación de kioscos) para
+        que se actualice lo que depende de ellas en este proceso.
+        """
+        # Los IDs de sesión los asigna SQLite al insertar, así que las sesiones escritas no requieren nada
+        if "books" in tables:
+            # El indexador vuelve a leer los archivos del catálogo: estadísticas de texto, catalog_files y
+            # búsqueda de texto completo (los metadatos del catálogo prevalecen sobre los escritos)
+            self.refresh_catalog(force=True)
+            self.recommender.invalidate()
+
+    def _get_metadata(self, key):
+        row = self._get_connection().execute("SELECT value FROM app_metadata WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def _set_metadata(self, conn, key, value):
+        # Recibe la conexión para poder participar en la transacción del llamador
+        conn.execute(
+            """INSERT INTO app_metadata (key, value) VALUES (?, ?)
+               ON CONFLICT(key) DO UPDATE SET value = excluded.value""",
+            (key, value)
+        )
 
     def add_user(self, age):
         conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("INSERT INTO users (age) VALUES (?)", (age,))
-        user_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        return user_id
+        with conn:  # Commit al salir, rollback si hay error
+            cursor = conn.execute("INSERT INTO users (age) VALUES (?)", (age,))
+        return cursor.lastrowid
 
     def get_recommended_books(self, age):
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            """SELECT id, title, author, min_age, max_age, content_path, word_count
-               FROM books
-               WHERE ? BETWEEN min_age AND max_age
-               ORDER BY title""",
-            (age,)
-        )
-        books = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return books
+        """Libros para la edad ordenados por título, desde el índice en memoria (ver src/recommender.py)."""
+        self._catalog_loaded.wait()
+        return self.recommender.books_for_age(age)
 
     def get_book_info(self, book_id):
+        self._catalog_loaded.wait()
         conn = self._get_connection()
         cursor = conn.cursor()
         cursor.execute(
-            """SELECT id, title, author, min_age, max_age, content_path, word_count
+            """SELECT id, title, author, min_age, max_age, content_path, word_count, readability_fh
                FROM books WHERE id = ?""",
             (book_id,)
         )
         book_info = cursor.fetchone()
-        conn.close()
         return dict(book_info) if book_info else None
 
-    def start_reading_session(self, user_id, book_id):
+    def get_quiz(self, book_id):
+        """Cuestionario compilado del libro (ver src/quiz_bundle.py), o None si no tiene."""
+        self._catalog_loaded.wait()
+        return load_quiz(self._get_connection(), book_id)
+
+    def has_full_text_search(self):
+        """True si existe books_fts (el SQLite en uso trae FTS5)."""
+        if self._has_fts is None:
+            row = self._get_connection().execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'books_fts'"
+            ).fetchone()
+            self._has_fts = row is not None
+        return self._has_fts
+
+    def search_books(self, query, age=None, limit=SEARCH_RESULTS_LIMIT, highlight=("«", "»")):
+        """
+        Busca libros por título, autor y texto, ordenados por relevancia (bm25 con los pesos
+        configurados en la migración 4). Cada palabra de la consulta se busca como prefijo y
+        sin distinguir tildes. Con age solo devuelve libros para esa edad. Cada resultado incluye
+        un fragmento ("snippet") del texto con las coincidencias entre los marcadores de highlight.
+        """
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return []
+        self._catalog_loaded.wait()
+        columns = "b.id, b.title, b.author, b.min_age, b.max_age, b.content_path, b.word_count, b.readability_fh"
         conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            """INSERT INTO reading_sessions (user_id, book_id, start_time)
-               VALUES (?, ?, datetime('now'))""",
-            (user_id, book_id)
-        )
-        session_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        print(f"Sesión de lectura iniciada. ID: {session_id}")
+
+        if not self.has_full_text_search():
+            # Sin FTS5: coincidencia simple en título o autor, sin ranking ni fragmentos
+            conditions = " AND ".join("(b.title LIKE ? OR b.author LIKE ?)" for _ in terms)
+            params = [value for term in terms for value in (f"%{term}%", f"%{term}%")]
+            rows = conn.execute(
+                f"""SELECT {columns}, NULL AS snippet FROM books b
+                    WHERE {conditions} AND (? IS NULL OR ? BETWEEN b.min_age AND b.max_age)
+                    ORDER BY b.title LIMIT ?""",
+                params + [age, age, limit]
+            ).fetchall()
+            return [dict(row) for row in rows]
+
+        match = " ".join(f'"{term}"*' for term in terms)  # Todas las palabras, cada una como prefijo
+        rows = conn.execute(
+            f"""SELECT {columns},
+                       snippet(books_fts, 2, ?, ?, '…', ?) AS snippet
+                FROM books_fts
+                JOIN books b ON b.id = books_fts.rowid
+                WHERE books_fts MATCH ? AND (? IS NULL OR ? BETWEEN b.min_age AND b.max_age)
+                ORDER BY books_fts.rank
+                LIMIT ?""",
+            (highlight[0], highlight[1], SEARCH_SNIPPET_TOKENS, match, age, age, limit)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def start_reading_session(self, user_id, book_id):
+        # La fila se inserta al momento (el ID lo asigna SQLite); el fin va en el siguiente lote del diario
+        session_id = self._session_journal.start(user_id, book_id)
+        logger.debug("Sesión de lectura iniciada. ID: %s", session_id)
         return session_id
 
     def finish_reading_session(self, session_id, duration_seconds, wpm, age_appropriateness_score, performance_rating,
-                               quiz_score=None):
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            """UPDATE reading_sessions SET
-                end_time = datetime('now'),
-                duration_seconds = ?,
-                wpm = ?,
-                age_appropriateness_score = ?,
-                performance_rating = ?,
-                quiz_score = ?
-            WHERE id = ?""",
-            (duration_seconds, wpm, age_appropriateness_score, performance_rating, quiz_score, session_id)
+                               quiz_score=None, quiz_responses=None, quiz_hash=None):
+        return self._session_journal.finish(
+            session_id, duration_seconds, wpm, age_appropriateness_score, performance_rating, quiz_score,
+            quiz_responses, quiz_hash
         )
-        conn.commit()
-        success = cursor.rowcount > 0
-        conn.close()
-        return success
+
+    def flush_sessions(self):
+        """Escribe ya los eventos de sesión pendientes (las lecturas de sesiones lo hacen solas)."""
+        return self._session_journal.flush()
 
     def get_user_reading_stats(self, user_id):
+        self.flush_sessions()
         conn = self._get_connection()
         cursor = conn.cursor()
         cursor.execute(
@@ -263,6 +268,90 @@ class DatabaseManager:
             ORDER BY rs.start_time DESC""",
             (user_id,)
         )
-        stats = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return stats
+        return [dict(row) for row in cursor.fetchall()]
+
+    def get_user_reading_stats_page(self, user_id, limit=STATS_PAGE_SIZE, cursor=None):
+        """
+        Una página de sesiones del usuario, de la más reciente a la más antigua (paginación por keyset).
+        cursor es el (start_time, id) de la última fila de la página anterior.
+        Devuelve (filas, cursor_de_la_siguiente_página o None si no hay más).
+        """
+        self.flush_sessions()
+        query = """SELECT
+                rs.id,
+                rs.start_time,
+                rs.duration_seconds,
+                rs.wpm,
+                rs.performance_rating,
+                rs.quiz_score,
+                b.title AS book_title,
+                b.author AS book_author
+            FROM reading_sessions rs
+            JOIN books b ON rs.book_id = b.id
+            WHERE rs.user_id = ?"""
+        params = [user_id]
+        if cursor is not None:
+            query += " AND (rs.start_time, rs.id) < (?, ?)"
+            params.extend(cursor)
+        query += " ORDER BY rs.start_time DESC, rs.id DESC LIMIT ?"
+        params.append(limit + 1)  # Una fila extra para saber si hay otra página
+
+        rows = [dict(row) for row in self._get_connection().execute(query, params).fetchall()]
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, (rows[-1]["start_time"], rows[-1]["id"])
+        return rows, None
+
+    def get_user_reading_summary(self, user_id):
+        """Totales del usuario sobre sus sesiones terminadas, leídos de user_stats (una fila)."""
+        self.flush_sessions()
+        row = self._get_connection().execute(
+            """SELECT session_count, total_seconds, wpm_sum, wpm_count, quiz_count, quiz_sum, quiz_pass_count
+               FROM user_stats WHERE user_id = ?""",
+            (user_id,)
+        ).fetchone()
+        if row is None:
+            return {"session_count": 0, "total_seconds": 0, "avg_wpm": None, "quiz_count": 0,
+                    "avg_quiz_score": None, "quiz_pass_rate": None}
+        return {
+            "session_count": row["session_count"],
+            "total_seconds": row["total_seconds"],
+            "avg_wpm": row["wpm_sum"] / row["wpm_count"] if row["wpm_count"] else None,
+            "quiz_count": row["quiz_count"],
+            "avg_quiz_score": row["quiz_sum"] / row["quiz_count"] if row["quiz_count"] else None,
+            "quiz_pass_rate": row["quiz_pass_count"] / row["quiz_count"] * 100 if row["quiz_count"] else None,
+        }
+
+    def get_book_stats(self, book_id):
+        """Totales de un libro (sesiones iniciadas/terminadas, WPM y quiz promedio), leídos de book_stats."""
+        self.flush_sessions()
+        row = self._get_connection().execute(
+            """SELECT started_count, completed_count, total_seconds, wpm_sum, wpm_count,
+                      quiz_count, quiz_sum, quiz_pass_count
+               FROM book_stats WHERE book_id = ?""",
+            (book_id,)
+        ).fetchone()
+        if row is None:
+            return {"started_count": 0, "completed_count": 0, "total_seconds": 0, "avg_wpm": None,
+                    "quiz_count": 0, "avg_quiz_score": None, "quiz_pass_rate": None}
+        return {
+            "started_count": row["started_count"],
+            "completed_count": row["completed_count"],
+            "total_seconds": row["total_seconds"],
+            "avg_wpm": row["wpm_sum"] / row["wpm_count"] if row["wpm_count"] else None,
+            "quiz_count": row["quiz_count"],
+            "avg_quiz_score": row["quiz_sum"] / row["quiz_count"] if row["quiz_count"] else None,
+            "quiz_pass_rate": row["quiz_pass_count"] / row["quiz_count"] * 100 if row["quiz_count"] else None,
+        }
+
+    def rebuild_aggregate_stats(self, check_only=False):
+        """
+        Compara user_stats/book_stats con lo que resulta de recorrer reading_sessions y devuelve las
+        diferencias encontradas. Salvo con check_only=True, después recalcula ambas tablas.
+        """
+        self.flush_sessions()
+        conn = self._get_connection()
+        problems = check_aggregates(conn)
+        if not check_only:
+            rebuild_aggregates(conn)
+        return problems
@@ -0,0 +1,67 @@
+# src/db_pool.py
+
+import logging
+import sqlite3
+import threading
+
+from src.config import SQLITE_PRAGMAS, SQLITE_STATEMENT_CACHE_SIZE
+from src.instrumentation import instrument_connection
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPool:
+    """Mantiene una conexión SQLite abierta por hilo durante toda la vida de la aplicación."""
+
+    def __init__(self, db_path, pragmas=None, cached_statements=SQLITE_STATEMENT_CACHE_SIZE):
+        self.db_path = db_path
+        self.pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+        self.cached_statements = cached_statements
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._closed = False
+
+    def get_connection(self):
+        """Devuelve la conexión del hilo actual, creándola la primera vez."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    def _connect(self):
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("El pool de conexiones ya fue cerrado.")
+
+            # check_same_thread=False solo para poder cerrarlas todas desde close_all();
+            # cada conexión se usa únicamente desde el hilo que la creó.
+            conn = sqlite3.connect(
+                self.db_path,
+                check_same_thread=False,
+                cached_statements=self.cached_statements
+            )
+            conn.row_factory = sqlite3.Row
+            instrument_connection(conn)  # Cuenta sentencias y filas si el perfilado está activo
+            for name, value in self.pragmas.items():
+                conn.execute(f"PRAGMA {name} = {value}")
+
+            self._connections.append(conn)
+            return conn
+
+    def close_all(self):
+        """Cierra todas las conexiones abiertas. Se llama una sola vez al salir."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            connections, self._connections = self._connections, []
+
+        for conn in connections:
+            try:
+                conn.execute("PRAGMA optimize")  # Actualiza estadísticas del planificador
+                conn.close()  # La última conexión en cerrarse hace el checkpoint del WAL
+            except sqlite3.Error as e:
+                logger.error("Error al cerrar una conexión de la base de datos: %s", e)
@@ -1,11 +1,26 @@
 import customtkinter as ctk
-from CTkMessagebox import CTkMessagebox
 from src.logic import AppLogic
 from src.database import DatabaseManager
-from src.config import APP_NAME
+from src.widgets import VirtualCardList, PagedTable
+from src.tasks import TaskExecutor
+from src.text_stats import readability_label
+from src.instrumentation import record_since, timed, timer
+from src.config import (APP_NAME, READER_PREFETCH_PAGES, READER_MAX_LOADED_PAGES, READER_SCROLL_MARGIN,
+                        READER_POLL_MS, STATS_PAGE_SIZE, QUIZ_PASS_THRESHOLD, SEARCH_DEBOUNCE_MS)
+import collections
 import datetime
+import logging
 import os
 import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def _show_message(**kwargs):
+    """CTkMessagebox se importa al mostrar el primer mensaje, no al arrancar la aplicación."""
+    from CTkMessagebox import CTkMessagebox
+    return CTkMessagebox(**kwargs)
 
 
 class AtlasReadApp(ctk.CTk):
@@ -23,6 +38,22 @@ class AtlasReadApp(ctk.CTk):
         self.user_quiz_answers = {}
         self._temp_stats = {}  # Para guardar stats temporales antes del quiz
 
+        # Lector paginado: solo se mantienen en el widget unas pocas páginas alrededor de la visible
+        self.book_pager = None
+        self._loaded_pages = collections.deque()  # (índice de página, número de caracteres)
+        self._reading_poll_id = None
+        self._page_request = None  # Índice de la página que se está leyendo en segundo plano
+        self._book_end_reached = False
+
+        # Búsqueda de libros: se espera SEARCH_DEBOUNCE_MS tras la última tecla y se ignoran respuestas viejas
+        self._search_after_id = None
+        self._search_sequence = 0
+        self._showing_search_results = False  # La lista muestra resultados de books_fts, no self.books
+
+        # Todo acceso a base de datos y disco corre en hilos de fondo; los resultados vuelven vía after()
+        self.task_executor = TaskExecutor(self)
+        self._loading_count = 0
+
         # --- Configuración Global de CustomTkinter ---
         ctk.set_appearance_mode("Light")  # Modo claro para la base (esencial para la nueva paleta)
         ctk.set_default_color_theme("blue")  # El tema por defecto, aunque lo sobrescribimos
@@ -67,62 +98,91 @@ class AtlasReadApp(ctk.CTk):
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(0, weight=1)
 
-        # --- Inicialización de todos los marcos una sola vez ---
+        # --- Marcos: cada uno se construye la primera vez que se necesita (ver _ensure_frame) ---
         self.frames = {}
-        # Los frames se inicializan con sus propios colores de fondo
-        self._create_start_frame()  # Nuevo: Frame de inicio
-        self._create_age_input_frame()
-        self._create_book_selection_frame()
-        self._create_reading_frame()
-        self._create_quiz_frame()
-        self._create_statistics_frame()
+        self._frame_builders = {
+            "start": self._create_start_frame,
+            "age_input": self._create_age_input_frame,
+            "book_selection": self._create_book_selection_frame,
+            "reading": self._create_reading_frame,
+            "quiz": self._create_quiz_frame,
+            "statistics": self._create_statistics_frame,
+        }
+
+        # Indicador de carga (esquina superior derecha) mientras hay tareas en segundo plano
+        self.loading_label = ctk.CTkLabel(
+            self, text="Cargando...", font=self.FONT_SMALL, text_color=self.COLOR_TEXT_SECONDARY,
+            fg_color=self.COLOR_BACKGROUND_MAIN
+        )
 
         # Mostrar el frame inicial al principio
         self.show_frame("start")  # Cambiado para iniciar en el frame de bienvenida
 
+        # Cerrar la ventana con la "X" también debe liberar las conexiones de la base de datos
+        self.protocol("WM_DELETE_WINDOW", self.quit_application)
+
+        # La verificación del catálogo de libros corre en segundo plano cuando la ventana ya se dibujó
+        if not self.db_manager.catalog_ready():
+            self.after_idle(self._load_catalog_in_background)
+
+    def _ensure_frame(self, name):
+        """Construye el marco la primera vez que se pide; las siguientes veces no hace nada."""
+        if name not in self.frames and name in self._frame_builders:
+            self._frame_builders[name]()
+
+    def _load_catalog_in_background(self):
+        # Las consultas de libros esperan a que termine (DatabaseManager.load_catalog)
+        self.task_executor.submit(
+            self.db_manager.load_catalog,
+            on_error=lambda error: logger.error("Error al verificar el catálogo de libros: %r", error)
+        )
+
     def show_frame(self, name):
         """Oculta todos los marcos y muestra solo el especificado."""
-        for frame_name, frame_widget in self.frames.items():
-            frame_widget.grid_forget()  # Oculta el marco
-
-        if name in self.frames:
-            # Padding general alrededor de los frames dentro de la ventana principal
-            self.frames[name].grid(row=0, column=0, padx=20, pady=20, sticky="nsew")
-
-            # Configurar columna y fila 0 en el marco para que se expandan
-            self.frames[name].grid_columnconfigure(0, weight=1)
-            # Cada frame configura sus propias filas, pero nos aseguramos que haya al menos una para el contenido principal
-            self.frames[name].grid_rowconfigure(0, weight=1)
-
-            # Ajustes específicos para ciertos marcos que necesitan más filas configurables
-            if name == "start":
-                # Configurar para centrar contenido en el frame de inicio
-                self.frames[name].grid_rowconfigure((0, 4), weight=1)  # Espacio arriba y abajo
-                self.frames[name].grid_columnconfigure(0, weight=1)
-            elif name == "age_input":
-                self.frames[name].grid_rowconfigure((0, 6), weight=1)  # Más espacio arriba y abajo para centrar
-                self.frames[name].grid_rowconfigure((1, 2, 3, 4, 5), weight=0)  # Contenido fijo
-                self.frames[name].grid_columnconfigure(0, weight=1)
-            elif name == "book_selection":
-                self.frames[name].grid_rowconfigure(0, weight=0)  # Título
-                self.frames[name].grid_rowconfigure(1, weight=1)  # Contenedor de libros (scrollable)
-                self.frames[name].grid_rowconfigure(2, weight=0)  # Botones de navegación
-                self.frames[name].grid_columnconfigure(0, weight=1)
-            elif name == "reading":
-                self.frames[name].grid_rowconfigure(0, weight=0)  # Título
-                self.frames[name].grid_rowconfigure(1, weight=1)  # Textbox del libro
-                self.frames[name].grid_rowconfigure(2, weight=0)  # Botón "terminar lectura"
-                self.frames[name].grid_columnconfigure(0, weight=1)
-            elif name == "quiz":
-                self.frames[name].grid_rowconfigure(0, weight=0)  # Título
-                self.frames[name].grid_rowconfigure(1, weight=1)  # Preguntas del quiz (scrollable)
-                self.frames[name].grid_rowconfigure(2, weight=0)  # Botón "enviar"
+        # Incluye construir el marco si es la primera vez que se muestra
+        with timer(f"gui.show_frame.{name}"):
+            self._ensure_frame(name)
+            for frame_name, frame_widget in self.frames.items():
+                frame_widget.grid_forget()  # Oculta el marco
+
+            if name in self.frames:
+                # Padding general alrededor de los frames dentro de la ventana principal
+                self.frames[name].grid(row=0, column=0, padx=20, pady=20, sticky="nsew")
+
+                # Configurar columna y fila 0 en el marco para que se expandan
                 self.frames[name].grid_columnconfigure(0, weight=1)
-            elif name == "statistics":
-                self.frames[name].grid_rowconfigure(0, weight=0)  # Title
-                self.frames[name].grid_rowconfigure(1, weight=0)  # Explanation frame
-                self.frames[name].grid_rowconfigure(2, weight=1)  # Scrollable frame (table)
-                self.frames[name].grid_rowconfigure(3, weight=0)  # Buttons
+                # Cada frame configura sus propias filas, pero nos aseguramos que haya al menos una para el contenido principal
+                self.frames[name].grid_rowconfigure(0, weight=1)
+
+                # Ajustes específicos para ciertos marcos que necesitan más filas configurables
+                if name == "start":
+                    # Configurar para centrar contenido en el frame de inicio
+                    self.frames[name].grid_rowconfigure((0, 4), weight=1)  # Espacio arriba y abajo
+                    self.frames[name].grid_columnconfigure(0, weight=1)
+                elif name == "age_input":
+                    self.frames[name].grid_rowconfigure((0, 6), weight=1)  # Más espacio arriba y abajo para centrar
+                    self.frames[name].grid_rowconfigure((1, 2, 3, 4, 5), weight=0)  # Contenido fijo
+                    self.frames[name].grid_columnconfigure(0, weight=1)
+                elif name == "book_selection":
+                    self.frames[name].grid_rowconfigure(0, weight=0)  # Título
+                    self.frames[name].grid_rowconfigure(1, weight=1)  # Contenedor de libros (scrollable)
+                    self.frames[name].grid_rowconfigure(2, weight=0)  # Botones de navegación
+                    self.frames[name].grid_columnconfigure(0, weight=1)
+                elif name == "reading":
+                    self.frames[name].grid_rowconfigure(0, weight=0)  # Título
+                    self.frames[name].grid_rowconfigure(1, weight=1)  # Textbox del libro
+                    self.frames[name].grid_rowconfigure(2, weight=0)  # Botón "terminar lectura"
+                    self.frames[name].grid_columnconfigure(0, weight=1)
+                elif name == "quiz":
+                    self.frames[name].grid_rowconfigure(0, weight=0)  # Título
+                    self.frames[name].grid_rowconfigure(1, weight=1)  # Preguntas del quiz (scrollable)
+                    self.frames[name].grid_rowconfigure(2, weight=0)  # Botón "enviar"
+                    self.frames[name].grid_columnconfigure(0, weight=1)
+                elif name == "statistics":
+                    self.frames[name].grid_rowconfigure(0, weight=0)  # Title
+                    self.frames[name].grid_rowconfigure(1, weight=0)  # Explanation frame
+                    self.frames[name].grid_rowconfigure(2, weight=1)  # Scrollable frame (table)
+                    self.frames[name].grid_rowconfigure(3, weight=0)  # Buttons
 
     # --- Nuevo método de creación de marco de inicio ---
     def _create_start_frame(self):
@@ -154,7 +214,7 @@ class AtlasReadApp(ctk.CTk):
         )
         quit_button.grid(row=3, column=0, pady=10)
 
-    # --- Métodos de creación de marcos (llamados solo una vez en __init__) ---
+    # --- Métodos de creación de marcos (llamados una sola vez, desde _ensure_frame) ---
     def _create_age_input_frame(self):
         frame = ctk.CTkFrame(self, fg_color=self.COLOR_BACKGROUND_MAIN)
         self.frames["age_input"] = frame
@@ -205,14 +265,33 @@ class AtlasReadApp(ctk.CTk):
         )
         self.book_selection_title_label.grid(row=0, column=0, pady=(10, 15))
 
-        # Contenedor para los libros (scrollable)
-        self.book_cards_container = ctk.CTkScrollableFrame(
-            frame, fg_color=self.COLOR_BACKGROUND_MAIN, corner_radius=8, border_width=0,  # Sin borde principal
-            scrollbar_button_color=self.COLOR_ACCENT_SECONDARY,
-            scrollbar_button_hover_color=self._darken_color(self.COLOR_ACCENT_SECONDARY, 10)
+        # Búsqueda y lista de libros en la misma fila expandible del frame
+        books_area = ctk.CTkFrame(frame, fg_color="transparent")
+        books_area.grid(row=1, column=0, sticky="nsew", padx=20, pady=10)  # Mayor padx/pady aquí
+        books_area.grid_columnconfigure(0, weight=1)
+        books_area.grid_rowconfigure(1, weight=1)
+
+        self.book_search_entry = ctk.CTkEntry(
+            books_area, placeholder_text="Buscar por título, autor o contenido...", font=self.FONT_BODY,
+            text_color=self.COLOR_TEXT_PRIMARY,
+            fg_color=self.COLOR_BUTTON_NORMAL,
+            border_color=self.COLOR_BORDER,
+            corner_radius=8, border_width=1
         )
-        self.book_cards_container.grid(row=1, column=0, sticky="nsew", padx=20, pady=10)  # Mayor padx/pady aquí
-        self.book_cards_container.grid_columnconfigure(0, weight=1)
+        self.book_search_entry.grid(row=0, column=0, sticky="ew", padx=7, pady=(0, 5))
+        self.book_search_entry.bind("<KeyRelease>", self._on_book_search_changed)
+
+        # Lista virtualizada: solo se crean las tarjetas visibles y se reutilizan al desplazarse
+        self.book_cards_container = VirtualCardList(
+            books_area, create_card=self._create_book_card, update_card=self._update_book_card,
+            search_key=lambda book: f"{book['title']} {book['author']}",
+            empty_text="No hay libros disponibles para tu edad.",
+            empty_font=self.FONT_BODY, empty_text_color=self.COLOR_TEXT_SECONDARY,
+            fg_color=self.COLOR_BACKGROUND_MAIN, corner_radius=8, border_width=0,  # Sin borde principal
+            scrollbar_color=self.COLOR_ACCENT_SECONDARY,
+            scrollbar_hover_color=self._darken_color(self.COLOR_ACCENT_SECONDARY, 10)
+        )
+        self.book_cards_container.grid(row=1, column=0, sticky="nsew")
 
         # Botones de navegación
         button_frame = ctk.CTkFrame(frame, fg_color="transparent")  # Fondo transparente para agrupar botones
@@ -325,18 +404,63 @@ class AtlasReadApp(ctk.CTk):
             font=self.FONT_SMALL, text_color=self.COLOR_TEXT_SECONDARY, wraplength=700, justify="left"
         ).grid(row=2, column=0, sticky="w", padx=25, pady=2)
         ctk.CTkLabel(
-            explanation_frame, text="• Quiz: Puntuación en el cuestionario de comprensión (Verde: ≥70%, Rojo: <70%).",
+            explanation_frame, text=f"• Quiz: Puntuación en el cuestionario de comprensión (Verde: ≥{QUIZ_PASS_THRESHOLD}%, Rojo: <{QUIZ_PASS_THRESHOLD}%).",
             font=self.FONT_SMALL, text_color=self.COLOR_TEXT_SECONDARY, wraplength=700, justify="left"
         ).grid(row=3, column=0, sticky="w", padx=25, pady=(2, 10))
 
-        # Contenedor para las estadísticas (actualizado dinámicamente)
-        self.stats_scrollable_frame = ctk.CTkScrollableFrame(
-            frame, fg_color=self.COLOR_BACKGROUND_MAIN, corner_radius=8, border_width=0,
+        # Resumen, tabla paginada y controles de página comparten la fila expandible del frame
+        stats_area = ctk.CTkFrame(frame, fg_color="transparent")
+        stats_area.grid(row=2, column=0, sticky="nsew", padx=20, pady=10)  # Mayor padx
+        stats_area.grid_columnconfigure(0, weight=1)
+        stats_area.grid_rowconfigure(1, weight=1)
+
+        self.stats_summary_label = ctk.CTkLabel(
+            stats_area, text="", font=self.FONT_BODY, text_color=self.COLOR_TEXT_PRIMARY
+        )
+        self.stats_summary_label.grid(row=0, column=0, pady=(0, 5))
+
+        # Contenedor para las estadísticas: solo se dibuja la página actual
+        self.stats_scrollable_frame = PagedTable(
+            stats_area, columns=["Libro", "Autor", "Duración", "WPM", "Rendimiento", "Quiz", "Fecha"],
+            page_size=STATS_PAGE_SIZE,
+            header_font=self.FONT_BUTTON,  # Fuente de botón para encabezados
+            body_font=self.FONT_BODY,  # Usar fuente normal para los datos
+            header_fg_color=self.COLOR_BUTTON_NORMAL,  # Fondo para los encabezados de tabla
+            header_text_color=self.COLOR_TEXT_PRIMARY,
+            # Fondo de fila alternado (sutil)
+            row_fg_colors=(self.COLOR_BACKGROUND_MAIN, self._darken_color(self.COLOR_BACKGROUND_MAIN, 2)),
+            empty_text="Aún no tienes sesiones de lectura registradas.",
+            empty_text_color=self.COLOR_TEXT_SECONDARY,
+            fg_color=self.COLOR_BACKGROUND_MAIN, corner_radius=8, border_width=0,
             scrollbar_button_color=self.COLOR_ACCENT_SECONDARY,
             scrollbar_button_hover_color=self._darken_color(self.COLOR_ACCENT_SECONDARY, 10)
         )
-        self.stats_scrollable_frame.grid(row=2, column=0, sticky="nsew", padx=20, pady=10)  # Mayor padx
-        self.stats_scrollable_frame.grid_columnconfigure((0, 1, 2, 3, 4, 5, 6), weight=1)
+        self.stats_scrollable_frame.grid(row=1, column=0, sticky="nsew")
+
+        pager_frame = ctk.CTkFrame(stats_area, fg_color="transparent")
+        pager_frame.grid(row=2, column=0, pady=(5, 0))
+        self.stats_prev_button = ctk.CTkButton(
+            pager_frame, text="< Anteriores", command=self._show_previous_stats_page, font=self.FONT_SMALL,
+            fg_color=self.COLOR_BUTTON_NORMAL, text_color=self.COLOR_TEXT_PRIMARY,
+            hover_color=self.COLOR_BUTTON_HOVER, width=110,
+            corner_radius=8, border_width=1, border_color=self.COLOR_BORDER
+        )
+        self.stats_prev_button.grid(row=0, column=0, padx=5)
+        self.stats_page_label = ctk.CTkLabel(
+            pager_frame, text="", font=self.FONT_SMALL, text_color=self.COLOR_TEXT_SECONDARY
+        )
+        self.stats_page_label.grid(row=0, column=1, padx=10)
+        self.stats_next_button = ctk.CTkButton(
+            pager_frame, text="Siguientes >", command=self._show_next_stats_page, font=self.FONT_SMALL,
+            fg_color=self.COLOR_BUTTON_NORMAL, text_color=self.COLOR_TEXT_PRIMARY,
+            hover_color=self.COLOR_BUTTON_HOVER, width=110,
+            corner_radius=8, border_width=1, border_color=self.COLOR_BORDER
+        )
+        self.stats_next_button.grid(row=0, column=2, padx=5)
+
+        # Cursores (start_time, id) del inicio de cada página visitada, para poder volver atrás
+        self._stats_page_cursors = [None]
+        self._stats_next_cursor = None
 
         # Botones de navegación (estáticos)
         button_frame = ctk.CTkFrame(frame, fg_color="transparent")
@@ -360,86 +484,184 @@ class AtlasReadApp(ctk.CTk):
         ).grid(row=0, column=1, padx=10)
 
     # --- Métodos que gestionan el flujo de la aplicación (ahora usan show_frame y actualizan contenido) ---
+    # --- Ejecución en segundo plano ---
+    def _run_in_background(self, fn, *args, on_success=None, on_error=None):
+        """Ejecuta fn(*args) fuera del hilo de Tk mostrando el indicador de carga mientras tanto."""
+        self._set_loading(1)
+
+        def handle_success(result):
+            self._set_loading(-1)
+            if on_success is not None:
+                on_success(result)
+
+        def handle_error(error):
+            self._set_loading(-1)
+            (on_error or self._show_background_error)(error)
+
+        return self.task_executor.submit(fn, *args, on_success=handle_success, on_error=handle_error)
+
+    def _set_loading(self, delta):
+        self._loading_count += delta
+        if self._loading_count > 0:
+            self.loading_label.place(relx=1.0, rely=0.0, x=-25, y=5, anchor="ne")
+            self.loading_label.lift()
+            self.configure(cursor="watch")
+        else:
+            self.loading_label.place_forget()
+            self.configure(cursor="")
+
+    def _is_busy(self):
+        """True mientras una acción anterior sigue en curso (evita dobles clics que dupliquen registros)."""
+        return self._loading_count > 0
+
+    def _show_background_error(self, error):
+        logger.error("Error en tarea en segundo plano: %r", error)
+        _show_message(
+            title="Error", message=f"Ocurrió un error al acceder a los datos: {error}",
+            icon="cancel", fg_color=self.COLOR_BACKGROUND_MAIN, text_color=self.COLOR_TEXT_PRIMARY
+        )
+
     def process_age_input(self):
+        if self._is_busy():
+            return
         self.age_error_label.configure(text="")
         try:
             age = int(self.age_entry.get())
             if 6 <= age <= 99:
                 self.user_age = age
-                self.user_id = self.db_manager.add_user(self.user_age)
-                if self.user_id:
-                    self.show_book_selection_frame()
-                else:
-                    CTkMessagebox(
-                        title="Error de DB", message="No se pudo registrar el usuario en la base de datos.",
-                        icon="cancel", fg_color=self.COLOR_BACKGROUND_MAIN, text_color=self.COLOR_TEXT_PRIMARY
-                    )
+                self._run_in_background(self.db_manager.add_user, self.user_age, on_success=self._on_user_added)
             else:
                 self.age_error_label.configure(text="Edad inválida: Ingresa una edad entre 6 y 99 años.")
-                CTkMessagebox(
+                _show_message(
                     title="Edad Inválida", message="Por favor, ingresa una edad entre 6 y 99 años.",
                     icon="warning", fg_color=self.COLOR_BACKGROUND_MAIN, text_color=self.COLOR_TEXT_PRIMARY
                 )
         except ValueError:
             self.age_error_label.configure(text="Entrada inválida: Por favor, ingresa un número.")
-            CTkMessagebox(
+            _show_message(
                 title="Entrada Inválida", message="Por favor, ingresa un número válido para la edad.",
                 icon="warning", fg_color=self.COLOR_BACKGROUND_MAIN, text_color=self.COLOR_TEXT_PRIMARY
             )
 
+    def _on_user_added(self, user_id):
+        self.user_id = user_id
+        if self.user_id:
+            self.show_book_selection_frame()
+        else:
+            _show_message(
+                title="Error de DB", message="No se pudo registrar el usuario en la base de datos.",
+                icon="cancel", fg_color=self.COLOR_BACKGROUND_MAIN, text_color=self.COLOR_TEXT_PRIMARY
+            )
+
+    @timed("gui.show_age_input_frame")
     def show_age_input_frame(self):
+        self._ensure_frame("age_input")
         self.age_entry.delete(0, ctk.END)
         self.age_error_label.configure(text="")
         self.show_frame("age_input")
 
     def show_book_selection_frame(self):
+        # Se mide hasta mostrar la pantalla con los libros, no solo el envío de la tarea
+        started = time.perf_counter()
+        self._run_in_background(self.app_logic.get_recommended_books, self.user_age, self.user_id,
+                                on_success=lambda books: self._on_recommended_books_loaded(books, started))
+
+    def _on_recommended_books_loaded(self, books, started=None):
+        self._ensure_frame("book_selection")
+        self.books = books
         self.book_selection_title_label.configure(text=f"Libros para tu edad ({self.user_age} años)")
-        self.books = self.app_logic.get_recommended_books(self.user_age)
+        self.book_search_entry.delete(0, ctk.END)
+        self._on_book_search_changed()  # Cancela una búsqueda pendiente y muestra todos los libros
 
-        for widget in self.book_cards_container.winfo_children():
-            widget.destroy()
+        self.show_frame("book_selection")
+        record_since("gui.show_book_selection_frame", started)
+
+    def _on_book_search_changed(self, event=None):
+        """Filtra al instante por título y autor; la búsqueda en el texto llega tras una pausa al escribir."""
+        if self._search_after_id is not None:
+            self.after_cancel(self._search_after_id)
+            self._search_after_id = None
+        query = self.book_search_entry.get().strip()
+        self._search_sequence += 1  # Descarta búsquedas en curso: su resultado ya no corresponde al texto
+        if not query:
+            self.book_cards_container.set_empty_text("No hay libros disponibles para tu edad.")
+            self.book_cards_container.set_items(self.books)
+            self._showing_search_results = False
+            return
+        if self._showing_search_results:
+            # El filtro instantáneo parte de todos los libros, no de los resultados (limitados) de books_fts
+            self.book_cards_container.set_items(self.books)
+            self._showing_search_results = False
+        self.book_cards_container.set_filter(query)
+        self._search_after_id = self.after(SEARCH_DEBOUNCE_MS, self._search_books, query)
+
+    def _search_books(self, query):
+        self._search_after_id = None
+        self._search_sequence += 1
+        sequence = self._search_sequence
+        # Directo al executor (sin indicador de carga): escribir no debe bloquear el resto de la pantalla
+        self.task_executor.submit(
+            self.db_manager.search_books, query, self.user_age,
+            on_success=lambda results: self._on_books_found(sequence, results),
+            on_error=lambda error: logger.error("Error al buscar libros: %r", error)
+        )
 
-        if not self.books:
-            ctk.CTkLabel(self.book_cards_container, text="No hay libros disponibles para tu edad.",
-                         font=self.FONT_BODY, text_color=self.COLOR_TEXT_SECONDARY).grid(row=0, column=0, pady=20)
+    def _on_books_found(self, sequence, results):
+        if sequence != self._search_sequence:
+            return  # Llegó después de una búsqueda más reciente
+        self.book_cards_container.set_empty_text("Ningún libro coincide con la búsqueda.")
+        self.book_cards_container.set_items(results)
+        self._showing_search_results = True
+
+    def _create_book_card(self, parent):
+        """Crea una tarjeta de libro vacía; VirtualCardList la reutiliza para distintos libros."""
+        book_card_frame = ctk.CTkFrame(
+            parent, fg_color=self.COLOR_BUTTON_NORMAL,
+            # Fondo claro para las tarjetas de libro
+            corner_radius=8, border_width=1,
+            border_color=self.COLOR_BORDER
+        )
+        book_card_frame.grid_columnconfigure(0, weight=1)
+        book_card_frame.grid_columnconfigure(1, weight=0)
+
+        book_card_frame.title_label = ctk.CTkLabel(book_card_frame, text="", font=self.FONT_SUBTITLE,
+                                                   # Subtítulo para títulos de libro
+                                                   text_color=self.COLOR_TEXT_PRIMARY, wraplength=450,
+                                                   justify="left")
+        book_card_frame.title_label.grid(row=0, column=0, sticky="w", padx=15, pady=5)
+        book_card_frame.info_label = ctk.CTkLabel(book_card_frame, text="", font=self.FONT_SMALL,
+                                                  text_color=self.COLOR_TEXT_SECONDARY, justify="left")
+        book_card_frame.info_label.grid(row=1, column=0, sticky="w", padx=15, pady=2)
+
+        book_card_frame.select_button = ctk.CTkButton(
+            book_card_frame, text="Leer", font=self.FONT_BUTTON,
+            fg_color=self.COLOR_ACCENT_SECONDARY,  # Botón azul principal
+            text_color="white",
+            hover_color=self._darken_color(self.COLOR_ACCENT_SECONDARY, 10),
+            corner_radius=8, border_width=1, border_color=self.COLOR_ACCENT_SECONDARY
+        )
+        book_card_frame.select_button.grid(row=0, column=1, rowspan=2, padx=15)
+        return book_card_frame
+
+    def _update_book_card(self, book_card_frame, book):
+        book_card_frame.title_label.configure(text=f"{book['title']}")
+        # Segunda línea: el fragmento del texto que coincide con la búsqueda, o la dificultad del libro
+        snippet = book.get('snippet')
+        if snippet:
+            detail = " ".join(snippet.split())
+            if len(detail) > 90:
+                detail = detail[:89] + "…"
         else:
-            for i, book in enumerate(self.books):
-                book_card_frame = ctk.CTkFrame(
-                    self.book_cards_container, fg_color=self.COLOR_BUTTON_NORMAL,
-                    # Fondo claro para las tarjetas de libro
-                    corner_radius=8, border_width=1,
-                    border_color=self.COLOR_BORDER
-                )
-                book_card_frame.grid(row=i, column=0, sticky="ew", pady=7, padx=7)
-                book_card_frame.grid_columnconfigure(0, weight=1)
-                book_card_frame.grid_columnconfigure(1, weight=0)
-
-                ctk.CTkLabel(book_card_frame, text=f"{book['title']}", font=self.FONT_SUBTITLE,
-                             # Subtítulo para títulos de libro
-                             text_color=self.COLOR_TEXT_PRIMARY, wraplength=450, justify="left").grid(row=0, column=0,
-                                                                                                      sticky="w",
-                                                                                                      padx=15, pady=5)
-                ctk.CTkLabel(book_card_frame, text=f"por {book['author']} | Edad: {book['min_age']}-{book['max_age']}",
-                             font=self.FONT_SMALL, text_color=self.COLOR_TEXT_SECONDARY, justify="left").grid(row=1,
-                                                                                                              column=0,
-                                                                                                              sticky="w",
-                                                                                                              padx=15,
-                                                                                                              pady=2)
-
-                select_button = ctk.CTkButton(
-                    book_card_frame, text="Leer", command=lambda b=book: self.start_reading(b), font=self.FONT_BUTTON,
-                    fg_color=self.COLOR_ACCENT_SECONDARY,  # Botón azul principal
-                    text_color="white",
-                    hover_color=self._darken_color(self.COLOR_ACCENT_SECONDARY, 10),
-                    corner_radius=8, border_width=1, border_color=self.COLOR_ACCENT_SECONDARY
-                )
-                select_button.grid(row=0, column=1, rowspan=2, padx=15)
-
-        self.show_frame("book_selection")
+            detail = f"Dificultad: {readability_label(book.get('readability_fh'))}"
+        book_card_frame.info_label.configure(
+            text=f"por {book['author']} | Edad: {book['min_age']}-{book['max_age']}\n{detail}")
+        book_card_frame.select_button.configure(command=lambda b=book: self.start_reading(b))
 
     def start_reading(self, book):
+        if self._is_busy():
+            return
         if self.user_id is None:
-            CTkMessagebox(
+            _show_message(
                 title="Error de Usuario",
                 message="No se ha registrado un usuario. Por favor, reinicia la aplicación e ingresa tu edad.",
                 icon="cancel", fg_color=self.COLOR_BACKGROUND_MAIN, text_color=self.COLOR_TEXT_PRIMARY
@@ -447,32 +669,144 @@ class AtlasReadApp(ctk.CTk):
             return
 
         self.current_book = book
+        self._run_in_background(self.db_manager.start_reading_session, self.user_id, self.current_book['id'],
+                                on_success=self._on_reading_session_started)
+
+    def _on_reading_session_started(self, session_id):
+        self.current_reading_session_id = session_id
         self.reading_start_time = datetime.datetime.now()
-        self.current_reading_session_id = self.db_manager.start_reading_session(
-            self.user_id, self.current_book['id']
-        )
         if self.current_reading_session_id:
             self.show_reading_frame()
         else:
-            CTkMessagebox(
+            _show_message(
                 title="Error de Sesión",
                 message="No se pudo iniciar la sesión de lectura. Por favor, inténtalo de nuevo.",
                 icon="cancel", fg_color=self.COLOR_BACKGROUND_MAIN, text_color=self.COLOR_TEXT_PRIMARY
             )
 
+    @timed("gui.show_reading_frame")
     def show_reading_frame(self):
+        self._ensure_frame("reading")
         self.reading_title_label.configure(text=self.current_book['title'])
-        book_content = self.app_logic.read_book_content(self.current_book['content_path'])
+        self._close_book_pager()
         self.book_text_widget.configure(state="normal")
         self.book_text_widget.delete("1.0", "end")
-        self.book_text_widget.insert("end", book_content)
         self.book_text_widget.configure(state="disabled")
-
         self.show_frame("reading")
 
+        book = self.current_book
+        self._run_in_background(self._open_book_first_pages, book['content_path'],
+                                on_success=lambda result: self._on_book_opened(book, result))
+
+    def _open_book_first_pages(self, content_path):
+        """Se ejecuta en un hilo de fondo: abre el libro y lee la primera página más el margen de precarga."""
+        pager = self.app_logic.open_book_pager(content_path)
+        pages = []
+        if pager is not None:
+            for index in range(1 + READER_PREFETCH_PAGES):
+                text = pager.get_page(index)
+                if not text:
+                    break
+                pages.append(text)
+        return pager, pages
+
+    def _on_book_opened(self, book, result):
+        pager, pages = result
+        if book is not self.current_book or not self.frames["reading"].winfo_ismapped():
+            if pager is not None:
+                pager.close()  # El usuario ya salió de la pantalla de lectura
+            return
+
+        self.book_pager = pager
+        self._book_end_reached = False
+        self.book_text_widget.configure(state="normal")
+        if pager is None:
+            self.book_text_widget.insert("end", "Contenido del libro no disponible.")
+        else:
+            for index, text in enumerate(pages):
+                self.book_text_widget.insert("end", text)
+                self._loaded_pages.append((index, len(text)))
+        self.book_text_widget.configure(state="disabled")
+        self.book_text_widget.yview_moveto(0)
+
+        if pager is not None:
+            self._reading_poll_id = self.after(READER_POLL_MS, self._update_reading_window)
+
+    def _update_reading_window(self):
+        """Pide la página siguiente/anterior cuando la vista se acerca a un borde del texto cargado."""
+        self._reading_poll_id = None
+        if self.book_pager is None or not self.frames["reading"].winfo_ismapped():
+            return
+
+        if self._page_request is None and self._loaded_pages:
+            first, last = self.book_text_widget.yview()
+            if last >= 1 - READER_SCROLL_MARGIN and not self._book_end_reached:
+                self._request_book_page(self._loaded_pages[-1][0] + 1, at_end=True)
+            elif first <= READER_SCROLL_MARGIN and self._loaded_pages[0][0] > 0:
+                self._request_book_page(self._loaded_pages[0][0] - 1, at_end=False)
+
+        self._reading_poll_id = self.after(READER_POLL_MS, self._update_reading_window)
+
+    def _request_book_page(self, index, at_end):
+        pager = self.book_pager
+        self._page_request = index
+
+        def handle_error(error):
+            self._page_request = None
+            if pager is self.book_pager:
+                logger.error("Error al leer la página %d del libro: %r", index, error)
+
+        self.task_executor.submit(
+            pager.get_page, index,
+            on_success=lambda text: self._on_book_page_loaded(pager, index, at_end, text),
+            on_error=handle_error
+        )
+
+    def _on_book_page_loaded(self, pager, index, at_end, text):
+        """Inserta la página leída y descarta la del extremo opuesto si hay demasiadas cargadas."""
+        self._page_request = None
+        if pager is not self.book_pager:
+            return  # Se cambió de libro mientras se leía la página
+        if not text:
+            if at_end:
+                self._book_end_reached = True
+            return
+
+        top_index = self.book_text_widget.index("@0,0")  # Primer carácter visible
+        self.book_text_widget.configure(state="normal")
+        if at_end:
+            self.book_text_widget.insert("end", text)
+            self._loaded_pages.append((index, len(text)))
+            if len(self._loaded_pages) > READER_MAX_LOADED_PAGES:
+                _, removed_chars = self._loaded_pages.popleft()
+                self.book_text_widget.delete("1.0", f"1.0 + {removed_chars} chars")
+                # Mantener al lector en el mismo punto del texto tras quitar la página de arriba
+                self.book_text_widget.yview(f"{top_index} - {removed_chars} chars")
+        else:
+            self.book_text_widget.insert("1.0", text)
+            self._loaded_pages.appendleft((index, len(text)))
+            if len(self._loaded_pages) > READER_MAX_LOADED_PAGES:
+                _, removed_chars = self._loaded_pages.pop()
+                self.book_text_widget.delete(f"end - {removed_chars + 1} chars", "end - 1 chars")
+                self._book_end_reached = False
+            self.book_text_widget.yview(f"{top_index} + {len(text)} chars")
+        self.book_text_widget.configure(state="disabled")
+
+    def _close_book_pager(self):
+        if self._reading_poll_id is not None:
+            self.after_cancel(self._reading_poll_id)
+            self._reading_poll_id = None
+        if self.book_pager is not None:
+            self.book_pager.close()
+            self.book_pager = None
+        self._loaded_pages.clear()
+        self._page_request = None
+
     def finish_reading(self):
+        if self._is_busy():
+            return
         if not self.reading_start_time or not self.current_book or not self.current_reading_session_id:
-            CTkMessagebox(
+            _show_message(
                 title="Error", message="No hay una sesión de lectura activa para finalizar.",
                 icon="warning", fg_color=self.COLOR_BACKGROUND_MAIN, text_color=self.COLOR_TEXT_PRIMARY
             )
@@ -480,6 +814,7 @@ class AtlasReadApp(ctk.CTk):
 
         end_time = datetime.datetime.now()
         duration_seconds = int((end_time - self.reading_start_time).total_seconds())
+        self._close_book_pager()
 
         if duration_seconds <= 0:
             duration_seconds = 1
@@ -487,7 +822,8 @@ class AtlasReadApp(ctk.CTk):
         book_word_count = self.current_book.get('word_count', 0)
 
         actual_wpm, age_appropriateness_score, performance_rating = \
-            self.app_logic.calculate_reading_stats(self.user_age, book_word_count, duration_seconds)
+            self.app_logic.calculate_reading_stats(self.user_age, book_word_count, duration_seconds,
+                                                   self.current_book.get('readability_fh'))
 
         self._temp_stats = {
             "duration_seconds": duration_seconds,
@@ -496,37 +832,47 @@ class AtlasReadApp(ctk.CTk):
             "performance_rating": performance_rating
         }
 
-        self.current_quiz_data = self.app_logic.load_quiz_for_book(self.current_book['id'])
+        self._run_in_background(self.app_logic.load_quiz_for_book, self.current_book['id'],
+                                on_success=self._on_quiz_loaded)
+
+    def _on_quiz_loaded(self, quiz_data):
+        self.current_quiz_data = quiz_data
 
         if self.current_quiz_data:
             self.show_quiz_frame()
         else:
-            success = self.db_manager.finish_reading_session(
+            self._run_in_background(
+                self.db_manager.finish_reading_session,
                 self.current_reading_session_id,
                 self._temp_stats["duration_seconds"],
                 self._temp_stats["wpm"],
                 self._temp_stats["age_appropriateness_score"],
                 self._temp_stats["performance_rating"],
-                None
+                None,
+                on_success=self._on_session_saved_without_quiz
             )
-            if success:
-                CTkMessagebox(
-                    title="Lectura Finalizada", message="Sesión de lectura guardada con éxito (sin cuestionario).",
-                    icon="info", fg_color=self.COLOR_BACKGROUND_MAIN, text_color=self.COLOR_TEXT_PRIMARY
-                )
-                self.show_statistics_frame()
-            else:
-                CTkMessagebox(
-                    title="Error", message="No se pudo guardar la sesión de lectura.",
-                    icon="cancel", fg_color=self.COLOR_BACKGROUND_MAIN, text_color=self.COLOR_TEXT_PRIMARY
-                )
 
+    def _on_session_saved_without_quiz(self, success):
+        if success:
+            _show_message(
+                title="Lectura Finalizada", message="Sesión de lectura guardada con éxito (sin cuestionario).",
+                icon="info", fg_color=self.COLOR_BACKGROUND_MAIN, text_color=self.COLOR_TEXT_PRIMARY
+            )
+            self.show_statistics_frame()
+        else:
+            _show_message(
+                title="Error", message="No se pudo guardar la sesión de lectura.",
+                icon="cancel", fg_color=self.COLOR_BACKGROUND_MAIN, text_color=self.COLOR_TEXT_PRIMARY
+            )
+
+    @timed("gui.show_quiz_frame")
     def show_quiz_frame(self):
         if not self.current_quiz_data:
-            CTkMessagebox(title="Error", message="No hay datos de cuestionario disponibles.", icon="cancel")
+            _show_message(title="Error", message="No hay datos de cuestionario disponibles.", icon="cancel")
             self.show_statistics_frame()
             return
 
+        self._ensure_frame("quiz")
         self.quiz_title_label.configure(text=f"Cuestionario: {self.current_book['title']}")
 
         for widget in self.scrollable_questions_frame.winfo_children():
@@ -566,117 +912,156 @@ class AtlasReadApp(ctk.CTk):
         self.show_frame("quiz")
 
     def process_quiz_answers(self):
+        if self._is_busy():
+            return
         for q_id, var in self.quiz_radio_vars.items():
             self.user_quiz_answers[q_id] = var.get()
 
-        correct_count, total_questions = self.app_logic.evaluate_quiz(
-            self.current_quiz_data, self.user_quiz_answers
-        )
+        # Las variables se crearon en el orden de las preguntas: se evalúan como enteros en ese orden
+        answers = [int(var.get() or 0) for var in self.quiz_radio_vars.values()]
+        correct_count, total_questions = self.app_logic.evaluate_quiz(self.current_quiz_data, answers)
+        # Se guardan también las respuestas de cada pregunta para el análisis de los cuestionarios
+        quiz_responses = self.app_logic.grade_quiz_answers(self.current_quiz_data, answers)
 
         quiz_score_percentage = (correct_count / total_questions) * 100 if total_questions > 0 else 0
 
-        success = self.db_manager.finish_reading_session(
+        self._run_in_background(
+            self.db_manager.finish_reading_session,
             self.current_reading_session_id,
             self._temp_stats["duration_seconds"],
             self._temp_stats["wpm"],
             self._temp_stats["age_appropriateness_score"],
             self._temp_stats["performance_rating"],
-            quiz_score_percentage
+            quiz_score_percentage,
+            quiz_responses,
+            self.current_quiz_data.get("quiz_hash"),
+            on_success=lambda success: self._on_quiz_session_saved(success, correct_count, total_questions,
+                                                                   quiz_score_percentage)
         )
 
+    def _on_quiz_session_saved(self, success, correct_count, total_questions, quiz_score_percentage):
         if success:
-            CTkMessagebox(
+            _show_message(
                 title="Cuestionario Finalizado",
                 message=f"Has respondido correctamente {correct_count} de {total_questions} preguntas.\nTu puntuación es: {quiz_score_percentage:.2f}%",
                 icon="info", fg_color=self.COLOR_BACKGROUND_MAIN, text_color=self.COLOR_TEXT_PRIMARY
             )
             self.show_statistics_frame()
         else:
-            CTkMessagebox(
+            _show_message(
                 title="Error", message="No se pudo guardar la sesión de lectura y la puntuación del cuestionario.",
                 icon="cancel", fg_color=self.COLOR_BACKGROUND_MAIN, text_color=self.COLOR_TEXT_PRIMARY
             )
 
     def show_statistics_frame(self):
-        stats = self.db_manager.get_user_reading_stats(self.user_id)
+        self._stats_page_cursors = [None]
+        started = time.perf_counter()
+        self._run_in_background(self._fetch_statistics, self.user_id, None, True,
+                                on_success=lambda result: self._on_statistics_loaded(result, started))
+
+    def _fetch_statistics(self, user_id, cursor, include_summary):
+        """Se ejecuta en un hilo de fondo: resumen (opcional) y una página de sesiones."""
+        summary = self.db_manager.get_user_reading_summary(user_id) if include_summary else None
+        sessions, next_cursor = self.db_manager.get_user_reading_stats_page(user_id, STATS_PAGE_SIZE, cursor)
+        return summary, sessions, next_cursor
+
+    def _on_statistics_loaded(self, result, started=None):
+        summary, sessions, next_cursor = result
+        self._ensure_frame("statistics")
+        if summary is not None:
+            self._show_stats_summary(summary)
+        self._show_stats_page(sessions, next_cursor)
+        self.show_frame("statistics")
+        record_since("gui.show_statistics_frame", started)  # Sin started al cambiar de página
+
+    def _show_stats_summary(self, summary):
+        if summary["session_count"]:
+            total_minutes = summary["total_seconds"] // 60
+            avg_wpm_str = f"{summary['avg_wpm']:.1f}" if summary["avg_wpm"] is not None else "N/A"
+            avg_quiz_str = f"{summary['avg_quiz_score']:.1f}%" if summary["avg_quiz_score"] is not None else "N/A"
+            pass_rate_str = f"{summary['quiz_pass_rate']:.0f}%" if summary["quiz_pass_rate"] is not None else "N/A"
+            self.stats_summary_label.configure(
+                text=f"Sesiones: {summary['session_count']}  |  Tiempo total: {total_minutes} min  |  "
+                     f"WPM promedio: {avg_wpm_str}  |  Quiz promedio: {avg_quiz_str}  |  "
+                     f"Aprobados: {pass_rate_str}"
+            )
+        else:
+            self.stats_summary_label.configure(text="")
+
+    def _show_next_stats_page(self):
+        if self._stats_next_cursor is not None and not self._is_busy():
+            self._stats_page_cursors.append(self._stats_next_cursor)
+            self._load_stats_page()
+
+    def _show_previous_stats_page(self):
+        if len(self._stats_page_cursors) > 1 and not self._is_busy():
+            self._stats_page_cursors.pop()
+            self._load_stats_page()
+
+    def _load_stats_page(self):
+        self._run_in_background(self._fetch_statistics, self.user_id, self._stats_page_cursors[-1], False,
+                                on_success=self._on_statistics_loaded)
+
+    def _show_stats_page(self, sessions, next_cursor):
+        self._stats_next_cursor = next_cursor
+        self.stats_scrollable_frame.set_rows([self._format_session_row(session) for session in sessions])
+
+        page_number = len(self._stats_page_cursors)
+        self.stats_page_label.configure(text=f"Página {page_number}" if sessions else "")
+        self.stats_prev_button.configure(state="normal" if page_number > 1 else "disabled")
+        self.stats_next_button.configure(state="normal" if self._stats_next_cursor is not None else "disabled")
+
+    def _format_session_row(self, session):
+        """Convierte una sesión en la lista de (texto, color) de cada columna de la tabla."""
+        if session['duration_seconds'] is not None:
+            duration_minutes = session['duration_seconds'] // 60
+            duration_seconds_remainder = session['duration_seconds'] % 60
+            duration_str = f"{duration_minutes}m {duration_seconds_remainder}s"
+        else:
+            duration_str = "-"  # Sesión iniciada pero no terminada
 
-        for widget in self.stats_scrollable_frame.winfo_children():
-            widget.destroy()
+        try:
+            start_datetime = datetime.datetime.fromisoformat(session['start_time'])
+            date_str = start_datetime.strftime("%Y-%m-%d %H:%M")
+        except ValueError:
+            date_str = session['start_time']
+
+        performance_rating = session['performance_rating'] or "-"
+        performance_color = self.COLOR_TEXT_PRIMARY
+        if "Excelente" in performance_rating:
+            performance_color = self.COLOR_PERFORMANCE_EXCELLENT
+        elif "Bueno" in performance_rating:
+            performance_color = self.COLOR_PERFORMANCE_GOOD
+        elif "Aceptable" in performance_rating:
+            performance_color = self.COLOR_PERFORMANCE_OK
+        elif "Necesita mejorar" in performance_rating or "Lento" in performance_rating:
+            performance_color = self.COLOR_PERFORMANCE_BAD
+
+        quiz_score_str = f"{session['quiz_score']:.2f}%" if session['quiz_score'] is not None else "N/A"
+        quiz_score_color = self.COLOR_TEXT_PRIMARY
+        if session['quiz_score'] is not None:
+            if session['quiz_score'] >= QUIZ_PASS_THRESHOLD:
+                quiz_score_color = self.COLOR_QUIZ_PASS
+            else:
+                quiz_score_color = self.COLOR_QUIZ_FAIL
 
-        if not stats:
-            ctk.CTkLabel(self.stats_scrollable_frame, text="Aún no tienes sesiones de lectura registradas.",
-                         font=self.FONT_BODY, text_color=self.COLOR_TEXT_SECONDARY).grid(row=0, column=0, pady=20)
-        else:
-            column_names = ["Libro", "Autor", "Duración", "WPM", "Rendimiento", "Quiz", "Fecha"]
-
-            for col, name in enumerate(column_names):
-                ctk.CTkLabel(self.stats_scrollable_frame, text=name, font=self.FONT_BUTTON,
-                             # Fuente de botón para encabezados
-                             text_color=self.COLOR_TEXT_PRIMARY, justify="center",
-                             fg_color=self.COLOR_BUTTON_NORMAL,  # Fondo para los encabezados de tabla
-                             corner_radius=0, padx=5, pady=5).grid(row=0, column=col, sticky="ew")
-
-            for i, session in enumerate(stats):
-                row_num = i + 1
-
-                duration_minutes = session['duration_seconds'] // 60
-                duration_seconds_remainder = session['duration_seconds'] % 60
-                duration_str = f"{duration_minutes}m {duration_seconds_remainder}s"
-
-                try:
-                    start_datetime = datetime.datetime.fromisoformat(session['start_time'])
-                    date_str = start_datetime.strftime("%Y-%m-%d %H:%M")
-                except ValueError:
-                    date_str = session['start_time']
-
-                performance_color = self.COLOR_TEXT_PRIMARY
-                if "Excelente" in session['performance_rating']:
-                    performance_color = self.COLOR_PERFORMANCE_EXCELLENT
-                elif "Bueno" in session['performance_rating']:
-                    performance_color = self.COLOR_PERFORMANCE_GOOD
-                elif "Aceptable" in session['performance_rating']:
-                    performance_color = self.COLOR_PERFORMANCE_OK
-                elif "Necesita mejorar" in session['performance_rating'] or "Lento" in session['performance_rating']:
-                    performance_color = self.COLOR_PERFORMANCE_BAD
-
-                quiz_score_str = f"{session['quiz_score']:.2f}%" if session['quiz_score'] is not None else "N/A"
-                quiz_score_color = self.COLOR_TEXT_PRIMARY
-                if session['quiz_score'] is not None:
-                    if session['quiz_score'] >= 70:  # Umbral de aprobación
-                        quiz_score_color = self.COLOR_QUIZ_PASS
-                    else:
-                        quiz_score_color = self.COLOR_QUIZ_FAIL
-
-                row_data_values = [
-                    session['book_title'],
-                    session['book_author'],
-                    duration_str,
-                    f"{session['wpm']:.2f}",
-                    session['performance_rating'],
-                    quiz_score_str,
-                    date_str
-                ]
-                row_data_colors = [
-                    self.COLOR_TEXT_PRIMARY, self.COLOR_TEXT_SECONDARY, self.COLOR_TEXT_PRIMARY,
-                    self.COLOR_TEXT_PRIMARY, performance_color, quiz_score_color, self.COLOR_TEXT_SECONDARY
-                ]
-                row_data_fonts = [self.FONT_BODY] * len(row_data_values)  # Usar fuente normal para los datos
-
-                # Fondo de fila alternado (sutil)
-                row_bg_color = self.COLOR_BACKGROUND_MAIN if i % 2 == 0 else self._darken_color(
-                    self.COLOR_BACKGROUND_MAIN, 2)
-
-                for col, data in enumerate(row_data_values):
-                    ctk.CTkLabel(
-                        self.stats_scrollable_frame, text=data, justify="center",
-                        font=row_data_fonts[col], text_color=row_data_colors[col],
-                        fg_color=row_bg_color,  # Fondo de fila
-                        corner_radius=0, padx=5, pady=5
-                    ).grid(row=row_num, column=col, sticky="ew")
+        wpm_str = f"{session['wpm']:.2f}" if session['wpm'] is not None else "-"
 
-        self.show_frame("statistics")
+        return [
+            (session['book_title'], self.COLOR_TEXT_PRIMARY),
+            (session['book_author'], self.COLOR_TEXT_SECONDARY),
+            (duration_str, self.COLOR_TEXT_PRIMARY),
+            (wpm_str, self.COLOR_TEXT_PRIMARY),
+            (performance_rating, performance_color),
+            (quiz_score_str, quiz_score_color),
+            (date_str, self.COLOR_TEXT_SECONDARY),
+        ]
 
     def quit_application(self):
+        # Esperar a que terminen las escrituras en curso antes de cerrar las conexiones
+        self.task_executor.shutdown(wait=True)
+        self._close_book_pager()
+        self.db_manager.close()
         self.destroy()
 
     # Métodos auxiliares para oscurecer/aclarar colores
@@ -0,0 +1,317 @@
+# src/indexer.py
+
+import os
+import json
+import hashlib
+import logging
+
+from src.config import (BOOKS_DIRECTORY, QUIZZES_DIRECTORY, CATALOG_FILE,
+                        INDEXER_PROCESS_POOL_THRESHOLD, INDEXER_MAX_WORKERS)
+from src.text_stats import TEXT_STATS_VERSION, TextStats, analyze_text_file
+from src.quiz_bundle import QUIZ_BUNDLE_VERSION, compile_quiz, store_quiz, delete_quiz
+
+logger = logging.getLogger(__name__)
+
+# Columnas de books que escribe el indexador, en el orden de cada fila
+BOOK_COLUMNS = ("title", "author", "min_age", "max_age", "content_path",
+                "word_count", "sentence_count", "syllable_count", "readability_fh", "readability_szigriszt")
+_UPSERT_BOOK_SQL = (
+    f"INSERT INTO books ({', '.join(BOOK_COLUMNS)}) VALUES ({', '.join('?' for _ in BOOK_COLUMNS)}) "
+    "ON CONFLICT(content_path) DO UPDATE SET "
+    + ", ".join(f"{column} = excluded.{column}" for column in BOOK_COLUMNS if column != "content_path")
+)
+# Estadísticas de un libro cuyo archivo no existe
+_EMPTY_TEXT_STATS = TextStats(0, 0, 0, None, None)
+# Versión del contenido de books_fts: subirla obliga a reconstruir el índice de búsqueda completo
+SEARCH_INDEX_VERSION = 1
+
+
+def _read_book_body(full_path):
+    try:
+        with open(full_path, 'r', encoding='utf-8', errors='replace') as f:
+            return f.read()
+    except FileNotFoundError:
+        return ""
+
+
+# --- Funciones de trabajo (a nivel de módulo para poder ejecutarse en otro proceso) ---
+def _analyze_book_file(full_path):
+    """Lee un libro una sola vez, por bloques, y devuelve (sha256, TextStats)."""
+    return analyze_text_file(full_path)
+
+
+def _analyze_quiz_file(full_path):
+    """Devuelve (sha256, cuestionario compilado o None si el JSON no es válido)."""
+    with open(full_path, 'rb') as f:
+        data = f.read()
+    try:
+        compiled = compile_quiz(json.loads(data.decode('utf-8')))
+    except ValueError:  # Incluye JSONDecodeError y UnicodeDecodeError
+        compiled = None
+    return hashlib.sha256(data).hexdigest(), compiled
+
+
+def _analyze_file(task):
+    kind, full_path = task
+    try:
+        if kind == "book":
+            return _analyze_book_file(full_path)
+        return _analyze_quiz_file(full_path)
+    except OSError as e:
+        logger.error("Error al leer el archivo %s: %s", full_path, e)
+        return None
+
+
+class CatalogIndexer:
+    """
+    Sincroniza la tabla books con los archivos de BOOKS_DIRECTORY y QUIZZES_DIRECTORY.
+    Solo vuelve a procesar los archivos cuyo tamaño, fecha o contenido cambió.
+    """
+
+    def __init__(self, db_manager, books_directory=BOOKS_DIRECTORY, quizzes_directory=QUIZZES_DIRECTORY,
+                 catalog_file=CATALOG_FILE):
+        self.db_manager = db_manager
+        self.books_directory = books_directory
+        self.quizzes_directory = quizzes_directory
+        self.catalog_file = catalog_file
+
+    def refresh(self, force=False):
+        """
+        Escanea el catálogo y actualiza la base de datos. Devuelve un resumen de lo procesado.
+        Con force=True se ignora la huella guardada y se reprocesa todo: estadísticas de texto,
+        cuestionarios y búsqueda, como si hubiera cambiado la versión de cada uno.
+        """
+        book_files = self._scan_directory(self.books_directory, ".txt")
+        quiz_files = self._scan_directory(self.quizzes_directory, ".json")
+        sidecar_files = self._scan_directory(self.books_directory, ".json")
+
+        summary = {"skipped": False, "books": 0, "reprocessed": 0, "quizzes_changed": []}
+
+        # Huella barata (solo stat) de todo el catálogo; si coincide no se toca ningún archivo
+        manifest_hash = self._compute_manifest(book_files, quiz_files, sidecar_files)
+        has_search_index = self.db_manager.has_full_text_search()
+        search_index_outdated = has_search_index and (
+            force or self.db_manager._get_metadata("search_index_version") != str(SEARCH_INDEX_VERSION))
+        quiz_bundle_outdated = force or self.db_manager._get_metadata("quiz_bundle_version") != str(QUIZ_BUNDLE_VERSION)
+        if (not force and not search_index_outdated and not quiz_bundle_outdated
+                and self.db_manager._get_metadata("catalog_manifest") == manifest_hash):
+            summary["skipped"] = True
+            return summary
+
+        metadata = self._load_metadata(sidecar_files)
+
+        conn = self.db_manager._get_connection()
+        known_files = {
+            row["path"]: row for row in
+            conn.execute("SELECT path, size, mtime_ns, sha256 FROM catalog_files")
+        }
+        current_books = {
+            row["content_path"]: row for row in
+            conn.execute(f"SELECT {', '.join(BOOK_COLUMNS)} FROM books")
+        }
+        # Si cambió el algoritmo de estadísticas de texto hay que volver a analizar todos los libros
+        text_stats_outdated = force or self.db_manager._get_metadata("text_stats_version") != str(TEXT_STATS_VERSION)
+
+        # Archivos cuyo tamaño o fecha cambió (o que son nuevos) son candidatos a reprocesar
+        tasks = []
+        for kind, directory, files in (("book", self.books_directory, book_files),
+                                       ("quiz", self.quizzes_directory, quiz_files)):
+            for filename, stat in files.items():
+                if kind == "book" and filename not in metadata:
+                    continue  # Sin metadatos no se puede catalogar
+                known = known_files.get(self._relative_path(kind, filename))
+                if (known is None or known["size"] != stat.st_size or known["mtime_ns"] != stat.st_mtime_ns
+                        or (kind == "book" and text_stats_outdated) or (kind == "quiz" and quiz_bundle_outdated)):
+                    tasks.append((kind, filename, os.path.join(directory, filename)))
+
+        results = self._analyze(tasks)
+
+        file_rows = []
+        new_text_stats = {}
+        compiled_quizzes = {}
+        for (kind, filename, full_path), result in zip(tasks, results):
+            if result is None:
+                continue
+            relative_path = self._relative_path(kind, filename)
+            stat = book_files[filename] if kind == "book" else quiz_files[filename]
+            sha256, value = result
+            file_rows.append((relative_path, kind, stat.st_size, stat.st_mtime_ns, sha256))
+
+            known = known_files.get(relative_path)
+            if (known is not None and known["sha256"] == sha256
+                    and ((kind == "quiz" and not quiz_bundle_outdated)
+                         or (kind == "book" and relative_path in current_books and not text_stats_outdated))):
+                continue  # Solo cambió la fecha; el contenido es el mismo
+            summary["reprocessed"] += 1
+            if kind == "book":
+                new_text_stats[relative_path] = value
+            else:
+                if value is None:
+                    logger.warning("Cuestionario con formato inválido: %s", full_path)
+                compiled_quizzes[filename] = value
+                summary["quizzes_changed"].append(filename)
+
+        # Libros nuevos, con metadatos modificados o con contenido modificado
+        book_rows = []
+        for filename, book_data in metadata.items():
+            relative_path = self._relative_path("book", filename)
+            current = current_books.get(relative_path)
+            if relative_path in new_text_stats:
+                text_stats = new_text_stats[relative_path]
+            elif current is not None:
+                text_stats = TextStats(current["word_count"], current["sentence_count"], current["syllable_count"],
+                                       current["readability_fh"], current["readability_szigriszt"])
+            else:
+                if filename not in book_files:
+                    logger.warning("Archivo de contenido no encontrado para conteo de palabras: %s",
+                                   os.path.join(self.books_directory, filename))
+                text_stats = _EMPTY_TEXT_STATS
+            row = (book_data["title"], book_data["author"], book_data["min_age"], book_data["max_age"],
+                   relative_path, *text_stats)
+            if current is None or tuple(current) != row:
+                book_rows.append(row)
+
+        # Libros cuyo texto o metadatos cambiaron se vuelven a indexar para la búsqueda
+        if search_index_outdated:
+            search_filenames = list(metadata)
+        else:
+            changed_paths = {row[4] for row in book_rows} | new_text_stats.keys()
+            search_filenames = [f for f in metadata if self._relative_path("book", f) in changed_paths]
+
+        # Un libro nuevo puede tener ya su cuestionario en disco sin cambios: también hay que compilarlo
+        new_book_paths = {row[4] for row in book_rows if row[4] not in current_books}
+        for filename in quiz_files:
+            if filename not in compiled_quizzes and self._quiz_book_path(filename) in new_book_paths:
+                result = _analyze_file(("quiz", os.path.join(self.quizzes_directory, filename)))
+                if result is not None:
+                    compiled_quizzes[filename] = result[1]
+
+        # Archivos que desaparecieron del disco (los libros se conservan por las sesiones que los usan)
+        present_paths = {self._relative_path("book", f) for f in book_files}
+        present_paths.update(self._relative_path("quiz", f) for f in quiz_files)
+        missing_paths = [(path,) for path in known_files if path not in present_paths]
+        for (path,) in missing_paths:
+            filename = os.path.basename(path)
+            if path == self._relative_path("quiz", filename):
+                compiled_quizzes[filename] = None  # Cuestionario borrado: se quita de la base de datos
+
+        with conn:  # Todo el refresco en una sola transacción
+            conn.executemany(_UPSERT_BOOK_SQL, book_rows)
+            conn.executemany(
+                """INSERT INTO catalog_files (path, kind, size, mtime_ns, sha256, indexed_at)
+                   VALUES (?, ?, ?, ?, ?, datetime('now'))
+                   ON CONFLICT(path) DO UPDATE SET
+                       size = excluded.size,
+                       mtime_ns = excluded.mtime_ns,
+                       sha256 = excluded.sha256,
+                       indexed_at = excluded.indexed_at""",
+                file_rows
+            )
+            conn.executemany("DELETE FROM catalog_files WHERE path = ?", missing_paths)
+            if has_search_index and search_filenames:
+                self._update_search_index(conn, metadata, search_filenames)
+                self.db_manager._set_metadata(conn, "search_index_version", str(SEARCH_INDEX_VERSION))
+            if compiled_quizzes:
+                self._update_quizzes(conn, compiled_quizzes)
+            self.db_manager._set_metadata(conn, "quiz_bundle_version", str(QUIZ_BUNDLE_VERSION))
+            self.db_manager._set_metadata(conn, "catalog_manifest", manifest_hash)
+            self.db_manager._set_metadata(conn, "text_stats_version", str(TEXT_STATS_VERSION))
+
+        summary["books"] = len(book_rows)
+        return summary
+
+    def _update_search_index(self, conn, metadata, filenames):
+        """Reemplaza en books_fts las filas de esos libros. Los textos se leen de uno en uno."""
+        book_ids = dict(conn.execute("SELECT content_path, id FROM books"))
+        entries = [(book_ids[self._relative_path("book", f)], f) for f in filenames
+                   if self._relative_path("book", f) in book_ids]
+        conn.executemany("DELETE FROM books_fts WHERE rowid = ?", [(book_id,) for book_id, _ in entries])
+        conn.executemany(
+            "INSERT INTO books_fts (rowid, title, author, body) VALUES (?, ?, ?, ?)",
+            ((book_id, metadata[f]["title"], metadata[f]["author"],
+              _read_book_body(os.path.join(self.books_directory, f)))
+             for book_id, f in entries)
+        )
+
+    def _update_quizzes(self, conn, compiled_quizzes):
+        """Guarda (o borra, si el valor es None) el cuestionario compilado del libro de cada archivo."""
+        book_ids = dict(conn.execute("SELECT content_path, id FROM books"))
+        for filename, compiled in compiled_quizzes.items():
+            book_id = book_ids.get(self._quiz_book_path(filename))
+            if book_id is None:
+                continue  # Cuestionario sin libro en el catálogo
+            if compiled is None:
+                delete_quiz(conn, book_id)
+            else:
+                store_quiz(conn, book_id, compiled)
+
+    def _analyze(self, tasks):
+        """Procesa los archivos cambiados; usa un pool de procesos si son muchos."""
+        work = [(kind, full_path) for kind, _, full_path in tasks]
+        if len(work) < INDEXER_PROCESS_POOL_THRESHOLD:
+            return [_analyze_file(task) for task in work]
+
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=INDEXER_MAX_WORKERS) as executor:
+            return list(executor.map(_analyze_file, work, chunksize=16))
+
+    def _scan_directory(self, directory, extension):
+        files = {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.endswith(extension):
+                        files[entry.name] = entry.stat()
+        except FileNotFoundError:
+            logger.warning("Directorio no encontrado: %s", directory)
+        return files
+
+    def _load_metadata(self, sidecar_files):
+        """
+        Metadatos por archivo de libro: primero catalog.json y luego, con prioridad,
+        un archivo <nombre>.json junto al .txt si existe.
+        """
+        metadata = {}
+        try:
+            with open(self.catalog_file, 'r', encoding='utf-8') as f:
+                for book_data in json.load(f):
+                    metadata[book_data["content_filename"]] = book_data
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error("Error al leer el catálogo %s: %s", self.catalog_file, e)
+
+        catalog_name = os.path.basename(self.catalog_file)
+        for sidecar_name in sidecar_files:
+            if sidecar_name == catalog_name:
+                continue
+            book_filename = os.path.splitext(sidecar_name)[0] + ".txt"
+            try:
+                with open(os.path.join(self.books_directory, sidecar_name), 'r', encoding='utf-8') as f:
+                    book_data = json.load(f)
+                metadata[book_filename] = {**metadata.get(book_filename, {}), **book_data,
+                                           "content_filename": book_filename}
+            except ValueError as e:
+                logger.error("Error al leer los metadatos %s: %s", sidecar_name, e)
+
+        return {filename: book_data for filename, book_data in metadata.items()
+                if all(k in book_data for k in ("title", "author", "min_age", "max_age"))}
+
+    def _compute_manifest(self, book_files, quiz_files, sidecar_files):
+        entries = [["text_stats_version", TEXT_STATS_VERSION]]
+        for kind, files in (("book", book_files), ("quiz", quiz_files), ("meta", sidecar_files)):
+            for filename, stat in files.items():
+                entries.append([kind, filename, stat.st_size, stat.st_mtime_ns])
+        entries.sort()
+        return hashlib.sha256(json.dumps(entries, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+    def _quiz_book_path(self, quiz_filename):
+        # El cuestionario de un libro se llama como su archivo de texto, con extensión .json
+        return self._relative_path("book", os.path.splitext(quiz_filename)[0] + ".txt")
+
+    @staticmethod
+    def _relative_path(kind, filename):
+        # Misma forma de ruta que se guarda en books.content_path (ver AtlasRead.spec)
+        if kind == "book":
+            return os.path.join("src", "books_content", filename)
+        return os.path.join("src", "quizzes", filename)
@@ -0,0 +1,261 @@
+# src/instrumentation.py
+
+import atexit
+import collections
+import contextlib
+import functools
+import logging
+import math
+import sys
+import threading
+import time
+import types
+
+from src.config import LOG_LEVEL, PROFILE_MODE, PROFILE_OUTPUT_FILE
+
+PROFILE_MODES = ("", "report", "cprofile")
+
+logger = logging.getLogger(__name__)
+
+# Histogramas logarítmicos: 8 cubetas por cada potencia de 2 a partir de 1 µs, así que un percentil
+# tiene como mucho ~9 % de error y cada métrica ocupa memoria fija sin importar cuántas llamadas haya.
+_BUCKETS_PER_OCTAVE = 8
+_MIN_SECONDS = 1e-6
+
+_enabled = False
+_mode = ""
+_output_file = PROFILE_OUTPUT_FILE
+_lock = threading.Lock()
+_histograms = {}
+_counters = collections.Counter()
+_gauges = {}  # nombre -> función sin argumentos que devuelve un dict; se consulta al generar el informe
+_profiles = []  # Un cProfile.Profile por hilo (modo "cprofile")
+_thread_state = threading.local()
+_NULL_TIMER = contextlib.nullcontext()
+
+
+class Histogram:
+    """Cantidad, total, mínimo, máximo y percentiles aproximados de una serie de duraciones (segundos)."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self._buckets = collections.Counter()
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        if seconds <= _MIN_SECONDS:
+            index = 0
+        else:
+            index = int(math.log2(seconds / _MIN_SECONDS) * _BUCKETS_PER_OCTAVE) + 1
+        self._buckets[index] += 1
+
+    def percentile(self, percent):
+        """Límite superior de la cubeta que contiene el percentil (acotado por el mínimo y el máximo)."""
+        if not self.count:
+            return None
+        rank = math.ceil(self.count * percent / 100)
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= rank:
+                upper = _MIN_SECONDS * 2 ** (index / _BUCKETS_PER_OCTAVE)
+                return min(max(upper, self.min), self.max)
+        return self.max
+
+
+# --- Configuración ---
+def configure(profile_mode=PROFILE_MODE, log_level=LOG_LEVEL, output_file=PROFILE_OUTPUT_FILE):
+    """
+    Configura el logging y el perfilado. Debe llamarse antes de importar los módulos instrumentados
+    (database, logic, gui): con el perfilado desactivado los decoradores devuelven la función original
+    y la instrumentación no cuesta nada.
+
+    profile_mode: "" (desactivado), "report" (tiempos y contadores en <output_file>.txt al salir) o
+    "cprofile" (además, estadísticas de cProfile de todos los hilos en <output_file>.prof).
+    """
+    global _enabled, _mode, _output_file
+    logging.basicConfig(level=log_level.upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    if profile_mode not in PROFILE_MODES:
+        raise ValueError(f"Modo de perfilado desconocido: {profile_mode!r} (válidos: report, cprofile)")
+    if not profile_mode or _enabled:
+        return
+    _enabled = True
+    _mode = profile_mode
+    _output_file = output_file
+    if _mode == "cprofile":
+        _thread_profile().enable()  # Hilo principal; los hilos de fondo usan profiled()
+    atexit.register(write_outputs)
+    logger.info("Perfilado activado (%s); resultados en %s.*", _mode, _output_file)
+
+
+def is_enabled():
+    return _enabled
+
+
+# --- Métricas ---
+def record(name, seconds):
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.add(seconds)
+
+
+def record_since(name, start):
+    """Registra el tiempo desde start (time.perf_counter()): para operaciones que terminan en un callback."""
+    if _enabled and start is not None:
+        record(name, time.perf_counter() - start)
+
+
+def increment(name, amount=1):
+    if _enabled:
+        with _lock:
+            _counters[name] += amount
+
+
+def register_gauge(name, read_values):
+    """read_values() devuelve un dict con valores que se incluyen en el informe (p. ej. estadísticas de caché)."""
+    if _enabled:
+        _gauges[name] = read_values
+
+
+class _Timer:
+    __slots__ = ("name", "_start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.name, time.perf_counter() - self._start)
+        return False
+
+
+def timer(name):
+    """Context manager que mide el bloque. Desactivado, devuelve un contexto vacío compartido."""
+    return _Timer(name) if _enabled else _NULL_TIMER
+
+
+def timed(name):
+    """Decorador que mide cada llamada. Desactivado, devuelve la función sin envolver."""
+    def decorator(fn):
+        if not _enabled:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def instrument_methods(prefix):
+    """Decorador de clase: mide todos los métodos públicos como "<prefix>.<método>"."""
+    def decorator(cls):
+        if not _enabled:
+            return cls
+        for attr_name, value in list(vars(cls).items()):
+            if not attr_name.startswith("_") and isinstance(value, types.FunctionType):
+                setattr(cls, attr_name, timed(f"{prefix}.{attr_name}")(value))
+        return cls
+    return decorator
+
+
+def instrument_connection(conn):
+    """Cuenta sentencias SQL ejecutadas y filas devueltas por la conexión (solo con el perfilado activo)."""
+    if not _enabled:
+        return
+    conn.set_trace_callback(lambda statement: increment("sql.statements"))
+    row_factory = conn.row_factory or (lambda cursor, row: row)
+
+    def counting_row_factory(cursor, row):
+        increment("sql.rows")
+        return row_factory(cursor, row)
+    conn.row_factory = counting_row_factory
+
+
+# --- cProfile ---
+def _thread_profile():
+    profile = getattr(_thread_state, "profile", None)
+    if profile is None:
+        import cProfile
+        profile = cProfile.Profile()
+        _thread_state.profile = profile
+        with _lock:
+            _profiles.append(profile)
+    return profile
+
+
+def profiled(fn):
+    """Envuelve una tarea de un hilo de fondo para que cProfile la incluya (solo en modo "cprofile")."""
+    if _mode != "cprofile":
+        return fn
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        profile = _thread_profile()
+        profile.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.disable()
+    return wrapper
+
+
+# --- Informe ---
+def report():
+    """Texto con los percentiles de cada métrica, los contadores y los valores registrados."""
+    def ms(seconds):
+        return f"{seconds * 1000:10.2f}"
+
+    with _lock:
+        histograms = sorted(_histograms.items(), key=lambda item: item[1].total, reverse=True)
+        lines = [f"{'Métrica':<44} {'n':>7} {'total ms':>10} {'p50 ms':>10} {'p95 ms':>10} "
+                 f"{'p99 ms':>10} {'máx ms':>10}"]
+        for name, histogram in histograms:
+            lines.append(f"{name:<44} {histogram.count:>7} {ms(histogram.total)} "
+                         f"{ms(histogram.percentile(50))} {ms(histogram.percentile(95))} "
+                         f"{ms(histogram.percentile(99))} {ms(histogram.max)}")
+        if _counters:
+            lines.append("\nContadores:")
+            lines.extend(f"  {name:<42} {value:>10}" for name, value in sorted(_counters.items()))
+    for name, read_values in sorted(_gauges.items()):
+        values = ", ".join(f"{key}={value}" for key, value in read_values().items())
+        lines.append(f"\n{name}: {values}")
+    return "\n".join(lines)
+
+
+def write_outputs():
+    """Escribe el informe (y las estadísticas de cProfile). Se registra con atexit al activar el perfilado."""
+    if not _enabled:
+        return
+    text = report()
+    with open(_output_file + ".txt", "w", encoding="utf-8") as f:
+        f.write(text + "\n")
+    if sys.stderr is not None:  # En el ejecutable sin consola no hay stderr
+        sys.stderr.write(text + "\n")
+
+    if _mode == "cprofile":
+        import pstats
+        _thread_profile().disable()
+        with _lock:
+            profiles = list(_profiles)
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(_output_file + ".prof")
+        logger.warning("Estadísticas de cProfile guardadas en %s.prof (ver con python -m pstats)", _output_file)
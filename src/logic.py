@@ -1,95 +1,80 @@
 # src/logic.py
 
 import os
-import json
-from src.config import WPM_EXPECTED, BOOKS_DIRECTORY, QUIZZES_DIRECTORY
+import logging
+from src.config import BOOKS_DIRECTORY
+from src.content_cache import shared_content_cache
+from src.book_pager import BookPager
+from src.scoring_model import default_scoring_model
+from src.quiz_bundle import answer_key, answers_in_order, score_answers
+from src.quiz_analytics import grade_answers
+from src.instrumentation import instrument_methods, register_gauge
 
+logger = logging.getLogger(__name__)
 
+
+@instrument_methods("logic")
 class AppLogic:
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, content_cache=None, scoring_model=None, books_directory=BOOKS_DIRECTORY):
         self.db_manager = db_manager
-
-    def get_recommended_books(self, age):
-        return self.db_manager.get_recommended_books(age)
-
-    def read_book_content(self, relative_path_from_project_root):
-        # relative_path_from_project_root es la ruta almacenada en la DB (ej. "src/books_content/patito_feo.txt")
-        # BOOKS_DIRECTORY ya es la ruta ABSOLUTA base para tus libros.
-        # Entonces, solo necesitas obtener el nombre del archivo y unirlo a BOOKS_DIRECTORY.
+        # Directorio de libros (otro distinto del de config.py, p. ej. en los benchmarks)
+        self.books_directory = books_directory
+        # Caché LRU compartida: volver a abrir un libro no vuelve a leer del disco las páginas ya vistas
+        self.content_cache = content_cache or shared_content_cache
+        # Rangos de WPM por edad ya compilados (los mismos que usa el cálculo por lotes)
+        self.scoring_model = scoring_model or default_scoring_model
+        register_gauge("content_cache", self.content_cache.stats)  # Aciertos/fallos en el informe de perfilado
+
+    def get_recommended_books(self, age, user_id=None):
+        """Libros para la edad, de más a menos recomendado para el usuario (legibilidad y popularidad)."""
+        return self.db_manager.recommender.recommend(age, user_id)
+
+    def open_book_pager(self, relative_path_from_project_root):
+        """
+        Abre el libro para leerlo por páginas. Las páginas ya leídas en otra apertura salen de la caché
+        de contenido. Devuelve None si no está disponible.
+        """
+        # relative_path_from_project_root es la ruta almacenada en la DB (ej. "src/books_content/patito_feo.txt");
+        # self.books_directory (por defecto BOOKS_DIRECTORY) ya es la ruta ABSOLUTA base de los libros.
         filename = os.path.basename(relative_path_from_project_root)
-        full_path = os.path.join(BOOKS_DIRECTORY, filename)
-
-        if not os.path.exists(full_path):
-            print(f"Error: El archivo de contenido no fue encontrado en: {full_path}")
-            return "Contenido del libro no disponible."
-        try:
-            with open(full_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except Exception as e:
-            print(f"Error al leer el archivo {full_path}: {e}")
-            return "Error al cargar el contenido del libro."
-
-    def load_quiz_for_book(self, book_id):
-        """Carga el cuestionario para un libro dado su ID."""
-        book_info = self.db_manager.get_book_info(book_id)
-        if not book_info:
-            return None
-
-        content_filename = os.path.basename(book_info['content_path'])  # Obtener solo el nombre del archivo del libro
-        quiz_filename = os.path.splitext(content_filename)[0] + ".json"  # Construir el nombre del archivo del quiz
-
-        # QUIZZES_DIRECTORY ya es la ruta ABSOLUTA base para tus quizzes
-        full_quiz_path = os.path.join(QUIZZES_DIRECTORY, quiz_filename)
-
-        if not os.path.exists(full_quiz_path):
-            print(f"No se encontró cuestionario para {book_info['title']} en {full_quiz_path}")
-            return None
+        full_path = os.path.join(self.books_directory, filename)
         try:
-            with open(full_quiz_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except json.JSONDecodeError as e:
-            print(f"Error al decodificar JSON del quiz {full_quiz_path}: {e}")
+            return BookPager(full_path, content_cache=self.content_cache)
+        except FileNotFoundError:
+            logger.error("El archivo de contenido no fue encontrado en: %s", full_path)
             return None
         except Exception as e:
-            print(f"Error al cargar el quiz {full_quiz_path}: {e}")
+            logger.error("Error al abrir el archivo %s: %s", full_path, e)
             return None
 
-    def calculate_reading_stats(self, user_age, book_word_count, duration_seconds):
-        if duration_seconds == 0:
-            actual_wpm = 0
-        else:
-            actual_wpm = (book_word_count / duration_seconds) * 60
-
-        expected_wpm_range = WPM_EXPECTED.get(user_age)
-        if not expected_wpm_range:
-            expected_wpm_range = WPM_EXPECTED.get('default')
-
-        min_wpm, max_wpm = expected_wpm_range
-
-        if actual_wpm >= min_wpm and actual_wpm <= max_wpm:
-            age_appropriateness_score = 100.0
-            performance_rating = "Normal"
-        elif actual_wpm < min_wpm:
-            age_appropriateness_score = max(0, (actual_wpm / min_wpm) * 100)
-            performance_rating = "Necesita mejorar (Lento)"
-        else:  # actual_wpm > max_wpm
-            if actual_wpm > max_wpm * 1.2:
-                age_appropriateness_score = 100.0 - ((actual_wpm - max_wpm) / max_wpm) * 20
-                performance_rating = "Rápido"
-            else:
-                age_appropriateness_score = 100.0
-                performance_rating = "Rápido"
-        return actual_wpm, age_appropriateness_score, performance_rating
+    def load_quiz_for_book(self, book_id):
+        """
+        Carga el cuestionario para un libro dado su ID. El indexador ya lo compiló en la base de datos
+        (src/quiz_bundle.py), así que es una sola consulta sin leer ni decodificar el JSON.
+        """
+        quiz_data = self.db_manager.get_quiz(book_id)
+        if quiz_data is None:
+            logger.warning("No se encontró cuestionario para el libro %s", book_id)
+        return quiz_data
+
+    def calculate_reading_stats(self, user_age, book_word_count, duration_seconds, readability=None):
+        """
+        Devuelve (wpm, puntuación de adecuación a la edad, calificación) de una sesión.
+        readability es el índice de Fernández-Huerta del libro (books.readability_fh), si se conoce.
+        """
+        return self.scoring_model.score(user_age, book_word_count, duration_seconds, readability)
 
     def evaluate_quiz(self, quiz_data, user_answers):
-        correct_count = 0
+        """
+        user_answers: opciones elegidas (enteros 1..n, 0 = sin responder) en el orden de las preguntas,
+        o el formato anterior {id de pregunta: opción}.
+        """
+        if isinstance(user_answers, dict):
+            user_answers = answers_in_order(quiz_data, user_answers)
+        correct_count = score_answers(answer_key(quiz_data), user_answers)
         total_questions = len(quiz_data['questions'])
+        return correct_count, total_questions
 
-        for q in quiz_data['questions']:
-            question_id = str(q['id'])
-            correct_answer_id = str(q['correct_answer'])
-
-            if question_id in user_answers:
-                if str(user_answers[question_id]) == correct_answer_id:
-                    correct_count += 1
-        return correct_count, total_questions
\ No newline at end of file
+    def grade_quiz_answers(self, quiz_data, user_answers):
+        """Pares (opción elegida, acierto 0/1) de cada pregunta, para guardarlos con la sesión."""
+        return grade_answers(answer_key(quiz_data), user_answers)
\ No newline at end of file
@@ -1,17 +1,35 @@
 # src/main.py
 
-from src.gui import AtlasReadApp
-from src.database import DatabaseManager
-from src.logic import AppLogic
-import os
+import argparse
+import multiprocessing
+
+from src import instrumentation
+from src.config import LOG_LEVEL, PROFILE_MODE, PROFILE_OUTPUT_FILE
 
 if __name__ == "__main__":
-    # Inicializar el manejador de la base de datos
-    db_manager = DatabaseManager()
+    # Necesario para que el pool de procesos del indexador funcione en el ejecutable de PyInstaller
+    multiprocessing.freeze_support()
+
+    parser = argparse.ArgumentParser(description="AtlasRead")
+    parser.add_argument("--log-level", default=LOG_LEVEL, help="DEBUG, INFO, WARNING o ERROR")
+    parser.add_argument("--profile", choices=("report", "cprofile"), default=PROFILE_MODE or None,
+                        help="medir tiempos (report) y además perfilar con cProfile (cprofile) hasta salir")
+    parser.add_argument("--profile-file", default=PROFILE_OUTPUT_FILE,
+                        help="ruta sin extensión del informe (.txt) y de las estadísticas de cProfile (.prof)")
+    args = parser.parse_args()
+    instrumentation.configure(args.profile or "", args.log_level, args.profile_file)
+
+    # Se importan después de configure(): los decoradores de instrumentación se aplican al importarlos
+    from src.gui import AtlasReadApp
+    from src.database import DatabaseManager
+    from src.logic import AppLogic
+
+    # Inicializar el manejador de la base de datos; el catálogo se verifica cuando la ventana ya está visible
+    db_manager = DatabaseManager(defer_catalog=True)
 
     # Inicializar la lógica de la aplicación
     app_logic = AppLogic(db_manager)
 
     # Crear y ejecutar la aplicación GUI
     app = AtlasReadApp(db_manager, app_logic)
-    app.mainloop()
\ No newline at end of file
+    app.mainloop()
@@ -0,0 +1,330 @@
+# src/merge.py
+
+import logging
+import os
+import sqlite3
+import time
+
+from src.config import MERGE_MAX_WORKERS
+
+logger = logging.getLogger(__name__)
+
+# Columnas de una sesión que se copian tal cual (user_id y book_id se traducen a los de la central)
+_SESSION_COLUMNS = ("start_time", "end_time", "duration_seconds", "wpm", "age_appropriateness_score",
+                    "performance_rating", "quiz_score")
+# content_path es relativo pero usa el separador del sistema del kiosco; se compara siempre con "/"
+_NORMALIZED_PATH = "replace({}, '\\', '/')"
+
+
+def assign_database_id(conn):
+    """
+    Paso de migración: identificador estable de esta base en app_metadata ("database_id"). Con él la
+    central reconoce un kiosco en cada consolidación aunque cambie el nombre del archivo copiado.
+    No copiar la base de un kiosco a otro: ambos quedarían con el mismo identificador.
+    """
+    import uuid  # Solo se usa una vez por base; no se carga en cada arranque de la aplicación
+
+    conn.execute("INSERT INTO app_metadata (key, value) VALUES ('database_id', ?) ON CONFLICT(key) DO NOTHING",
+                 (uuid.uuid4().hex,))
+
+
+def create_merge_tables(conn):
+    """
+    Paso de migración: correspondencia entre los IDs de cada kiosco (source) y los de la central, para
+    que volver a consolidar la misma base no duplique usuarios ni sesiones.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS merge_sources (
+            source TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            merged_at TEXT NOT NULL,
+            users INTEGER NOT NULL,
+            sessions INTEGER NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS merge_user_ids (
+            source TEXT NOT NULL,
+            source_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            PRIMARY KEY (source, source_id)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS merge_session_ids (
+            source TEXT NOT NULL,
+            source_id INTEGER NOT NULL,
+            session_id INTEGER NOT NULL,
+            PRIMARY KEY (source, source_id)
+        ) WITHOUT ROWID
+    """)
+
+
+# --- Preparación (en paralelo, un proceso por base) ---
+def _source_key(conn, path):
+    has_metadata = conn.execute(
+        "SELECT 1 FROM src.sqlite_master WHERE type = 'table' AND name = 'app_metadata'"
+    ).fetchone()
+    row = conn.execute(
+        "SELECT value FROM src.app_metadata WHERE key = 'database_id'"
+    ).fetchone() if has_metadata else None
+    if row:
+        return row[0]
+    # Bases anteriores a la migración 7: se identifican por el nombre del archivo
+    logger.warning("%s no tiene database_id; se identifica por el nombre del archivo", path)
+    return "archivo:" + os.path.splitext(os.path.basename(path))[0]
+
+
+def stage_source(source_path, staging_path):
+    """
+    Copia la base de un kiosco (abierta solo lectura) a una base de preparación con forma fija: IDs
+    originales, libros por content_path normalizado y respuestas por sesión. Comprueba antes la
+    integridad del archivo para que una copia dañada no llegue a la central.
+    Devuelve {"path", "staging_path", "source", "users", "sessions", "responses"}.
+    """
+    import pathlib
+
+    if os.path.exists(staging_path):
+        os.remove(staging_path)
+    conn = sqlite3.connect(pathlib.Path(staging_path).absolute().as_uri(), uri=True)
+    try:
+        # Archivo temporal: sin diario ni fsync
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("ATTACH DATABASE ? AS src", (pathlib.Path(source_path).absolute().as_uri() + "?mode=ro",))
+        problem = conn.execute("PRAGMA src.quick_check").fetchone()[0]
+        if problem != "ok":
+            raise sqlite3.DatabaseError(f"Base dañada: {problem}")
+        source = _source_key(conn, source_path)
+
+        conn.execute("BEGIN")
+        conn.execute("CREATE TABLE users (source_id INTEGER PRIMARY KEY, age INTEGER NOT NULL)")
+        conn.execute("INSERT INTO users (source_id, age) SELECT id, age FROM src.users ORDER BY id")
+        conn.execute(f"""CREATE TABLE sessions (source_id INTEGER PRIMARY KEY, user_source_id INTEGER NOT NULL,
+                                                content_path TEXT NOT NULL, {', '.join(_SESSION_COLUMNS)})""")
+        conn.execute(f"""INSERT INTO sessions
+                         SELECT rs.id, rs.user_id, {_NORMALIZED_PATH.format('b.content_path')},
+                                {', '.join('rs.' + column for column in _SESSION_COLUMNS)}
+                         FROM src.reading_sessions rs
+                         JOIN src.books b ON b.id = rs.book_id
+                         ORDER BY rs.id""")
+        conn.execute("""CREATE TABLE responses (session_source_id INTEGER NOT NULL, position INTEGER NOT NULL,
+                                                answer INTEGER NOT NULL, correct INTEGER NOT NULL, quiz_hash INTEGER,
+                                                PRIMARY KEY (session_source_id, position)) WITHOUT ROWID""")
+        if conn.execute("SELECT 1 FROM src.sqlite_master WHERE type = 'table' AND name = 'quiz_responses'").fetchone():
+            # Bases anteriores a la migración 8 no guardan la huella: se toma la del cuestionario de la central
+            has_hash = any(row[1] == "quiz_hash" for row in conn.execute("PRAGMA src.table_info(quiz_responses)"))
+            conn.execute(f"""INSERT INTO responses SELECT session_id, position, answer, correct,
+                                                          {'quiz_hash' if has_hash else 'NULL'}
+                             FROM src.quiz_responses ORDER BY session_id, position""")
+        conn.commit()
+
+        counts = [conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                  for table in ("users", "sessions", "responses")]
+    finally:
+        conn.close()
+    return {"path": source_path, "staging_path": staging_path, "source": source,
+            "users": counts[0], "sessions": counts[1], "responses": counts[2]}
+
+
+def _stage_source_in_worker(task):
+    # Un kiosco con la base dañada o ilegible no detiene la consolidación de los demás
+    source_path, staging_path = task
+    try:
+        return stage_source(source_path, staging_path)
+    except (sqlite3.Error, OSError) as e:
+        return {"path": source_path, "staging_path": staging_path, "error": str(e)}
+
+
+# --- Consolidación final (un kiosco por transacción) ---
+_MAP_NEW_USERS_SQL = """
+    INSERT INTO merge_user_ids (source, source_id, user_id)
+    SELECT :source, u.source_id, :user_base + ROW_NUMBER() OVER (ORDER BY u.source_id)
+    FROM stage.users u
+    WHERE NOT EXISTS (SELECT 1 FROM merge_user_ids m WHERE m.source = :source AND m.source_id = u.source_id)
+"""
+_INSERT_USERS_SQL = """
+    INSERT INTO users (id, age)
+    SELECT m.user_id, u.age
+    FROM merge_user_ids m
+    JOIN stage.users u ON u.source_id = m.source_id
+    WHERE m.source = :source AND m.user_id > :user_base
+    ORDER BY m.user_id
+"""
+_UPDATE_USERS_SQL = """
+    UPDATE users SET age = u.age
+    FROM merge_user_ids m
+    JOIN stage.users u ON u.source_id = m.source_id
+    WHERE m.source = :source AND users.id = m.user_id AND users.age IS NOT u.age
+"""
+# Solo se asigna ID a las sesiones cuyo usuario y libro existen en la central; las de un libro que la
+# central aún no tiene se cuentan como omitidas y entran en una consolidación posterior
+_MAP_NEW_SESSIONS_SQL = """
+    INSERT INTO merge_session_ids (source, source_id, session_id)
+    SELECT :source, s.source_id, :session_base + ROW_NUMBER() OVER (ORDER BY s.source_id)
+    FROM stage.sessions s
+    JOIN merge_user_ids mu ON mu.source = :source AND mu.source_id = s.user_source_id
+    JOIN temp.merge_books b ON b.content_path = s.content_path
+    WHERE NOT EXISTS (SELECT 1 FROM merge_session_ids m WHERE m.source = :source AND m.source_id = s.source_id)
+"""
+_INSERT_SESSIONS_SQL = f"""
+    INSERT INTO reading_sessions (id, user_id, book_id, {', '.join(_SESSION_COLUMNS)})
+    SELECT m.session_id, mu.user_id, b.book_id, {', '.join('s.' + column for column in _SESSION_COLUMNS)}
+    FROM merge_session_ids m
+    JOIN stage.sessions s ON s.source_id = m.source_id
+    JOIN merge_user_ids mu ON mu.source = :source AND mu.source_id = s.user_source_id
+    JOIN temp.merge_books b ON b.content_path = s.content_path
+    WHERE m.source = :source AND m.session_id > :session_base
+    ORDER BY m.session_id
+"""
+# Sesiones ya consolidadas que cambiaron en el kiosco (p. ej. se terminaron después de la copia
+# anterior); los triggers de user_stats/book_stats restan el aporte anterior y suman el nuevo
+_UPDATE_SESSIONS_SQL = f"""
+    UPDATE reading_sessions SET {', '.join(f'{column} = s.{column}' for column in _SESSION_COLUMNS)}
+    FROM merge_session_ids m
+    JOIN stage.sessions s ON s.source_id = m.source_id
+    WHERE m.source = :source AND reading_sessions.id = m.session_id AND m.session_id <= :session_base
+      AND ({' OR '.join(f'reading_sessions.{column} IS NOT s.{column}' for column in _SESSION_COLUMNS)})
+"""
+# WHERE true: con ON CONFLICT, SQLite exige un WHERE en el SELECT para distinguirlo del ON de un JOIN
+_INSERT_RESPONSES_SQL = """
+    INSERT INTO quiz_responses (book_id, position, session_id, answer, correct, quiz_hash)
+    SELECT rs.book_id, r.position, m.session_id, r.answer, r.correct,
+           COALESCE(r.quiz_hash, (SELECT q.quiz_hash FROM quizzes q WHERE q.book_id = rs.book_id))
+    FROM stage.responses r
+    JOIN merge_session_ids m ON m.source = :source AND m.source_id = r.session_source_id
+    JOIN reading_sessions rs ON rs.id = m.session_id
+    WHERE true
+    ON CONFLICT DO NOTHING
+"""
+
+
+def _next_id_base(conn, table):
+    """Mayor ID usado en la tabla (incluidos los de filas borradas, por AUTOINCREMENT)."""
+    max_id = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+    return max(max_id, row[0] if row else 0)
+
+
+def _merge_staged(conn, staged, own_id, staging_path):
+    """Vuelca una base de preparación en la central en una sola transacción. Devuelve sus contadores."""
+    source = staged["source"]
+    if source == own_id:
+        raise ValueError(f"{staged['path']} es la propia base central")
+    started = time.perf_counter()
+    conn.execute("ATTACH DATABASE ? AS stage", (staging_path,))
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            params = {"source": source, "user_base": _next_id_base(conn, "users"),
+                      "session_base": _next_id_base(conn, "reading_sessions")}
+            conn.execute(_MAP_NEW_USERS_SQL, params)
+            users_added = conn.execute(_INSERT_USERS_SQL, params).rowcount
+            users_updated = conn.execute(_UPDATE_USERS_SQL, params).rowcount
+            conn.execute(_MAP_NEW_SESSIONS_SQL, params)
+            sessions_added = conn.execute(_INSERT_SESSIONS_SQL, params).rowcount
+            sessions_updated = conn.execute(_UPDATE_SESSIONS_SQL, params).rowcount
+            responses_added = conn.execute(_INSERT_RESPONSES_SQL, params).rowcount
+            users_total, sessions_total = (
+                conn.execute(f"SELECT COUNT(*) FROM {table} WHERE source = ?", (source,)).fetchone()[0]
+                for table in ("merge_user_ids", "merge_session_ids")
+            )
+            conn.execute(
+                """INSERT INTO merge_sources (source, path, merged_at, users, sessions)
+                   VALUES (?, ?, datetime('now'), ?, ?)
+                   ON CONFLICT(source) DO UPDATE SET
+                       path = excluded.path, merged_at = excluded.merged_at,
+                       users = excluded.users, sessions = excluded.sessions""",
+                (source, staged["path"], users_total, sessions_total)
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    finally:
+        conn.execute("DETACH DATABASE stage")
+    return {"path": staged["path"], "source": source, "users_added": users_added, "users_updated": users_updated,
+            "sessions_added": sessions_added, "sessions_updated": sessions_updated,
+            "sessions_skipped": staged["sessions"] - sessions_total, "responses_added": responses_added,
+            "seconds": time.perf_counter() - started}
+
+
+def merge_databases(db_manager, source_paths, max_workers=MERGE_MAX_WORKERS, staging_directory=None):
+    """
+    Consolida en la base de db_manager las bases de varios kioscos. Cada una se prepara en paralelo
+    (stage_source, en un pool de procesos) y se vuelca en la central en su propia transacción, en el
+    orden de source_paths, mientras se preparan las siguientes. Los usuarios y sesiones reciben IDs
+    nuevos y se recuerda su origen, así que consolidar otra vez las mismas bases solo agrega lo nuevo.
+    Un kiosco que falla se registra y no detiene a los demás.
+
+    Devuelve {"sources": [resultado de cada base, o {"path", "error"}], "seconds"}.
+    """
+    # Se importan aquí: este módulo lo carga la aplicación al arrancar (pasos de la migración 7)
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor
+
+    started = time.perf_counter()
+    db_manager.flush_sessions()
+    conn = db_manager._get_connection()
+    own_id = db_manager._get_metadata("database_id")
+    conn.execute("""CREATE TEMP TABLE IF NOT EXISTS merge_books (content_path TEXT PRIMARY KEY,
+                                                                  book_id INTEGER NOT NULL) WITHOUT ROWID""")
+    results = []
+    try:
+        conn.execute("DELETE FROM temp.merge_books")
+        conn.execute(f"INSERT OR IGNORE INTO temp.merge_books SELECT {_NORMALIZED_PATH.format('content_path')}, id "
+                     "FROM books")
+        conn.commit()
+
+        with tempfile.TemporaryDirectory(prefix="atlasread-merge-", dir=staging_directory) as tmp_dir:
+            tasks = [(path, os.path.join(tmp_dir, f"{i:05d}.db")) for i, path in enumerate(source_paths)]
+            if len(tasks) <= 1 or max_workers == 1:
+                # Una sola base: arrancar procesos tardaría más que prepararla aquí
+                executor = None
+                staged_results = map(_stage_source_in_worker, tasks)
+            else:
+                executor = ProcessPoolExecutor(max_workers=max_workers)
+                staged_results = executor.map(_stage_source_in_worker, tasks)
+            try:
+                for staged in staged_results:
+                    staging_path = staged.pop("staging_path")
+                    if "error" not in staged:
+                        try:
+                            staged = _merge_staged(conn, staged, own_id, staging_path)
+                        except (sqlite3.Error, ValueError) as e:
+                            staged = {"path": staged["path"], "error": str(e)}
+                    if os.path.exists(staging_path):
+                        os.remove(staging_path)  # El disco usado no crece con el número de kioscos
+                    if "error" in staged:
+                        logger.error("No se pudo consolidar %s: %s", staged["path"], staged["error"])
+                    else:
+                        logger.info("Consolidado %s: %d usuarios y %d sesiones nuevos", staged["path"],
+                                    staged["users_added"], staged["sessions_added"])
+                    results.append(staged)
+            finally:
+                if executor is not None:
+                    executor.shutdown(cancel_futures=True)
+    finally:
+        conn.execute("DROP TABLE IF EXISTS temp.merge_books")
+
+    db_manager.notify_tables_changed(("users", "reading_sessions"))
+    return {"sources": results, "seconds": time.perf_counter() - started}
+
+
+def source_files(paths):
+    """Rutas indicadas; de un directorio se toman sus archivos .db."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith(".db"))
+        else:
+            files.append(path)
+    return files
+
+
+if __name__ == "__main__":
+    # python -m src.merge <kiosco.db | directorio> [...] [--workers N] : igual que python -m src.cli merge
+    import sys
+    from src.cli import main
+
+    sys.exit(main(["merge"] + sys.argv[1:]))
@@ -0,0 +1,122 @@
+# src/migrations.py
+
+import logging
+import sqlite3
+
+from src.aggregates import create_aggregate_schema
+from src.merge import assign_database_id, create_merge_tables
+from src.quiz_bundle import create_quiz_tables, add_quiz_hash_columns
+from src.quiz_analytics import create_quiz_responses_table
+
+logger = logging.getLogger(__name__)
+
+
+def create_books_fts(conn):
+    """
+    Tabla FTS5 con título, autor y texto de cada libro (rowid = books.id); la llena el indexador.
+    remove_diacritics 2: "cancion" encuentra "canción". Si este SQLite no trae FTS5, la búsqueda
+    usa LIKE sobre título y autor (ver DatabaseManager.search_books).
+    """
+    try:
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5(
+                title, author, body,
+                tokenize = 'unicode61 remove_diacritics 2'
+            )
+        """)
+        # Relevancia por defecto ("ORDER BY rank"): el título pesa más que el autor y este más que el texto.
+        # Ordenar por rank permite a FTS5 generar los fragmentos solo de las filas devueltas.
+        conn.execute("INSERT INTO books_fts (books_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 1.0)')")
+    except sqlite3.OperationalError as e:
+        logger.warning("SQLite sin FTS5, la búsqueda será solo por título y autor (%s)", e)
+
+
+# Migraciones del esquema, en orden. Cada una es (versión, descripción, pasos), donde cada paso
+# es una sentencia SQL o una función que recibe la conexión. Nunca modificar una migración ya
+# publicada: los cambios nuevos van en una migración nueva al final de la lista.
+MIGRATIONS = [
+    (1, "Índices para estadísticas por usuario, sesiones por libro y recomendaciones por edad", [
+        # Cubre get_user_reading_stats(_page) y get_user_reading_summary sin leer la tabla:
+        # filtra por user_id, ya viene ordenado por (start_time, id) y contiene las columnas consultadas.
+        """CREATE INDEX IF NOT EXISTS idx_reading_sessions_user_start
+           ON reading_sessions (user_id, start_time, id, book_id, end_time, duration_seconds, wpm,
+                                performance_rating, quiz_score)""",
+        "CREATE INDEX IF NOT EXISTS idx_reading_sessions_book ON reading_sessions (book_id)",
+        # Rango sobre min_age para `? BETWEEN min_age AND max_age`; max_age y title se filtran/ordenan del índice
+        "CREATE INDEX IF NOT EXISTS idx_books_age ON books (min_age, max_age, title)",
+    ]),
+    (2, "Tablas de totales por usuario y por libro mantenidas por triggers", [
+        create_aggregate_schema,
+    ]),
+    (3, "Estadísticas de texto y legibilidad de cada libro", [
+        # Las calcula el indexador (src/text_stats.py); como aún no hay "text_stats_version" guardada,
+        # el siguiente refresco del catálogo vuelve a analizar todos los libros
+        "ALTER TABLE books ADD COLUMN sentence_count INTEGER NOT NULL DEFAULT 0",
+        "ALTER TABLE books ADD COLUMN syllable_count INTEGER NOT NULL DEFAULT 0",
+        "ALTER TABLE books ADD COLUMN readability_fh REAL",  # Índice de Fernández-Huerta
+        "ALTER TABLE books ADD COLUMN readability_szigriszt REAL",  # Perspicuidad de Szigriszt-Pazos
+    ]),
+    (4, "Índice de búsqueda de texto completo de los libros (FTS5)", [
+        create_books_fts,
+    ]),
+    (5, "Cuestionarios compilados con clave de respuestas", [
+        # Los llena el indexador; sin "quiz_bundle_version" guardada recompila todos los cuestionarios
+        create_quiz_tables,
+    ]),
+    (6, "Respuestas de los cuestionarios por pregunta", [
+        create_quiz_responses_table,
+    ]),
+    (7, "Identificador de la base y correspondencia de IDs para consolidar kioscos", [
+        assign_database_id,
+        create_merge_tables,
+    ]),
+    (8, "Huella del cuestionario en las respuestas", [
+        add_quiz_hash_columns,
+    ]),
+]
+
+
+def get_schema_version(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+    """)
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def apply_migrations(conn, migrations=MIGRATIONS):
+    """Aplica, cada una en su propia transacción, las migraciones pendientes. Devuelve la versión final."""
+    current_version = get_schema_version(conn)
+    conn.commit()
+
+    for version, description, steps in migrations:
+        if version <= current_version:
+            continue
+        # BEGIN explícito (sqlite3 no abre transacciones implícitas para sentencias DDL) e IMMEDIATE:
+        # otro proceso que arranca a la vez (la aplicación y la línea de comandos) espera aquí
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            current_version = conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+            if version <= current_version:
+                conn.commit()  # La aplicó el otro proceso mientras se esperaba el bloqueo
+                continue
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute(
+                "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, datetime('now'))",
+                (version, description)
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        logger.info("Migración %s aplicada: %s", version, description)
+        current_version = version
+
+    return current_version
@@ -0,0 +1,162 @@
+# src/quiz_analytics.py
+
+import math
+import threading
+from collections import namedtuple
+
+# Estadísticas de una pregunta del cuestionario de un libro:
+# difficulty: proporción de aciertos (índice de dificultad p; más alto = más fácil)
+# discrimination: correlación punto-biserial entre acertar la pregunta y la puntuación en el resto
+#                 del cuestionario (None si todos aciertan o todos fallan)
+ItemStats = namedtuple("ItemStats", ["position", "question_id", "question", "responses", "difficulty",
+                                     "discrimination", "options"])
+# Frecuencia de cada opción (0 = sin responder) y puntuación media en el resto del cuestionario de
+# quienes la eligieron: un buen distractor atrae sobre todo a quienes puntúan bajo
+OptionStats = namedtuple("OptionStats", ["answer", "text", "count", "frequency", "is_correct", "mean_rest_score"])
+
+# Una sola pasada agregada: por pregunta, opción y acierto, cuántas respuestas y las sumas de la
+# puntuación en el resto del cuestionario (total de la sesión menos esta pregunta) y de su cuadrado
+# del cuestionario; solo cuentan las respuestas a su versión actual (quiz_hash)
+_ITEM_AGGREGATES_SQL = """
+    WITH totals AS (
+        SELECT session_id, SUM(correct) AS score
+        FROM quiz_responses
+        WHERE book_id = :book_id AND quiz_hash = :quiz_hash
+        GROUP BY session_id
+    )
+    SELECT r.position, r.answer, r.correct, COUNT(*) AS n,
+           SUM(t.score - r.correct) AS rest_sum,
+           SUM((t.score - r.correct) * (t.score - r.correct)) AS rest_sq_sum
+    FROM quiz_responses r
+    JOIN totals t ON t.session_id = r.session_id
+    WHERE r.book_id = :book_id AND r.quiz_hash = :quiz_hash
+    GROUP BY r.position, r.answer, r.correct
+"""
+
+
+def create_quiz_responses_table(conn):
+    """
+    Una fila por pregunta respondida. Agrupada por (libro, pregunta) para que el análisis de un
+    libro lea un solo rango; answer es la opción elegida (1..n, 0 = sin responder).
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS quiz_responses (
+            book_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            session_id INTEGER NOT NULL,
+            answer INTEGER NOT NULL,
+            correct INTEGER NOT NULL,
+            PRIMARY KEY (book_id, position, session_id)
+        ) WITHOUT ROWID
+    """)
+
+
+def grade_answers(answer_key, answers):
+    """Pares (opción elegida, acierto 0/1) para guardar en quiz_responses, en el orden de las preguntas."""
+    return [(answer, int(answer == correct)) for correct, answer in zip(answer_key, answers)]
+
+
+def _item_stats(position, question, groups):
+    """groups: [(answer, correct, n, rest_sum, rest_sq_sum)] de una pregunta."""
+    responses = sum(group[2] for group in groups)
+    correct_n = sum(group[2] for group in groups if group[1])
+    rest_sum = sum(group[3] for group in groups)
+    rest_sq_sum = sum(group[4] for group in groups)
+
+    difficulty = correct_n / responses
+    discrimination = None
+    variance = rest_sq_sum / responses - (rest_sum / responses) ** 2
+    if 0 < correct_n < responses and variance > 1e-12:
+        mean_correct = sum(group[3] for group in groups if group[1]) / correct_n
+        mean_incorrect = sum(group[3] for group in groups if not group[1]) / (responses - correct_n)
+        discrimination = ((mean_correct - mean_incorrect) / math.sqrt(variance)
+                          * math.sqrt(difficulty * (1 - difficulty)))
+
+    by_answer = {}
+    for answer, correct, n, answer_rest_sum, _ in groups:
+        count, total, is_correct = by_answer.get(answer, (0, 0, False))
+        by_answer[answer] = (count + n, total + answer_rest_sum, is_correct or bool(correct))
+    texts = question["options"] if question else []
+    # Todas las opciones del cuestionario, aunque nadie las haya elegido, y las respuestas en blanco si las hay
+    answers = sorted(set(range(1, len(texts) + 1)) | by_answer.keys())
+    options = []
+    for answer in answers:
+        count, total, is_correct = by_answer.get(answer, (0, 0, False))
+        if question and 1 <= answer <= len(texts):
+            is_correct = answer == question["correct_answer"]
+        options.append(OptionStats(answer, texts[answer - 1] if 1 <= answer <= len(texts) else None,
+                                   count, count / responses, is_correct, total / count if count else None))
+
+    return ItemStats(position, question["id"] if question else None, question["question"] if question else None,
+                     responses, difficulty, discrimination, options)
+
+
+class QuizAnalytics:
+    """
+    Análisis de las preguntas de los cuestionarios a partir de quiz_responses, solo con las respuestas
+    a la versión actual de cada cuestionario. El resultado de cada libro se guarda en memoria hasta que
+    llegan respuestas nuevas (cambia su quiz_count en book_stats) o cambia el cuestionario.
+    """
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def item_analysis(self, book_id):
+        """
+        ItemStats de cada pregunta del cuestionario del libro, en orden ([] si no hay respuestas a la
+        versión actual del cuestionario o el libro no tiene cuestionario).
+        """
+        self.db_manager.flush_sessions()
+        conn = self.db_manager._get_connection()
+        row = conn.execute(
+            """SELECT q.quiz_hash, s.quiz_count, s.quiz_sum
+               FROM quizzes q LEFT JOIN book_stats s ON s.book_id = q.book_id
+               WHERE q.book_id = ?""",
+            (book_id,)
+        ).fetchone()
+        if row is None:
+            return []
+        stamp = tuple(row)
+        with self._lock:
+            cached = self._cache.get(book_id)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        grouped = {}
+        params = {"book_id": book_id, "quiz_hash": row["quiz_hash"]}
+        for position, answer, correct, n, rest_sum, rest_sq_sum in conn.execute(_ITEM_AGGREGATES_SQL, params):
+            grouped.setdefault(position, []).append((answer, correct, n, rest_sum, rest_sq_sum))
+        quiz = self.db_manager.get_quiz(book_id) if grouped else None
+        questions = quiz["questions"] if quiz else []
+        result = [_item_stats(position, questions[position] if position < len(questions) else None, groups)
+                  for position, groups in sorted(grouped.items())]
+
+        with self._lock:
+            self._cache[book_id] = (stamp, result)
+        return result
+
+    def books_with_responses(self):
+        """IDs de los libros con respuestas guardadas."""
+        self.db_manager.flush_sessions()
+        # Salta de libro en libro por la clave primaria en lugar de leer todas las filas
+        conn = self.db_manager._get_connection()
+        book_ids = []
+        row = conn.execute("SELECT MIN(book_id) FROM quiz_responses").fetchone()
+        while row[0] is not None:
+            book_ids.append(row[0])
+            row = conn.execute("SELECT MIN(book_id) FROM quiz_responses WHERE book_id > ?", (row[0],)).fetchone()
+        return book_ids
+
+    def invalidate(self):
+        with self._lock:
+            self._cache.clear()
+
+
+if __name__ == "__main__":
+    # python -m src.quiz_analytics [book_id ...] : análisis de preguntas (python -m src.cli quiz-analytics)
+    import sys
+    from src.cli import main
+
+    sys.exit(main(["quiz-analytics"] + sys.argv[1:]))
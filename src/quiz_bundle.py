@@ -0,0 +1,161 @@
+# src/quiz_bundle.py
+
+import hashlib
+import json
+import operator
+
+# Versión del formato compilado: subirla obliga al indexador a recompilar todos los cuestionarios
+QUIZ_BUNDLE_VERSION = 1
+
+
+def create_quiz_tables(conn):
+    """
+    quizzes: una fila por libro con la clave de respuestas (un byte por pregunta, opción correcta 1..n).
+    quiz_questions: las preguntas en orden, agrupadas físicamente por libro (clave primaria compuesta).
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS quizzes (
+            book_id INTEGER PRIMARY KEY,
+            title TEXT,
+            question_count INTEGER NOT NULL,
+            answer_key BLOB NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS quiz_questions (
+            book_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            question_id INTEGER NOT NULL,
+            question TEXT NOT NULL,
+            options TEXT NOT NULL,
+            PRIMARY KEY (book_id, position)
+        ) WITHOUT ROWID
+    """)
+
+
+def add_quiz_hash_columns(conn):
+    """
+    quiz_hash (huella de las preguntas, opciones y clave de respuestas) en quizzes y en cada fila de
+    quiz_responses, para analizar solo las respuestas a la versión actual del cuestionario. Las
+    respuestas ya guardadas se asignan al cuestionario que el libro tiene ahora.
+    """
+    conn.execute("ALTER TABLE quizzes ADD COLUMN quiz_hash INTEGER")
+    for book_id, key in conn.execute("SELECT book_id, answer_key FROM quizzes").fetchall():
+        rows = conn.execute("SELECT question_id, question, options FROM quiz_questions WHERE book_id = ? "
+                            "ORDER BY position", (book_id,)).fetchall()
+        conn.execute("UPDATE quizzes SET quiz_hash = ? WHERE book_id = ?",
+                     (quiz_hash([tuple(row) for row in rows], key), book_id))
+    conn.execute("ALTER TABLE quiz_responses ADD COLUMN quiz_hash INTEGER")
+    conn.execute("""UPDATE quiz_responses SET quiz_hash = (SELECT q.quiz_hash FROM quizzes q
+                                                           WHERE q.book_id = quiz_responses.book_id)""")
+
+
+def quiz_hash(rows, answer_key):
+    """
+    Entero de 64 bits que identifica el contenido de un cuestionario compilado: cambia si cambia una
+    pregunta, una opción o la respuesta correcta, y es el mismo en cualquier base con el mismo archivo.
+    """
+    content = json.dumps([[int(question_id), question, options] for question_id, question, options in rows],
+                         ensure_ascii=False, separators=(",", ":"))
+    digest = hashlib.sha256(content.encode("utf-8") + bytes(answer_key)).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+def compile_quiz(data):
+    """
+    Valida un cuestionario tal como está en src/quizzes y lo normaliza:
+    (título, [(id, pregunta, opciones en JSON compacto)], clave de respuestas en bytes).
+    Lanza ValueError si el formato no es válido.
+    """
+    try:
+        questions = data["questions"]
+        rows = []
+        answer_key = bytearray()
+        for question in questions:
+            options = [str(option) for option in question["options"]]
+            correct = int(question["correct_answer"])
+            if not 1 <= correct <= min(len(options), 255):
+                raise ValueError(f"respuesta correcta fuera de rango en la pregunta {question['id']}")
+            rows.append((int(question["id"]), str(question["question"]),
+                         json.dumps(options, ensure_ascii=False, separators=(",", ":"))))
+            answer_key.append(correct)
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"cuestionario con formato inválido: {e!r}") from e
+    return data.get("book_title"), rows, bytes(answer_key)
+
+
+def store_quiz(conn, book_id, compiled):
+    """Reemplaza el cuestionario del libro (dentro de la transacción del llamador)."""
+    title, rows, answer_key = compiled
+    delete_quiz(conn, book_id)
+    conn.execute(
+        "INSERT INTO quizzes (book_id, title, question_count, answer_key, quiz_hash) VALUES (?, ?, ?, ?, ?)",
+        (book_id, title, len(rows), answer_key, quiz_hash(rows, answer_key))
+    )
+    conn.executemany(
+        "INSERT INTO quiz_questions (book_id, position, question_id, question, options) VALUES (?, ?, ?, ?, ?)",
+        [(book_id, position, *row) for position, row in enumerate(rows)]
+    )
+
+
+def delete_quiz(conn, book_id):
+    conn.execute("DELETE FROM quizzes WHERE book_id = ?", (book_id,))
+    conn.execute("DELETE FROM quiz_questions WHERE book_id = ?", (book_id,))
+
+
+def load_quiz(conn, book_id):
+    """
+    Cuestionario compilado del libro, o None. Mismo formato que los archivos de src/quizzes
+    ({"book_title", "questions": [{"id", "question", "options", "correct_answer"}]}) más
+    "answer_key" (bytes) para puntuar con score_answers() y "quiz_hash" para guardar con las respuestas.
+    """
+    rows = conn.execute(
+        """SELECT q.title, q.answer_key, q.quiz_hash, qq.question_id, qq.question, qq.options
+           FROM quizzes q
+           JOIN quiz_questions qq ON qq.book_id = q.book_id
+           WHERE q.book_id = ?
+           ORDER BY qq.position""",
+        (book_id,)
+    ).fetchall()
+    if not rows:
+        return None
+    answer_key = rows[0]["answer_key"]
+    return {
+        "book_id": book_id,
+        "book_title": rows[0]["title"],
+        "answer_key": answer_key,
+        "quiz_hash": rows[0]["quiz_hash"],
+        "questions": [
+            {"id": row["question_id"], "question": row["question"], "options": json.loads(row["options"]),
+             "correct_answer": correct}
+            for row, correct in zip(rows, answer_key)
+        ],
+    }
+
+
+def answer_key(quiz_data):
+    """Clave de respuestas del cuestionario (la precalculada si viene de la base de datos)."""
+    key = quiz_data.get("answer_key")
+    if key is None:
+        key = bytes(int(q["correct_answer"]) for q in quiz_data["questions"])
+    return key
+
+
+def answers_in_order(quiz_data, user_answers):
+    """Convierte {id de pregunta: opción} (claves y valores como texto o número) a opciones en orden; 0 = sin responder."""
+    by_id = {str(question_id): answer for question_id, answer in user_answers.items()}
+    return [int(by_id.get(str(q["id"])) or 0) for q in quiz_data["questions"]]
+
+
+def score_answers(key, answers):
+    """Número de aciertos: compara la clave con las respuestas (enteros en el orden de las preguntas) de una vez."""
+    return sum(map(operator.eq, key, answers))
+
+
+if __name__ == "__main__":
+    # python -m src.quiz_bundle : vuelve a compilar todos los cuestionarios de src/quizzes en la base de datos
+    # (python -m src.cli reindex --force)
+    import sys
+    from src.cli import main
+
+    sys.exit(main(["reindex", "--force"] + sys.argv[1:]))
@@ -0,0 +1,154 @@
+# src/recommender.py
+
+import math
+import threading
+import time
+
+from src.config import (RECOMMENDER_READABILITY_WEIGHT, RECOMMENDER_POPULARITY_WEIGHT,
+                        RECOMMENDER_READABILITY_TOLERANCE, RECOMMENDER_READABILITY_SHIFT,
+                        RECOMMENDER_POPULARITY_REFRESH_SECONDS)
+from src.scoring_model import default_scoring_model
+
+# Columnas de cada libro recomendado (las mismas que devolvía la consulta por edad)
+BOOK_COLUMNS = ("id", "title", "author", "min_age", "max_age", "content_path", "word_count", "readability_fh")
+# Límites de la velocidad del lector respecto a la esperada para su edad al ajustar la legibilidad
+_SPEED_RATIO_LIMITS = (0.5, 2.0)
+
+
+class _AgeIndex:
+    """
+    Catálogo agrupado por edad: las edades son un dominio pequeño, así que cada edad entre la mínima
+    y la máxima del catálogo tiene ya su tupla de libros ordenada por título (una vez por libro y edad).
+    """
+
+    def __init__(self, books):
+        import statistics  # Solo al construir el índice: arrastra fractions/decimal y no hace falta al arrancar
+
+        self.books = books
+        self.min_age = min((book["min_age"] for book in books), default=0)
+        max_age = max((book["max_age"] for book in books), default=-1)
+        buckets = [[] for _ in range(max_age - self.min_age + 1)]
+        for book in books:  # Ya vienen ordenados por título
+            for age in range(max(book["min_age"], self.min_age), book["max_age"] + 1):
+                buckets[age - self.min_age].append(book)
+        self.buckets = [tuple(bucket) for bucket in buckets]
+        # Legibilidad típica de los libros de cada edad: referencia para la cercanía de legibilidad
+        self.readability_medians = [
+            statistics.median(values) if values else None
+            for values in ([book["readability_fh"] for book in bucket if book["readability_fh"] is not None]
+                           for bucket in self.buckets)
+        ]
+
+    def bucket(self, age):
+        index = age - self.min_age
+        return self.buckets[index] if 0 <= index < len(self.buckets) else ()
+
+    def readability_median(self, age):
+        index = age - self.min_age
+        return self.readability_medians[index] if 0 <= index < len(self.buckets) else None
+
+
+class BookRecommender:
+    """
+    Recomendaciones por edad servidas desde memoria. El catálogo se lee una vez y el índice se
+    conserva hasta invalidate() (DatabaseManager lo llama cuando el indexador cambia libros).
+    Los diccionarios devueltos son compartidos entre llamadas: no deben modificarse.
+
+    recommend() ordena además por cercanía de la legibilidad del libro a la adecuada para el lector
+    (la típica de su edad, más difícil si lee más rápido de lo esperado) y por popularidad.
+    """
+
+    def __init__(self, db_manager, scoring_model=None):
+        self.db_manager = db_manager
+        self.scoring_model = scoring_model or default_scoring_model
+        self._lock = threading.Lock()
+        self._index = None
+        self._popularity = None  # book_id -> popularidad normalizada (0..1)
+        self._popularity_loaded_at = None
+        self._ranked = {}  # edad -> libros ordenados por puntuación para un lector sin historial
+
+    def invalidate(self):
+        with self._lock:
+            self._index = None
+            self._ranked = {}
+
+    def books_for_age(self, age):
+        """Libros adecuados para la edad, ordenados por título."""
+        return list(self._get_index().bucket(age))
+
+    def recommend(self, age, user_id=None, limit=None):
+        """Libros adecuados para la edad, de más a menos recomendado (por título si empatan)."""
+        index = self._get_index()
+        popularity = self._get_popularity()
+        speed_ratio = self._user_speed_ratio(user_id, age) if user_id is not None else None
+        if speed_ratio is None:
+            ranked = self._ranked.get(age)
+            if ranked is None:
+                ranked = self._rank(index, age, popularity, 1.0)
+                with self._lock:
+                    if self._index is index:
+                        self._ranked[age] = ranked
+        else:
+            ranked = self._rank(index, age, popularity, speed_ratio)
+        return list(ranked[:limit] if limit is not None else ranked)
+
+    # --- Internos ---
+    def _get_index(self):
+        index = self._index
+        if index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = self._load_index()
+                index = self._index
+        return index
+
+    def _load_index(self):
+        self.db_manager._catalog_loaded.wait()
+        rows = self.db_manager._get_connection().execute(
+            f"SELECT {', '.join(BOOK_COLUMNS)} FROM books ORDER BY title"
+        ).fetchall()
+        return _AgeIndex(tuple(dict(row) for row in rows))
+
+    def _get_popularity(self):
+        now = time.monotonic()
+        if (self._popularity is None
+                or now - self._popularity_loaded_at >= RECOMMENDER_POPULARITY_REFRESH_SECONDS):
+            counts = dict(self.db_manager._get_connection().execute(
+                "SELECT book_id, completed_count FROM book_stats WHERE completed_count > 0"
+            ).fetchall())
+            scale = math.log1p(max(counts.values(), default=0)) or 1.0
+            with self._lock:
+                self._popularity = {book_id: math.log1p(count) / scale for book_id, count in counts.items()}
+                self._popularity_loaded_at = now
+                self._ranked = {}
+        return self._popularity
+
+    def _user_speed_ratio(self, user_id, age):
+        """WPM medio del lector respecto al centro de su rango esperado, o None sin sesiones."""
+        row = self.db_manager._get_connection().execute(
+            "SELECT wpm_sum, wpm_count FROM user_stats WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        if row is None or not row["wpm_count"]:
+            return None
+        min_wpm, max_wpm = self.scoring_model.expected_range(age)
+        low, high = _SPEED_RATIO_LIMITS
+        return min(max(row["wpm_sum"] / row["wpm_count"] / ((min_wpm + max_wpm) / 2), low), high)
+
+    @staticmethod
+    def _rank(index, age, popularity, speed_ratio):
+        bucket = index.bucket(age)
+        median = index.readability_median(age)
+        # Un índice de Fernández-Huerta más bajo es un texto más difícil
+        target = median - (speed_ratio - 1.0) * RECOMMENDER_READABILITY_SHIFT if median is not None else None
+
+        def score(book):
+            readability = book["readability_fh"]
+            if target is None or readability is None:
+                fit = 0.5
+            else:
+                fit = max(0.0, 1.0 - abs(readability - target) / RECOMMENDER_READABILITY_TOLERANCE)
+            return (RECOMMENDER_READABILITY_WEIGHT * fit
+                    + RECOMMENDER_POPULARITY_WEIGHT * popularity.get(book["id"], 0.0))
+
+        # sorted() es estable: a igual puntuación se conserva el orden por título del índice
+        return tuple(sorted(bucket, key=score, reverse=True))
@@ -0,0 +1,366 @@
+# src/reports.py
+
+import datetime
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from src.config import (REPORTS_DIRECTORY, REPORT_MAX_SESSION_ROWS, REPORT_USERS_PER_TASK, REPORT_MAX_WORKERS,
+                        REPORT_TASKS_PER_WORKER, QUIZ_PASS_THRESHOLD)
+
+logger = logging.getLogger(__name__)
+
+# Las mismas columnas que get_user_reading_stats, en orden cronológico y solo sesiones terminadas del
+# periodo; idx_reading_sessions_user_start resuelve el filtro y el orden
+_SESSIONS_SQL = """SELECT rs.start_time, rs.duration_seconds, rs.wpm, rs.performance_rating, rs.quiz_score,
+                          b.title AS book_title, b.author AS book_author
+                   FROM reading_sessions rs
+                   JOIN books b ON rs.book_id = b.id
+                   WHERE rs.user_id = ? AND rs.start_time >= ? AND rs.start_time < ?
+                     AND rs.end_time IS NOT NULL
+                   ORDER BY rs.start_time"""
+# Límites del periodo cuando no se indican (comparación de texto con start_time "AAAA-MM-DD hh:mm:ss")
+_PERIOD_START, _PERIOD_END = "0000", "9999"
+
+_MARGIN = 42  # Puntos (1,5 cm)
+_ROW_HEIGHT = 13  # Puntos por fila de tabla (letra de 8 puntos)
+
+_worker_pool = None  # Conexión a la base de datos de cada proceso del pool
+
+
+def load_reportlab():
+    """reportlab solo hace falta para los informes: se importa al generarlos y no al arrancar la aplicación."""
+    try:
+        import reportlab  # noqa: F401
+    except ImportError as e:
+        raise RuntimeError("Los informes PDF necesitan reportlab (pip install -r requirements.txt).") from e
+
+
+# --- Datos de un alumno (una pasada por sus sesiones, con memoria acotada) ---
+class _StudentData:
+    def __init__(self, user_id, age):
+        self.user_id = user_id
+        self.age = age
+        self.session_count = 0
+        self.total_seconds = 0
+        self.wpm_sum = 0.0
+        self.wpm_count = 0
+        self.quiz_sum = 0.0
+        self.quiz_count = 0
+        self.quiz_pass_count = 0
+        self.weeks = {}  # "AAAA-Wnn" -> [suma de WPM, sesiones con WPM]
+        self.recent = deque(maxlen=REPORT_MAX_SESSION_ROWS)
+
+    def add(self, row):
+        self.session_count += 1
+        self.total_seconds += row["duration_seconds"] or 0
+        if row["wpm"] is not None:
+            self.wpm_sum += row["wpm"]
+            self.wpm_count += 1
+            week = _week_label(row["start_time"])
+            totals = self.weeks.setdefault(week, [0.0, 0])
+            totals[0] += row["wpm"]
+            totals[1] += 1
+        if row["quiz_score"] is not None:
+            self.quiz_sum += row["quiz_score"]
+            self.quiz_count += 1
+            self.quiz_pass_count += row["quiz_score"] >= QUIZ_PASS_THRESHOLD
+        self.recent.append(tuple(row))
+
+    def summary(self):
+        """Totales del alumno para el informe de la clase (sin las filas de sesiones)."""
+        return {
+            "user_id": self.user_id, "age": self.age, "session_count": self.session_count,
+            "total_seconds": self.total_seconds,
+            "avg_wpm": self.wpm_sum / self.wpm_count if self.wpm_count else None,
+            "avg_quiz_score": self.quiz_sum / self.quiz_count if self.quiz_count else None,
+            "quiz_pass_rate": self.quiz_pass_count / self.quiz_count * 100 if self.quiz_count else None,
+            "weeks": self.weeks,
+        }
+
+
+def _week_label(start_time):
+    year, week, _ = datetime.date.fromisoformat(start_time[:10]).isocalendar()
+    return f"{year}-S{week:02d}"
+
+
+def _format_duration(seconds):
+    minutes, seconds = divmod(int(seconds or 0), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m" if hours else f"{minutes}m {seconds:02d}s"
+
+
+def _truncate(text, length):
+    return text if len(text) <= length else text[:length - 1] + "…"
+
+
+def _format_number(value, pattern="{:.1f}"):
+    return pattern.format(value) if value is not None else "-"
+
+
+# --- Dibujo de los PDF ---
+# Se dibuja directamente sobre el canvas de reportlab: con platypus (Table, Paragraph) medir y dibujar
+# celda por celda era la mayor parte del tiempo de cada informe
+class _PdfWriter:
+    """Escribe de arriba abajo en páginas A4 y agrega páginas cuando hace falta."""
+
+    def __init__(self, path, title):
+        from reportlab.lib.pagesizes import A4
+        from reportlab.pdfgen.canvas import Canvas
+        self.width, self.height = A4
+        self.canvas = Canvas(path, pagesize=A4, pageCompression=1)
+        self.canvas.setTitle(title)
+        self.y = self.height - _MARGIN
+
+    def ensure_space(self, needed):
+        if self.y - needed < _MARGIN:
+            self.canvas.showPage()
+            self.y = self.height - _MARGIN
+
+    def text(self, text, size=10, bold=False, space_after=4):
+        self.ensure_space(size + space_after)
+        self.y -= size
+        self.canvas.setFont("Helvetica-Bold" if bold else "Helvetica", size)
+        self.canvas.drawString(_MARGIN, self.y, text)
+        self.y -= space_after
+
+    def wpm_trend(self, weeks):
+        """Gráfico de línea con el WPM medio de cada semana. weeks: {"AAAA-Snn": [suma, cuenta]}."""
+        labels = sorted(weeks)
+        if len(labels) < 2:
+            self.text("No hay suficientes semanas con sesiones para mostrar la tendencia.", size=9, space_after=10)
+            return
+        values = [weeks[label][0] / weeks[label][1] for label in labels]
+        chart_width, chart_height = self.width - 2 * _MARGIN - 30, 110
+        self.text("WPM medio por semana", size=9, bold=True, space_after=8)
+        self.ensure_space(chart_height + 24)
+        c = self.canvas
+        left, bottom = _MARGIN + 30, self.y - chart_height
+        top_value = max(values) * 1.1 or 1.0
+
+        c.setStrokeColorRGB(0.69, 0.75, 0.77)
+        c.setLineWidth(0.5)
+        c.setFont("Helvetica", 7)
+        for fraction in (0, 0.5, 1):
+            y = bottom + chart_height * fraction
+            c.line(left, y, left + chart_width, y)
+            c.drawRightString(left - 4, y - 2, f"{top_value * fraction:.0f}")
+        step_x = chart_width / (len(labels) - 1)
+        label_every = max(1, len(labels) // 8)
+        for i in range(0, len(labels), label_every):
+            c.drawCentredString(left + i * step_x, bottom - 10, labels[i])
+
+        c.setStrokeColorRGB(0.18, 0.29, 0.38)
+        c.setLineWidth(1.5)
+        path = c.beginPath()
+        path.moveTo(left, bottom + values[0] / top_value * chart_height)
+        for i, value in enumerate(values[1:], start=1):
+            path.lineTo(left + i * step_x, bottom + value / top_value * chart_height)
+        c.drawPath(path, stroke=1, fill=0)
+        c.setStrokeColorRGB(0, 0, 0)
+        self.y = bottom - 24
+
+    def table(self, header, rows, column_widths):
+        """Tabla con alto de fila fijo; en cada página el encabezado se repite y cada columna es un solo objeto de texto."""
+        c = self.canvas
+        xs = [_MARGIN]
+        for width in column_widths[:-1]:
+            xs.append(xs[-1] + width)
+        total_width = sum(column_widths)
+        index = 0
+        while index < len(rows):
+            self.ensure_space(3 * _ROW_HEIGHT)
+            fit = min(len(rows) - index, int((self.y - _MARGIN) // _ROW_HEIGHT) - 1)
+            page_rows = rows[index:index + fit]
+
+            c.setFillColorRGB(0.18, 0.29, 0.38)
+            c.rect(_MARGIN, self.y - _ROW_HEIGHT, total_width, _ROW_HEIGHT, stroke=0, fill=1)
+            c.setFillColorRGB(0.93, 0.95, 0.96)
+            for row_number in range(1, len(page_rows), 2):
+                c.rect(_MARGIN, self.y - (row_number + 2) * _ROW_HEIGHT, total_width, _ROW_HEIGHT, stroke=0, fill=1)
+
+            c.setFillColorRGB(1, 1, 1)
+            c.setFont("Helvetica-Bold", 8)
+            for x, title in zip(xs, header):
+                c.drawString(x + 3, self.y - _ROW_HEIGHT + 4, title)
+            c.setFillColorRGB(0, 0, 0)
+            for column, x in enumerate(xs):
+                text = c.beginText(x + 3, self.y - 2 * _ROW_HEIGHT + 4)
+                text.setFont("Helvetica", 8, _ROW_HEIGHT)
+                for row in page_rows:
+                    text.textLine(str(row[column]))
+                c.drawText(text)
+
+            self.y -= (len(page_rows) + 1) * _ROW_HEIGHT + 8
+            index += fit
+
+    def save(self):
+        self.canvas.save()
+
+
+def _summary_lines(summary):
+    return [
+        f"Sesiones terminadas: {summary['session_count']}",
+        f"Tiempo de lectura: {_format_duration(summary['total_seconds'])}",
+        f"WPM medio: {_format_number(summary['avg_wpm'])}",
+        f"Promedio de cuestionarios: {_format_number(summary['avg_quiz_score'], '{:.1f}%')}"
+        f" (aprobados: {_format_number(summary['quiz_pass_rate'], '{:.0f}%')})",
+    ]
+
+
+def _period_text(since, until):
+    if since and until:
+        return f"Periodo: {since} a {until}"
+    if since:
+        return f"Periodo: desde {since}"
+    if until:
+        return f"Periodo: hasta {until}"
+    return "Periodo: todas las sesiones"
+
+
+def _render_student_pdf(path, student, period_text):
+    pdf = _PdfWriter(path, f"Alumno {student.user_id}")
+    pdf.text(f"Informe de lectura — Alumno {student.user_id}", size=16, bold=True, space_after=8)
+    pdf.text(f"Edad: {student.age} años. {period_text}", space_after=10)
+    for line in _summary_lines(student.summary()):
+        pdf.text(line)
+    pdf.y -= 10
+    pdf.wpm_trend(student.weeks)
+
+    shown = len(student.recent)
+    pdf.text("Sesiones" if shown == student.session_count else f"Últimas {shown} sesiones",
+             size=12, bold=True, space_after=6)
+    if shown:
+        rows = [(start_time[:16], _truncate(book_title, 40), _format_duration(duration),
+                 _format_number(wpm, "{:.0f}"), rating or "-", _format_number(quiz_score, "{:.0f}%"))
+                for start_time, duration, wpm, rating, quiz_score, book_title, _ in reversed(student.recent)]
+        pdf.table(("Fecha", "Libro", "Duración", "WPM", "Calificación", "Cuestionario"), rows,
+                  (76, 170, 52, 36, 110, 60))
+    else:
+        pdf.text("Sin sesiones terminadas en el periodo.")
+    pdf.save()
+
+
+def _render_class_pdf(path, title_text, summaries, period_text):
+    class_summary = {
+        "session_count": sum(s["session_count"] for s in summaries),
+        "total_seconds": sum(s["total_seconds"] for s in summaries),
+    }
+    # Promedios de la clase como promedio de los alumnos con datos (cada alumno pesa lo mismo)
+    for key in ("avg_wpm", "avg_quiz_score", "quiz_pass_rate"):
+        values = [s[key] for s in summaries if s[key] is not None]
+        class_summary[key] = sum(values) / len(values) if values else None
+    weeks = {}
+    for summary in summaries:
+        for week, (wpm_sum, wpm_count) in summary["weeks"].items():
+            totals = weeks.setdefault(week, [0.0, 0])
+            totals[0] += wpm_sum
+            totals[1] += wpm_count
+
+    pdf = _PdfWriter(path, title_text)
+    pdf.text(title_text, size=16, bold=True, space_after=8)
+    pdf.text(f"{len(summaries)} alumnos. {period_text}", space_after=10)
+    for line in _summary_lines(class_summary):
+        pdf.text(line)
+    pdf.y -= 10
+    pdf.wpm_trend(weeks)
+    pdf.text("Alumnos", size=12, bold=True, space_after=6)
+    rows = [(s["user_id"], s["age"], s["session_count"], _format_duration(s["total_seconds"]),
+             _format_number(s["avg_wpm"]), _format_number(s["avg_quiz_score"], "{:.1f}%"),
+             _format_number(s["quiz_pass_rate"], "{:.0f}%"))
+            for s in summaries]
+    pdf.table(("Alumno", "Edad", "Sesiones", "Tiempo", "WPM medio", "Cuestionarios", "Aprobados"), rows,
+              (60, 40, 60, 70, 70, 90, 70))
+    pdf.save()
+
+
+# --- Trabajo por lotes (en el proceso principal o en los procesos del pool) ---
+def _render_batch(conn, users, output_directory, period, period_text):
+    """Genera los PDF de un lote de alumnos [(user_id, edad)] y devuelve sus resúmenes."""
+    summaries = []
+    for user_id, age in users:
+        student = _StudentData(user_id, age)
+        for row in conn.execute(_SESSIONS_SQL, (user_id, *period)):  # El cursor se recorre sin cargarlo entero
+            student.add(row)
+        _render_student_pdf(os.path.join(output_directory, f"alumno_{user_id}.pdf"), student, period_text)
+        summaries.append(student.summary())
+    return summaries
+
+
+def _init_worker(db_path):
+    global _worker_pool
+    from src.db_pool import ConnectionPool
+    _worker_pool = ConnectionPool(db_path)
+
+
+def _render_batch_in_worker(users, output_directory, period, period_text):
+    return _render_batch(_worker_pool.get_connection(), users, output_directory, period, period_text)
+
+
+def generate_reports(db_manager, output_directory=REPORTS_DIRECTORY, user_ids=None, age=None, since=None,
+                     until=None, class_report=True, max_workers=REPORT_MAX_WORKERS):
+    """
+    Genera un PDF por alumno (resumen, tendencia semanal de WPM y tabla de sesiones) y, si class_report,
+    uno de la clase con todos. Los alumnos son user_ids, los de la edad indicada o todos. since/until
+    ("AAAA-MM-DD") limitan el periodo. Los lotes de alumnos se reparten entre procesos, que se
+    reemplazan cada REPORT_TASKS_PER_WORKER lotes para acotar su memoria.
+    Devuelve {"students": n, "files": [rutas], "seconds": duración}.
+    """
+    load_reportlab()
+    started = time.perf_counter()
+    db_manager.flush_sessions()  # Los procesos leen la base de datos directamente
+    conn = db_manager._get_connection()
+    if user_ids is not None:
+        placeholders = ", ".join("?" for _ in user_ids)
+        users = conn.execute(f"SELECT id, age FROM users WHERE id IN ({placeholders}) ORDER BY id",
+                             list(user_ids)).fetchall()
+    elif age is not None:
+        users = conn.execute("SELECT id, age FROM users WHERE age = ? ORDER BY id", (age,)).fetchall()
+    else:
+        users = conn.execute("SELECT id, age FROM users ORDER BY id").fetchall()
+    users = [tuple(user) for user in users]
+    # [inicio, día siguiente al final): start_time incluye la hora
+    period = (since or _PERIOD_START,
+              (datetime.date.fromisoformat(until) + datetime.timedelta(days=1)).isoformat() if until else _PERIOD_END)
+    period_text = _period_text(since, until)
+
+    os.makedirs(output_directory, exist_ok=True)
+    batches = [users[i:i + REPORT_USERS_PER_TASK] for i in range(0, len(users), REPORT_USERS_PER_TASK)]
+    summaries = []
+    if len(batches) <= 1 or max_workers == 1:
+        # Pocos alumnos: arrancar procesos tardaría más que generarlos aquí
+        for batch in batches:
+            summaries.extend(_render_batch(conn, batch, output_directory, period, period_text))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(db_manager.db_path,),
+                                 max_tasks_per_child=REPORT_TASKS_PER_WORKER) as executor:
+            futures = [executor.submit(_render_batch_in_worker, batch, output_directory, period, period_text)
+                       for batch in batches]
+            for future in futures:
+                summaries.extend(future.result())
+
+    files = [os.path.join(output_directory, f"alumno_{user_id}.pdf") for user_id, _ in users]
+    if class_report and summaries:
+        if user_ids is None and age is not None:
+            title_text, filename = f"Informe de la clase — {age} años", f"clase_{age}.pdf"
+        else:
+            title_text, filename = "Informe de la clase", "clase.pdf"
+        class_path = os.path.join(output_directory, filename)
+        _render_class_pdf(class_path, title_text, summaries, period_text)
+        files.append(class_path)
+
+    seconds = time.perf_counter() - started
+    logger.info("%d informes de alumnos generados en %.1f s", len(users), seconds)
+    return {"students": len(users), "files": files, "seconds": seconds}
+
+
+if __name__ == "__main__":
+    # python -m src.reports [--age 10 | --users 1 2 3] [--since 2025-03-01] [--until 2025-06-30] : igual que
+    # python -m src.cli reports
+    import sys
+    from src.cli import main
+
+    sys.exit(main(["reports"] + sys.argv[1:]))
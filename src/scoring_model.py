@@ -0,0 +1,243 @@
+# src/scoring_model.py
+
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from array import array
+
+from src.config import (WPM_EXPECTED, SCORING_MODEL_FILE, SCORING_MODEL_RELOAD_SECONDS, READABILITY_REFERENCE,
+                        READABILITY_WPM_SLOPE, READABILITY_FACTOR_LIMITS)
+
+logger = logging.getLogger(__name__)
+
+_numpy = None  # None = aún no se intentó importar; False = no está instalado
+
+
+def load_numpy():
+    """
+    NumPy es opcional y tarda en importarse, así que se carga en el primer cálculo por lotes y no al
+    arrancar la aplicación. Devuelve el módulo o None si no está instalado (score_batch recorre los
+    datos una vez en Python).
+    """
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    return _numpy or None
+
+
+# Códigos de calificación usados en los arreglos; RATING_LABELS[código] es el texto guardado en la DB
+RATING_NORMAL, RATING_SLOW, RATING_FAST = 0, 1, 2
+RATING_LABELS = ("Normal", "Necesita mejorar (Lento)", "Rápido")
+
+# Por encima de max_wpm * FAST_PENALTY_FACTOR la puntuación baja 20 puntos por cada max_wpm de exceso
+FAST_PENALTY_FACTOR = 1.2
+
+
+class _Bands:
+    """
+    Rangos compilados. rows[edad] = (min_wpm, max_wpm, 100/min_wpm, 20/max_wpm, max_wpm * 1.2):
+    los recíprocos precalculados dejan el cálculo por sesión en comparaciones y multiplicaciones.
+    Las mismas columnas se guardan como arreglos planos para el cálculo por lotes.
+    """
+
+    def __init__(self, wpm_expected):
+        ages = [age for age in wpm_expected if isinstance(age, int) and age >= 0]
+        self.size = max(ages) + 1 if ages else 0
+        self.default = self._compile('default', *wpm_expected['default'])
+        self.rows = [self.default] * self.size
+        for age in ages:
+            self.rows[age] = self._compile(age, *wpm_expected[age])
+        # Columnas (una fila extra al final con el rango por defecto para edades fuera de la tabla)
+        self.columns = [array('d', column) for column in zip(*(self.rows + [self.default]))]
+
+    @staticmethod
+    def _compile(age, min_wpm, max_wpm):
+        if not 0 < min_wpm <= max_wpm:
+            raise ValueError(f"Rango de WPM inválido para la edad {age}: {min_wpm}-{max_wpm}")
+        return (float(min_wpm), float(max_wpm), 100.0 / min_wpm, 20.0 / max_wpm, max_wpm * FAST_PENALTY_FACTOR)
+
+    def row(self, age):
+        return self.rows[age] if 0 <= age < self.size else self.default
+
+
+def difficulty_factor(readability):
+    """Multiplicador de los rangos de WPM para un libro con ese índice de legibilidad (None = sin ajuste)."""
+    if readability is None or not READABILITY_WPM_SLOPE:
+        return 1.0
+    low, high = READABILITY_FACTOR_LIMITS
+    return min(max(1.0 + (readability - READABILITY_REFERENCE) * READABILITY_WPM_SLOPE, low), high)
+
+
+class ScoringModel:
+    """
+    Modelo de calificación de velocidad lectora compilado a partir de los rangos de WPM por edad.
+
+    Los rangos salen de WPM_EXPECTED o de un archivo JSON con la forma
+    {"6": [30, 60], "7": [40, 70], ..., "default": [150, 250]}. Si se indica path, el archivo se
+    vuelve a cargar solo cuando cambia su fecha de modificación (revisada cada reload_seconds).
+    """
+
+    def __init__(self, wpm_expected=WPM_EXPECTED, path=None, reload_seconds=SCORING_MODEL_RELOAD_SECONDS):
+        self.path = path
+        self.reload_seconds = reload_seconds
+        self._fallback = wpm_expected
+        self._lock = threading.Lock()
+        self._mtime_ns = None
+        self._checked_at = time.monotonic()
+        self._bands = _Bands(wpm_expected)
+        if path is not None:
+            self._load_file()
+
+    # --- Recarga en caliente ---
+    def reload_if_changed(self):
+        """Recompila los rangos si el archivo cambió. Devuelve True si se recargó."""
+        if self.path is None:
+            return False
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_seconds:
+            return False
+        with self._lock:
+            self._checked_at = now
+            return self._load_file()
+
+    def _load_file(self):
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            if self._mtime_ns is not None:
+                # El archivo se borró: volver a los rangos de config.py
+                self._bands = _Bands(self._fallback)
+                self._mtime_ns = None
+                return True
+            return False
+        if mtime_ns == self._mtime_ns:
+            return False
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            wpm_expected = {(key if key == 'default' else int(key)): tuple(value) for key, value in raw.items()}
+            bands = _Bands(wpm_expected)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            # Un archivo a medio editar no debe tumbar la aplicación: se conservan los rangos actuales
+            logger.error("Error al cargar los rangos de WPM de %s: %s", self.path, e)
+            self._mtime_ns = mtime_ns  # No volver a intentarlo hasta que el archivo cambie otra vez
+            return False
+
+        self._bands = bands  # Asignación atómica: los lectores ven los rangos viejos o los nuevos
+        self._mtime_ns = mtime_ns
+        logger.info("Rangos de WPM cargados desde %s", self.path)
+        return True
+
+    # --- Cálculo ---
+    def expected_range(self, age):
+        return self._bands.row(age)[:2]
+
+    def score(self, age, word_count, duration_seconds, readability=None):
+        """
+        Califica una sesión. Devuelve (wpm, puntuación de adecuación a la edad, calificación).
+        readability (Fernández-Huerta del libro) ajusta los rangos esperados a la dificultad del texto.
+        """
+        self.reload_if_changed()
+        min_wpm, max_wpm, slow_factor, fast_factor, fast_threshold = self._bands.row(age)
+        factor = difficulty_factor(readability)
+        if factor != 1.0:
+            min_wpm, max_wpm, fast_threshold = min_wpm * factor, max_wpm * factor, fast_threshold * factor
+            slow_factor, fast_factor = slow_factor / factor, fast_factor / factor
+
+        wpm = (word_count / duration_seconds) * 60 if duration_seconds else 0
+        if wpm < min_wpm:
+            return wpm, max(0, wpm * slow_factor), RATING_LABELS[RATING_SLOW]
+        if wpm <= max_wpm:
+            return wpm, 100.0, RATING_LABELS[RATING_NORMAL]
+        if wpm > fast_threshold:
+            return wpm, 100.0 - (wpm - max_wpm) * fast_factor, RATING_LABELS[RATING_FAST]
+        return wpm, 100.0, RATING_LABELS[RATING_FAST]
+
+    def score_batch(self, ages, word_counts, durations, readabilities=None):
+        """
+        Califica muchas sesiones de una vez. Devuelve (wpm, puntuaciones, códigos de calificación)
+        como arreglos del mismo largo; RATING_LABELS[código] da el texto de cada calificación.
+        readabilities es opcional (uno por sesión, None = sin ajuste por dificultad).
+        """
+        self.reload_if_changed()
+        np = load_numpy()
+        if np is not None:
+            return self._score_numpy(np, self._bands, ages, word_counts, durations, readabilities)
+        return self._score_python(self._bands, ages, word_counts, durations, readabilities)
+
+    @staticmethod
+    def _score_numpy(np, bands, ages, word_counts, durations, readabilities):
+        ages = np.asarray(ages, dtype=np.int64)
+        word_counts = np.asarray(word_counts, dtype=np.float64)
+        durations = np.asarray(durations, dtype=np.float64)
+
+        rows = np.where((ages >= 0) & (ages < bands.size), ages, bands.size)
+        min_wpm, max_wpm, slow_factor, fast_factor, fast_threshold = (
+            np.frombuffer(column, dtype=np.float64)[rows] for column in bands.columns
+        )
+
+        if readabilities is not None and READABILITY_WPM_SLOPE:
+            # Misma fórmula que difficulty_factor(); None (NaN) = sin ajuste
+            readabilities = np.array(readabilities, dtype=np.float64)
+            low, high = READABILITY_FACTOR_LIMITS
+            factors = np.clip(1.0 + (readabilities - READABILITY_REFERENCE) * READABILITY_WPM_SLOPE, low, high)
+            factors = np.where(np.isnan(readabilities), 1.0, factors)
+            min_wpm, max_wpm, fast_threshold = min_wpm * factors, max_wpm * factors, fast_threshold * factors
+            slow_factor, fast_factor = slow_factor / factors, fast_factor / factors
+
+        wpm = np.zeros_like(word_counts)
+        np.divide(word_counts, durations, out=wpm, where=durations != 0)
+        wpm *= 60  # Mismo orden de operaciones que score()
+
+        slow = wpm < min_wpm
+        fast = wpm > max_wpm
+        scores = np.full_like(wpm, 100.0)
+        scores = np.where(slow, np.maximum(0, wpm * slow_factor), scores)
+        scores = np.where(wpm > fast_threshold, 100.0 - (wpm - max_wpm) * fast_factor, scores)
+
+        codes = np.full(wpm.shape, RATING_NORMAL, dtype=np.int8)
+        codes[slow] = RATING_SLOW
+        codes[fast] = RATING_FAST
+        return wpm, scores, codes
+
+    @staticmethod
+    def _score_python(bands, ages, word_counts, durations, readabilities):
+        row = bands.row
+        wpm_out = array('d')
+        scores_out = array('d')
+        codes_out = array('b')
+
+        if readabilities is None:
+            readabilities = itertools.repeat(None)
+        for age, word_count, duration, readability in zip(ages, word_counts, durations, readabilities):
+            min_wpm, max_wpm, slow_factor, fast_factor, fast_threshold = row(age)
+            factor = difficulty_factor(readability)
+            if factor != 1.0:
+                min_wpm, max_wpm, fast_threshold = min_wpm * factor, max_wpm * factor, fast_threshold * factor
+                slow_factor, fast_factor = slow_factor / factor, fast_factor / factor
+            wpm = (word_count / duration) * 60 if duration else 0.0
+            if wpm < min_wpm:
+                score, code = max(0.0, wpm * slow_factor), RATING_SLOW
+            elif wpm <= max_wpm:
+                score, code = 100.0, RATING_NORMAL
+            elif wpm > fast_threshold:
+                score, code = 100.0 - (wpm - max_wpm) * fast_factor, RATING_FAST
+            else:
+                score, code = 100.0, RATING_FAST
+
+            wpm_out.append(wpm)
+            scores_out.append(score)
+            codes_out.append(code)
+        return wpm_out, scores_out, codes_out
+
+
+# Modelo compartido por AppLogic y los cálculos por lotes (rangos de wpm_bands.json si existe)
+default_scoring_model = ScoringModel(path=SCORING_MODEL_FILE)
@@ -0,0 +1,257 @@
+# src/session_journal.py
+
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+
+from src.config import SESSION_JOURNAL_MODE, SESSION_JOURNAL_MAX_EVENTS, SESSION_JOURNAL_FLUSH_SECONDS
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_MODES = ("sync", "log", "memory")
+
+# El ID de cada sesión lo asigna SQLite al insertar el inicio, así que no choca con el de otro proceso
+# que escriba en la misma base (la aplicación y la línea de comandos, una importación, una consolidación)
+_START_SESSION_SQL = "INSERT INTO reading_sessions (user_id, book_id, start_time) VALUES (?, ?, ?)"
+# Las sentencias del lote son idempotentes para que volver a aplicar el registro tras un fallo
+# (por ejemplo, entre el commit y el vaciado del archivo) no duplique datos.
+# Inicios con ID propio: solo llegan en registros de versiones anteriores, que los reservaban en memoria
+_INSERT_SESSION_SQL = """INSERT INTO reading_sessions (id, user_id, book_id, start_time)
+                         VALUES (:id, :user_id, :book_id, :start_time)
+                         ON CONFLICT(id) DO NOTHING"""
+_FINISH_SESSION_SQL = """UPDATE reading_sessions SET
+                            end_time = :end_time,
+                            duration_seconds = :duration_seconds,
+                            wpm = :wpm,
+                            age_appropriateness_score = :age_appropriateness_score,
+                            performance_rating = :performance_rating,
+                            quiz_score = :quiz_score
+                         WHERE id = :id"""
+# Respuestas del cuestionario de la sesión (una fila por pregunta); el libro se toma de la sesión y,
+# si el evento no trae la huella del cuestionario respondido, se usa la del cuestionario actual
+_INSERT_RESPONSE_SQL = """INSERT INTO quiz_responses (book_id, position, session_id, answer, correct, quiz_hash)
+                          SELECT rs.book_id, :position, rs.id, :answer, :correct,
+                                 COALESCE(:quiz_hash, (SELECT quiz_hash FROM quizzes q WHERE q.book_id = rs.book_id))
+                          FROM reading_sessions rs WHERE rs.id = :id
+                          ON CONFLICT DO NOTHING"""
+
+
+def _sqlite_now():
+    """Mismo formato y zona (UTC) que datetime('now') de SQLite."""
+    return datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _try_lock(log_file):
+    """
+    Bloqueo exclusivo, sin esperar, del registro abierto (se libera al cerrarlo o si el proceso termina).
+    False si otro proceso vivo ya lo tiene: el registro es suyo y no se debe reaplicar ni vaciar.
+    """
+    try:
+        if os.name == "nt":
+            import msvcrt
+            log_file.seek(0)
+            msvcrt.locking(log_file.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(log_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+class SessionJournal:
+    """
+    Escritura diferida de los fines de sesión de lectura.
+
+    start() inserta la fila al momento y devuelve el ID que le asigna SQLite. Los fines (con sus
+    respuestas al cuestionario) se acumulan y se escriben todos en una sola transacción cuando hay
+    max_events pendientes, cuando el más antiguo supera flush_seconds, antes de cada lectura de
+    sesiones y al cerrar.
+
+    Modos: "sync" confirma cada evento al momento; "log" además anota cada evento en log_path
+    (sobrevive a un cierre inesperado de la aplicación y se reaplica al iniciar); "memory" solo
+    guarda en memoria. El registro pertenece al proceso que tiene su bloqueo: otro proceso sobre la
+    misma base en modo "log" no lo reaplica y trabaja en modo "sync".
+    """
+
+    def __init__(self, get_connection, log_path, mode=SESSION_JOURNAL_MODE,
+                 max_events=SESSION_JOURNAL_MAX_EVENTS, flush_seconds=SESSION_JOURNAL_FLUSH_SECONDS):
+        if mode not in JOURNAL_MODES:
+            raise ValueError(f"Modo de diario de sesiones desconocido: {mode!r} (válidos: {', '.join(JOURNAL_MODES)})")
+        self._get_connection = get_connection
+        self.log_path = log_path
+        self.mode = mode
+        self.max_events = max_events
+        self.flush_seconds = flush_seconds
+
+        self._condition = threading.Condition(threading.RLock())
+        self._finishes = []
+        self._oldest_event_at = None
+        self._closed = False
+
+        # Solo el modo "log" (la aplicación) usa el registro; "sync" y "memory" (línea de comandos,
+        # benchmarks) no lo reaplican aunque exista
+        self._log = None
+        if mode == "log":
+            log_file = open(log_path, "a+", encoding="utf-8")
+            if _try_lock(log_file):
+                # Lo que quedó de una ejecución anterior que no se cerró correctamente
+                self._replay_log(log_file)
+                self._log = log_file
+            else:
+                log_file.close()
+                logger.warning("Otro proceso usa el diario de sesiones %s; se escribe en modo sync", log_path)
+                self.mode = "sync"
+
+        self._flusher = None
+        if self.mode != "sync":
+            self._flusher = threading.Thread(target=self._run_flusher, name="atlasread-session-journal",
+                                             daemon=True)
+            self._flusher.start()
+
+    # --- API pública ---
+    def start(self, user_id, book_id):
+        """Inserta el inicio de una sesión y devuelve su ID."""
+        if self._closed:
+            raise RuntimeError("El diario de sesiones ya fue cerrado.")
+        conn = self._get_connection()
+        with conn:
+            cursor = conn.execute(_START_SESSION_SQL, (user_id, book_id, _sqlite_now()))
+        return cursor.lastrowid
+
+    def finish(self, session_id, duration_seconds, wpm, age_appropriateness_score, performance_rating,
+               quiz_score=None, quiz_responses=None, quiz_hash=None):
+        """
+        Registra el fin de una sesión. Devuelve False si la sesión no existe.
+        quiz_responses: pares (opción elegida, acierto 0/1) en el orden de las preguntas del cuestionario.
+        quiz_hash: huella del cuestionario respondido (load_quiz()["quiz_hash"]).
+        """
+        with self._condition:
+            if not self._session_exists(session_id):
+                return False
+            self._add_event(self._finishes, {
+                "op": "finish", "id": session_id, "end_time": _sqlite_now(),
+                "duration_seconds": duration_seconds, "wpm": wpm,
+                "age_appropriateness_score": age_appropriateness_score,
+                "performance_rating": performance_rating, "quiz_score": quiz_score,
+                "quiz_responses": [list(response) for response in quiz_responses] if quiz_responses else None,
+                "quiz_hash": quiz_hash
+            })
+        return True
+
+    def pending_count(self):
+        with self._condition:
+            return len(self._finishes)
+
+    def flush(self):
+        """Escribe en una transacción todos los eventos pendientes. Devuelve cuántos se escribieron."""
+        with self._condition:
+            return self._flush_locked()
+
+    def close(self):
+        """Detiene el hilo de escritura y vacía lo pendiente. Si falla, en modo "log" queda en el registro."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        if self._flusher is not None:
+            self._flusher.join()
+
+        with self._condition:
+            try:
+                self._flush_locked()
+            except Exception as e:
+                logger.error("Error al guardar las sesiones pendientes al cerrar: %s", e)
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    # --- Internos ---
+    def _add_event(self, events, event):
+        if self._closed:
+            raise RuntimeError("El diario de sesiones ya fue cerrado.")
+        events.append(event)
+        if self._log is not None:
+            # Al sistema operativo en cada evento (sobrevive a un cierre de la aplicación) sin fsync
+            self._log.write(json.dumps(event) + "\n")
+            self._log.flush()
+        if self._oldest_event_at is None:
+            self._oldest_event_at = time.monotonic()
+
+        if self.mode == "sync" or self.pending_count() >= self.max_events:
+            self._flush_locked()
+        else:
+            self._condition.notify_all()
+
+    def _flush_locked(self):
+        if not self._finishes:
+            return 0
+        finishes = self._finishes
+        self._write_events(self._get_connection(), [], finishes)
+
+        self._finishes = []
+        self._oldest_event_at = None
+        if self._log is not None:
+            self._log.seek(0)
+            self._log.truncate()
+        return len(finishes)
+
+    @staticmethod
+    def _write_events(conn, starts, finishes):
+        with conn:  # Una sola transacción (y una sola escritura a disco) para todo el lote
+            if starts:
+                conn.executemany(_INSERT_SESSION_SQL, starts)
+            if finishes:
+                conn.executemany(_FINISH_SESSION_SQL, finishes)
+                conn.executemany(_INSERT_RESPONSE_SQL, (
+                    {"id": event["id"], "position": position, "answer": answer, "correct": correct,
+                     "quiz_hash": event.get("quiz_hash")}
+                    for event in finishes
+                    for position, (answer, correct) in enumerate(event.get("quiz_responses") or ())
+                ))
+
+    def _run_flusher(self):
+        """Hilo de fondo: vacía el lote cuando el evento más antiguo supera flush_seconds."""
+        with self._condition:
+            while not self._closed:
+                if self._oldest_event_at is None:
+                    self._condition.wait()
+                    continue
+                remaining = self._oldest_event_at + self.flush_seconds - time.monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+                try:
+                    self._flush_locked()
+                except Exception as e:
+                    # Se reintenta en el siguiente ciclo; los eventos siguen en memoria y en el registro
+                    logger.error("Error al guardar sesiones de lectura en lote: %s", e)
+                    self._oldest_event_at = time.monotonic()
+
+    def _session_exists(self, session_id):
+        row = self._get_connection().execute(
+            "SELECT 1 FROM reading_sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        return row is not None
+
+    def _replay_log(self, log_file):
+        """Aplica y vacía los eventos que quedaron en el registro (ya bloqueado por este proceso)."""
+        starts, finishes = [], []
+        log_file.seek(0)
+        for line in log_file:
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Última línea a medio escribir
+            (starts if event.get("op") == "start" else finishes).append(event)
+
+        if starts or finishes:
+            self._write_events(self._get_connection(), starts, finishes)
+            logger.warning("Diario de sesiones: %d eventos recuperados de %s", len(starts) + len(finishes), self.log_path)
+        # Se vacía en lugar de borrarlo: el bloqueo va con el archivo abierto
+        log_file.seek(0)
+        log_file.truncate()
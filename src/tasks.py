@@ -0,0 +1,80 @@
+# src/tasks.py
+
+import logging
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+from src.config import TASK_MAX_WORKERS, TASK_POLL_MS
+from src.instrumentation import profiled
+
+logger = logging.getLogger(__name__)
+
+
+class TaskExecutor:
+    """
+    Ejecuta trabajo bloqueante (base de datos, disco) en hilos de fondo y entrega el resultado
+    en el hilo de Tk. Tk no es seguro entre hilos, así que los hilos de trabajo nunca tocan widgets:
+    dejan el resultado en una cola que el hilo principal revisa con after().
+    """
+
+    def __init__(self, tk_root, max_workers=TASK_MAX_WORKERS, poll_ms=TASK_POLL_MS):
+        self._root = tk_root
+        self._poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="atlasread-worker")
+        self._completed = queue.SimpleQueue()
+        self._pending = 0
+        self._poll_id = None
+        self._shut_down = False
+
+    def submit(self, fn, *args, on_success=None, on_error=None, **kwargs):
+        """
+        Ejecuta fn(*args, **kwargs) en segundo plano. on_success(resultado) u on_error(excepción)
+        se llaman después en el hilo de Tk. Devuelve el Future.
+        """
+        future = self._executor.submit(profiled(fn), *args, **kwargs)
+        self._pending += 1
+        future.add_done_callback(lambda f: self._completed.put((f, on_success, on_error)))
+        self._schedule_poll()
+        return future
+
+    def pending_count(self):
+        return self._pending
+
+    def shutdown(self, wait=True):
+        """Espera (por defecto) a que terminen las tareas en curso; las que no empezaron se cancelan."""
+        self._shut_down = True
+        if self._poll_id is not None:
+            self._root.after_cancel(self._poll_id)
+            self._poll_id = None
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _schedule_poll(self):
+        if self._poll_id is None and not self._shut_down:
+            self._poll_id = self._root.after(self._poll_ms, self._deliver_results)
+
+    def _deliver_results(self):
+        self._poll_id = None
+        while True:
+            try:
+                future, on_success, on_error = self._completed.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            if future.cancelled():
+                continue
+
+            error = future.exception()
+            try:
+                if error is None:
+                    if on_success is not None:
+                        on_success(future.result())
+                elif on_error is not None:
+                    on_error(error)
+                else:
+                    logger.error("Error en tarea en segundo plano: %r", error)
+            except Exception:
+                # Un callback que falla no debe dejar sin entregar los demás resultados
+                logger.exception("Error en el callback de una tarea en segundo plano")
+
+        if self._pending:
+            self._schedule_poll()
@@ -0,0 +1,149 @@
+# src/text_stats.py
+
+import codecs
+import hashlib
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from src.config import TEXT_STATS_CHUNK_BYTES
+
+# Versión del análisis: si cambia el algoritmo, subirla para que el indexador vuelva a procesar los libros
+TEXT_STATS_VERSION = 1
+
+TextStats = namedtuple("TextStats", ["word_count", "sentence_count", "syllable_count",
+                                     "fernandez_huerta", "szigriszt"])
+
+# Palabra: letras/dígitos (incluye tildes, ñ, ü) con apóstrofos o guiones internos ("hispano-árabe").
+# El signo de apertura ¿ ¡ y las comillas no forman parte de la palabra.
+_WORD_RE = re.compile(r"[^\W_]+(?:['’\-][^\W_]+)*")
+# Fin de oración: uno o más . ! ? … seguidos (los puntos suspensivos cuentan una sola vez)
+_SENTENCE_END_RE = re.compile(r"[.!?…]+")
+_TOKEN_RE = re.compile(f"(?P<word>{_WORD_RE.pattern})|(?P<end>{_SENTENCE_END_RE.pattern})")
+
+_VOWEL_GROUP_RE = re.compile(r"[aeiouáéíóúü]+")
+# Dos vocales fuertes seguidas (o una débil con tilde: "río", "país") forman hiato: dos sílabas
+_STRONG_VOWELS = frozenset("aeoáéíóú")
+# Lo más que se guarda sin procesar entre dos partes; un "texto" sin espacios más largo se corta aquí
+_MAX_CARRY_CHARS = 4096
+
+
+@lru_cache(maxsize=65536)
+def count_syllables(word):
+    """Estimación de sílabas de una palabra en español: núcleos vocálicos separando hiatos."""
+    word = word.lower()
+    syllables = 0
+    for group in _VOWEL_GROUP_RE.findall(word):
+        syllables += 1
+        for previous, current in zip(group, group[1:]):
+            if previous in _STRONG_VOWELS and current in _STRONG_VOWELS:
+                syllables += 1
+    if syllables == 0:
+        # "y", números, siglas sin vocales: se cuentan como una sílaba
+        return 1
+    return syllables
+
+
+def readability_scores(word_count, sentence_count, syllable_count):
+    """(Fernández-Huerta, Szigriszt-Pazos); None si no hay texto. Valores altos = texto más fácil."""
+    if word_count == 0:
+        return None, None
+    sentences = max(sentence_count, 1)
+    syllables_per_word = syllable_count / word_count
+    fernandez_huerta = 206.84 - 60.0 * syllables_per_word - 102.0 * sentences / word_count
+    szigriszt = 206.835 - 62.3 * syllables_per_word - word_count / sentences
+    return round(fernandez_huerta, 2), round(szigriszt, 2)
+
+
+def readability_label(fernandez_huerta):
+    """Escala de lectura de Fernández-Huerta."""
+    if fernandez_huerta is None:
+        return "Desconocida"
+    if fernandez_huerta >= 90:
+        return "Muy fácil"
+    if fernandez_huerta >= 80:
+        return "Fácil"
+    if fernandez_huerta >= 70:
+        return "Algo fácil"
+    if fernandez_huerta >= 60:
+        return "Normal"
+    if fernandez_huerta >= 50:
+        return "Algo difícil"
+    if fernandez_huerta >= 30:
+        return "Difícil"
+    return "Muy difícil"
+
+
+class TextAnalyzer:
+    """
+    Acumula estadísticas de texto recibido por partes. Una palabra o un signo de fin de oración
+    cortado entre dos partes se conserva hasta la siguiente, así que el resultado no depende del
+    tamaño de las partes (salvo en tramos sin espacios de más de _MAX_CARRY_CHARS caracteres).
+    """
+
+    def __init__(self):
+        self.word_count = 0
+        self.sentence_count = 0
+        self.syllable_count = 0
+        self._words_in_sentence = 0
+        self._carry = ""
+
+    def feed(self, text):
+        text = self._carry + text
+        # Solo se procesa hasta el último espacio (cualquier str.isspace()); lo que sigue puede continuar
+        # en la próxima parte
+        tail = text.rsplit(None, 1)[-1] if text and not text[-1].isspace() else ""
+        if len(tail) > _MAX_CARRY_CHARS:
+            tail = ""  # Sin espacios en miles de caracteres: se procesa todo para no acumular sin límite
+        self._carry = tail
+        if len(tail) < len(text):
+            self._process(text[:len(text) - len(tail)])
+
+    def finish(self):
+        """Procesa lo pendiente y devuelve TextStats."""
+        if self._carry:
+            self._process(self._carry)
+            self._carry = ""
+        if self._words_in_sentence:
+            # Texto final sin punto: cuenta como una oración
+            self.sentence_count += 1
+            self._words_in_sentence = 0
+        return TextStats(self.word_count, self.sentence_count, self.syllable_count,
+                         *readability_scores(self.word_count, self.sentence_count, self.syllable_count))
+
+    def _process(self, text):
+        syllables = count_syllables
+        for match in _TOKEN_RE.finditer(text):
+            word = match.group("word")
+            if word is not None:
+                self.word_count += 1
+                self._words_in_sentence += 1
+                self.syllable_count += syllables(word)
+            elif self._words_in_sentence:
+                self.sentence_count += 1
+                self._words_in_sentence = 0
+
+
+def analyze_text(text):
+    analyzer = TextAnalyzer()
+    analyzer.feed(text)
+    return analyzer.finish()
+
+
+def analyze_text_file(full_path, chunk_size=TEXT_STATS_CHUNK_BYTES):
+    """
+    Lee el archivo una sola vez, por bloques de chunk_size bytes (memoria constante), y devuelve
+    (sha256 del contenido, TextStats).
+    """
+    digest = hashlib.sha256()
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    analyzer = TextAnalyzer()
+    with open(full_path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+            analyzer.feed(decoder.decode(chunk))
+    analyzer.feed(decoder.decode(b"", final=True))
+    return digest.hexdigest(), analyzer.finish()
@@ -0,0 +1,242 @@
+# src/widgets.py
+
+import math
+import sys
+import unicodedata
+
+import customtkinter as ctk
+
+
+def normalize_search_text(text):
+    """Minúsculas y sin tildes, para que 'civilizacion' encuentre 'Civilización'."""
+    decomposed = unicodedata.normalize("NFD", text.lower())
+    return "".join(c for c in decomposed if unicodedata.category(c) != "Mn")
+
+
+class VirtualCardList(ctk.CTkFrame):
+    """
+    Lista virtualizada de tarjetas: solo existen los widgets de las filas visibles y se
+    reutilizan al desplazarse, así que el costo no depende del número de elementos.
+
+    create_card(parent) crea una tarjeta vacía; update_card(card, item) la llena con un elemento.
+    search_key(item) devuelve el texto sobre el que se filtra.
+    """
+
+    def __init__(self, master, create_card, update_card, search_key, empty_text="", row_pady=7,
+                 scrollbar_color=None, scrollbar_hover_color=None, empty_text_color=None, empty_font=None,
+                 **kwargs):
+        super().__init__(master, **kwargs)
+        self._create_card = create_card
+        self._update_card = update_card
+        self._search_key = search_key
+        self._row_pady = row_pady
+
+        self._items = []
+        self._keys = []
+        self._filtered = []  # Índices en self._items que pasan el filtro actual
+        self._filter_text = ""
+        self._offset = 0  # Primer elemento visible
+        self._row_height = None  # Se mide con la primera tarjeta creada
+        self._cards = []
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self._cards_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self._cards_frame.grid(row=0, column=0, sticky="nsew")
+        self._cards_frame.grid_columnconfigure(0, weight=1)
+        self._cards_frame.grid_propagate(False)  # Las tarjetas no deben agrandar la lista
+
+        scrollbar_kwargs = {}
+        if scrollbar_color:
+            scrollbar_kwargs["button_color"] = scrollbar_color
+        if scrollbar_hover_color:
+            scrollbar_kwargs["button_hover_color"] = scrollbar_hover_color
+        self._scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar, **scrollbar_kwargs)
+        self._scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self._empty_label = ctk.CTkLabel(self._cards_frame, text=empty_text, font=empty_font,
+                                         text_color=empty_text_color)
+
+        self._cards_frame.bind("<Configure>", lambda event: self._render())
+        self._bind_mouse_wheel(self._cards_frame)
+
+    # --- API pública ---
+    def set_items(self, items):
+        """Reemplaza todos los elementos y limpia el filtro."""
+        self._items = list(items)
+        self._keys = [None] * len(self._items)  # Las claves de búsqueda se calculan al primer filtrado
+        self._filtered = range(len(self._items))
+        self._filter_text = ""
+        self._offset = 0
+        self._render()
+
+    def set_filter(self, text):
+        """Filtra por texto. Si el nuevo texto extiende al anterior, solo se revisan los resultados previos."""
+        text = normalize_search_text(text.strip())
+        if text == self._filter_text:
+            return
+
+        if not text:
+            candidates = range(len(self._items))
+        elif self._filter_text and text.startswith(self._filter_text):
+            candidates = self._filtered
+        else:
+            candidates = range(len(self._items))
+
+        if text:
+            self._filtered = [i for i in candidates if text in self._get_key(i)]
+        else:
+            self._filtered = candidates
+        self._filter_text = text
+        self._offset = 0
+        self._render()
+
+    def set_empty_text(self, text):
+        self._empty_label.configure(text=text)
+
+    def visible_count(self):
+        return len(self._filtered)
+
+    # --- Internos ---
+    def _get_key(self, index):
+        key = self._keys[index]
+        if key is None:
+            key = normalize_search_text(self._search_key(self._items[index]))
+            self._keys[index] = key
+        return key
+
+    def _slots_needed(self):
+        height = self._cards_frame.winfo_height()
+        if self._row_height is None or height <= 1:
+            return 1
+        return math.ceil(height / self._row_height)
+
+    def _ensure_cards(self, count):
+        while len(self._cards) < count:
+            card = self._create_card(self._cards_frame)
+            self._bind_mouse_wheel(card)
+            self._cards.append(card)
+
+    def _render(self):
+        total = len(self._filtered)
+        if total == 0:
+            for card in self._cards:
+                card.grid_remove()
+            self._empty_label.grid(row=0, column=0, pady=20)
+            self._scrollbar.set(0, 1)
+            return
+        self._empty_label.grid_remove()
+
+        if self._row_height is None:
+            # Medir la altura real de una tarjeta con contenido para saber cuántas caben
+            self._ensure_cards(1)
+            self._update_card(self._cards[0], self._items[self._filtered[0]])
+            self._cards[0].update_idletasks()
+            self._row_height = self._cards[0].winfo_reqheight() + 2 * self._row_pady
+
+        slots = self._slots_needed()
+        max_offset = max(0, total - max(1, slots - 1))
+        self._offset = min(max(0, self._offset), max_offset)
+        self._ensure_cards(slots)
+
+        for slot, card in enumerate(self._cards):
+            position = self._offset + slot
+            if slot < slots and position < total:
+                self._update_card(card, self._items[self._filtered[position]])
+                card.grid(row=slot, column=0, sticky="ew", pady=self._row_pady, padx=7)
+            else:
+                card.grid_remove()
+
+        self._scrollbar.set(self._offset / total, min(1.0, (self._offset + slots) / total))
+
+    def _scroll_to(self, offset):
+        if offset != self._offset:
+            self._offset = offset
+            self._render()
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self._scroll_to(int(float(value) * len(self._filtered)))
+        elif action == "scroll":
+            step = self._slots_needed() if unit == "pages" else 1
+            self._scroll_to(self._offset + int(value) * step)
+
+    def _on_mouse_wheel(self, event):
+        if event.num == 4:
+            delta = -1
+        elif event.num == 5:
+            delta = 1
+        elif sys.platform == "darwin":
+            delta = -event.delta
+        else:
+            delta = -int(event.delta / 120) or (-1 if event.delta > 0 else 1)
+        self._scroll_to(self._offset + delta)
+
+    def _bind_mouse_wheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_mouse_wheel, add="+")
+        widget.bind("<Button-4>", self._on_mouse_wheel, add="+")
+        widget.bind("<Button-5>", self._on_mouse_wheel, add="+")
+        for child in widget.winfo_children():
+            self._bind_mouse_wheel(child)
+
+
+class PagedTable(ctk.CTkScrollableFrame):
+    """
+    Tabla que muestra una página de filas a la vez. Las etiquetas de cada celda se crean
+    una sola vez (como máximo page_size filas) y se reutilizan cambiando solo su texto.
+    """
+
+    def __init__(self, master, columns, page_size, header_font=None, body_font=None, header_fg_color=None,
+                 header_text_color=None, row_fg_colors=("transparent",), empty_text="", empty_text_color=None,
+                 **kwargs):
+        super().__init__(master, **kwargs)
+        self._columns = columns
+        self._page_size = page_size
+        self._body_font = body_font
+        self._row_fg_colors = row_fg_colors
+        self._rows = []
+
+        self.grid_columnconfigure(tuple(range(len(columns))), weight=1)
+
+        self._header_labels = []
+        for col, name in enumerate(columns):
+            label = ctk.CTkLabel(self, text=name, font=header_font, text_color=header_text_color,
+                                 justify="center", fg_color=header_fg_color, corner_radius=0, padx=5, pady=5)
+            self._header_labels.append(label)
+
+        self._empty_label = ctk.CTkLabel(self, text=empty_text, font=body_font, text_color=empty_text_color)
+
+    def set_rows(self, rows):
+        """rows: lista (como máximo page_size) de filas; cada fila es una lista de (texto, color) por columna."""
+        rows = rows[:self._page_size]
+        if not rows:
+            for label in self._header_labels:
+                label.grid_remove()
+            for row_labels in self._rows:
+                for label in row_labels:
+                    label.grid_remove()
+            self._empty_label.grid(row=0, column=0, columnspan=len(self._columns), pady=20)
+            return
+
+        self._empty_label.grid_remove()
+        for col, label in enumerate(self._header_labels):
+            label.grid(row=0, column=col, sticky="ew")
+
+        while len(self._rows) < len(rows):
+            # Fondo de fila alternado
+            row_fg_color = self._row_fg_colors[len(self._rows) % len(self._row_fg_colors)]
+            self._rows.append([
+                ctk.CTkLabel(self, text="", justify="center", font=self._body_font, fg_color=row_fg_color,
+                             corner_radius=0, padx=5, pady=5)
+                for _ in self._columns
+            ])
+
+        for row_num, row_labels in enumerate(self._rows):
+            if row_num < len(rows):
+                for col, (text, color) in enumerate(rows[row_num]):
+                    row_labels[col].configure(text=text, text_color=color)
+                    row_labels[col].grid(row=row_num + 1, column=col, sticky="ew")
+            else:
+                for label in row_labels:
+                    label.grid_remove()